@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Semantic analysis scaling benchmark: binding and checking time per function as the program grows. Identifiers are
+resolved and typed when visited, so the time per function should stay flat.
+Usage: python -m benchmarks.bench_analysis [max functions] [repeat]
+"""
+import sys
+
+from benchmarks.common import best_of, generate_program
+from mattylang import check, compile
+
+
+def main() -> None:
+    max_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    functions = 100
+    while functions <= max_functions:
+        source = generate_program(functions)
+        results = [compile('bench', source, no_check=True) for _ in range(repeat)]
+        time, result = best_of(repeat, lambda: check(results.pop()))
+        assert not result.module.diagnostics.has_error()  # type: ignore
+        print(f'{functions:5d} functions: analysis {time * 1e3:8.2f} ms ({time / functions * 1e6:6.1f} us per function)')
+        functions *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Code cache benchmark: time to get a generated program's code object by compiling it against loading it from
+__mtlcache__, the time to execute it, and the startup of matty.py --cache on a cold and a warm cache.
+Usage: python -m benchmarks.bench_cache [functions]
+"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+from benchmarks.common import best_of, generate_program
+from mattylang import compile
+from mattylang.cache import get_cache_path, load_code, store_code
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    source = generate_program(functions)
+    matty = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'matty.py')
+
+    with tempfile.TemporaryDirectory() as directory:
+        file = os.path.join(directory, 'bench.mtl')
+        with open(file, 'w') as fd:
+            fd.write(source)
+
+        compile_time, code = best_of(3, lambda: compile(file, source, backend='ast').get_code_object())
+        store_code(file, source, code)  # type: ignore
+        load_time, _ = best_of(5, lambda: load_code(file, source))
+
+        def execute():
+            with redirect_stdout(io.StringIO()):
+                exec(code, {})  # type: ignore
+        exec_time, _ = best_of(5, execute)
+
+        def start(warm: bool):
+            if not warm and os.path.exists(get_cache_path(file)):
+                os.remove(get_cache_path(file))
+            subprocess.run([sys.executable, matty, '--cache', file], stdout=subprocess.DEVNULL, check=True)
+        cold_time, _ = best_of(3, lambda: start(False))
+        warm_time, _ = best_of(3, lambda: start(True))
+
+    print(f'{functions} functions: compile {compile_time * 1e3:.2f} ms, load {load_time * 1e3:.2f} ms, '
+          f'exec {exec_time * 1e3:.2f} ms')
+    print(f'matty.py --cache: cold {cold_time * 1e3:.2f} ms, warm {warm_time * 1e3:.2f} ms '
+          f'({cold_time / warm_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
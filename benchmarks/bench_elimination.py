@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Dead code elimination benchmark: a generated program where only every `stride`-th function is used and every function
+carries dead scaffolding, timing emission and compilation to a code object, and the size of the marshaled code
+(what __mtlcache__ stores and loads), without optimizing, with -O, and with -O --strip-unused.
+Usage: python -m benchmarks.bench_elimination [functions] [stride]
+"""
+import marshal
+import sys
+
+from benchmarks.common import best_of
+from mattylang import compile, emit
+
+
+def generate_scaffolding(functions: int, stride: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines += [
+            f'def f{i}(n: Real) {{',
+            f'    def debug = false',
+            f'    if (debug) {{ print("entering f{i}") print(n) }}',
+            f'    while (false) {{ n = n + 1 }}',
+            f'    if (n > {i}) return n - 1 else return n + 1',
+            f'    print("unreachable {i}")',
+            f'    return n',
+            f'}}',
+        ]
+    lines += [f'print(f{i}({i}))' for i in range(0, functions, stride)]
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    stride = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    source = generate_scaffolding(functions, stride)
+    for name, options in [('plain', {}), ('-O', {'optimize': True}),
+                          ('-O --strip-unused', {'optimize': True, 'strip_unused': True})]:
+        results = [compile('bench', source, no_emit=True) for _ in range(5)]
+        total_time, code = best_of(5, lambda: emit(results.pop(), **options).get_code_object())  # type: ignore
+        data = marshal.dumps(code)
+        load_time, _ = best_of(5, lambda: marshal.loads(data))
+        print(f'{name:18s}: emit + compile {total_time * 1e3:8.2f} ms, marshaled {len(data) / 1024:8.1f} KiB, '
+              f'load {load_time * 1e3:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
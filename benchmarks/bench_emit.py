@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Emitter backend benchmark: time from a checked tree to a code object, emitting source text then compiling it (which
+parses it again) against emitting a Python syntax tree and compiling it, for a generated program and for a single
+long expression (the emitters recurse per operand, so its length is bounded by the recursion limit).
+Usage: python -m benchmarks.bench_emit [functions] [operands]
+"""
+import sys
+
+from benchmarks.common import best_of, generate_program
+from mattylang import compile, emit
+
+
+def time_backends(source: str, repeat: int = 5) -> None:
+    for backend in ('source', 'ast'):
+        results = [compile('bench', source, no_emit=True) for _ in range(repeat)]
+        emit_time, _ = best_of(repeat, lambda: emit(results.pop(), backend=backend))  # type: ignore
+        results = [compile('bench', source, no_emit=True) for _ in range(repeat)]
+        total_time, _ = best_of(repeat, lambda: emit(results.pop(), backend=backend).get_code_object())  # type: ignore
+        print(f'  {backend:6s}: emit {emit_time * 1e3:8.2f} ms, emit + compile {total_time * 1e3:8.2f} ms')
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    operands = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    print(f'{functions} functions:')
+    time_backends(generate_program(functions))
+    print(f'{operands} operands:')
+    time_backends('def x = 1\ndef y = ' + ' + '.join(['x'] * operands) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Expression parsing benchmark, scaling nesting depth and expression width,
+comparing the explicit-stack expression parser against the original recursive parser
+(imported from the baseline ref, see import_baseline).
+Usage: python -m benchmarks.bench_expressions
+"""
+from typing import Any, Callable
+
+from benchmarks.common import best_of, import_baseline
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+
+
+def nested(depth: int) -> str:
+    return 'def x = ' + '(-' * depth + '1' + ')' * depth
+
+
+def wide(width: int) -> str:
+    return 'def x = ' + ' + '.join(f'{i} * 2' for i in range(width))
+
+
+def measure(parser_class: Any, source: str) -> str:
+    def parse():
+        module = Module('bench', source)
+        parser_class(Lexer(module)).parse()
+        assert not module.diagnostics.has_error()
+
+    try:
+        time, _ = best_of(3, parse)
+        return f'{time * 1000:10.2f} ms'
+    except RecursionError:
+        return f'{"RecursionError":>13}'
+
+
+def report(name: str, generate: Callable[[int], str], sizes: range) -> None:
+    LegacyParser = import_baseline('mattylang.parser').Parser
+    print(f'{name:>8} {"legacy":>13} {"explicit stack":>14}')
+    for size in sizes:
+        source = generate(size)
+        print(f'{size:8} {measure(LegacyParser, source)} {measure(Parser, source):>14}')
+
+
+def main() -> None:
+    report('depth', nested, range(100, 100001, 33300))
+    report('width', wide, range(1000, 100001, 33000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Constant folding benchmark: run time of a loop whose body computes constant expressions, emitted as written against
+folded, and the cost of the folder pass when emitting a generated program.
+Usage: python -m benchmarks.bench_folding [iterations] [functions]
+"""
+import sys
+
+from benchmarks.common import best_of, generate_program
+from mattylang import compile, emit
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    functions = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    source = '\n'.join([
+        'def pi = 3.14159',
+        'def i = 0',
+        'def total = 0',
+        f'while (i < {iterations}) {{',
+        '    total = total + 2 * pi * 1000 * 1 + (60 * 60 * 24) % 7 - 0',
+        '    if (!!(i >= 0) && true) i = i + 1',
+        '}',
+    ])
+    for optimize in (False, True):
+        code = compile('bench', source, optimize=optimize).get_code_object()
+        run_time, _ = best_of(5, lambda: exec(code, {}))  # type: ignore
+        print(f'{iterations} iterations, {"folded" if optimize else "as written":10s}: {run_time * 1e3:8.2f} ms')
+
+    program = generate_program(functions)
+    for optimize in (False, True):
+        results = [compile('bench', program, no_emit=True) for _ in range(5)]
+        emit_time, _ = best_of(5, lambda: emit(results.pop(), optimize=optimize))
+        print(f'{functions} functions, emit {"with" if optimize else "without":7s} folder: {emit_time * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Incremental reparsing benchmark: latency of a single-character edit against a full reparse (with and without reading
+the updated tree), and of recompiling after editing a function's body against a full compile.
+Usage: python -m benchmarks.bench_incremental [functions]
+"""
+import sys
+
+from benchmarks.common import best_of, generate_program
+from mattylang import compile
+from mattylang.globals import Globals
+from mattylang.incremental import IncrementalCompiler, IncrementalParser
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = generate_program(functions)
+    module = Module('bench', source)
+    parser = IncrementalParser(module)
+    position = module.source.index(f'def acc = {functions // 2}')
+
+    def edit():
+        # type a digit and delete it again, in the middle of the file
+        parser.apply_edit(position, position, '1')
+        parser.apply_edit(position, position + 1, '')
+
+    def edit_and_parse():
+        # reading the tree shifts the statements following the edit
+        parser.apply_edit(position, position, '1')
+        parser.parse()
+
+    full_time, _ = best_of(3, lambda: Parser(Lexer(Module('bench', source))).parse())
+    edit_time, _ = best_of(10, edit)
+    parse_time, _ = best_of(10, edit_and_parse)
+    print(f'source: {len(source) / 1e6:.2f} MB')
+    print(f'full reparse: {full_time * 1000:8.2f} ms')
+    print(f'edit:         {edit_time / 2 * 1000:8.2f} ms')
+    print(f'edit + parse: {parse_time * 1000:8.2f} ms')
+
+    module = Module('bench', source, globals=Globals().globals)
+    compiler = IncrementalCompiler(module)
+    compiler.compile()
+
+    def recompile():
+        # change a constant in the middle of the file, and change it back
+        for old, new in (('.5 * 2', '.5 * 3'), ('.5 * 3', '.5 * 2')):
+            start = module.source.index(old, position)
+            compiler.apply_edit(start, start + len(old), new)
+            compiler.compile()
+
+    compile_time, _ = best_of(3, lambda: compile('bench', source))
+    recompile_time, _ = best_of(5, recompile)
+    print(f'full compile: {compile_time * 1000:8.2f} ms')
+    print(f'recompile:    {recompile_time / 2 * 1000:8.2f} ms '
+          f'({compiler.checked} statements checked, {compiler.emitted} functions emitted)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Return type inference benchmark: checking time per function for programs made of rings of mutually recursive
+functions, each returning the next function's result before returning a value of its own. Rings are solved as
+strongly connected components, so the time per function should not grow with the program or ring size.
+Usage: python -m benchmarks.bench_inference [max functions] [repeat]
+"""
+import sys
+
+from benchmarks.common import best_of
+from mattylang import check, compile
+
+
+def generate_rings(functions: int, ring: int) -> str:
+    """
+    Generates `functions` functions, in rings of `ring` mutually recursive functions.
+    """
+    lines = []
+    for i in range(functions):
+        callee = i + 1 if (i + 1) % ring != 0 else i + 1 - ring
+        lines += [
+            f'def f{i}(n: Real) {{',
+            f'    if (n > {i % 7}) return f{callee}(n - 1) * 2',
+            f'    return n + {i}',
+            f'}}',
+        ]
+    lines += [f'def r = f0(10)']
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    max_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    for ring in (1, 10, 100):
+        functions = 100
+        while functions <= max_functions:
+            source = generate_rings(functions, ring)
+            results = [compile('bench', source, no_check=True) for _ in range(repeat)]
+            time, result = best_of(repeat, lambda: check(results.pop()))
+            assert not result.module.diagnostics.has_error()  # type: ignore
+            print(f'rings of {ring:3d}, {functions:5d} functions: analysis {time * 1e3:8.2f} ms '
+                  f'({time / functions * 1e6:6.1f} us per function)')
+            functions *= 2
+
+
+if __name__ == '__main__':
+    main()
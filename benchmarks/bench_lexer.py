@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Lexer throughput benchmark (MB/s), comparing the regex-driven lexer against the original character-at-a-time lexer
+(imported from the baseline ref, see import_baseline).
+Usage: python -m benchmarks.bench_lexer [functions]
+"""
+import sys
+from typing import Any, List, Tuple
+
+from benchmarks.common import best_of, generate_program, import_baseline
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+
+
+def lex(lexer_class: Any, module_class: Any, source: str) -> List[Tuple[str, str, int]]:
+    lexer = lexer_class(module_class('bench', source))
+    tokens = []
+    while lexer.peek().kind != 'eof':
+        token = lexer.peek()
+        tokens.append((token.kind, token.lexeme, token.position))
+        lexer.scan()
+    return tokens
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = generate_program(functions)
+    megabytes = len(source) / 1e6
+
+    legacy = import_baseline('mattylang.lexer'), import_baseline('mattylang.module')
+    legacy_time, legacy_tokens = best_of(3, lambda: lex(legacy[0].Lexer, legacy[1].Module, source))
+    time, tokens = best_of(3, lambda: lex(Lexer, Module, source))
+    assert tokens == legacy_tokens, 'lexers disagree'
+
+    print(f'source: {megabytes:.2f} MB, {len(tokens)} tokens')
+    print(f'legacy lexer: {megabytes / legacy_time:8.2f} MB/s')
+    print(f'lexer:        {megabytes / time:8.2f} MB/s ({legacy_time / time:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
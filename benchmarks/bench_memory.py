@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: tracemalloc peak per 1k syntax tree nodes, after parsing and after semantic analysis.
+Exits with status 1 if a budget (KiB per 1k nodes) is given and the analyzed tree exceeds it.
+Usage: python -m benchmarks.bench_memory [functions] [budget]
+"""
+import sys
+import tracemalloc
+from typing import List
+
+from benchmarks.common import generate_program
+from mattylang import check, CompileResult
+from mattylang.ast import AbstractNode
+from mattylang.globals import Globals
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+
+
+def count_nodes(root: AbstractNode) -> int:
+    """
+    Counts the nodes of a freshly parsed tree, before the binder and checker set fields referring to other nodes.
+    """
+    count, stack = 0, [root]
+    while len(stack) > 0:
+        node = stack.pop()
+        count += 1
+        for cls in type(node).__mro__:
+            for key in getattr(cls, '__slots__', ()):
+                value = getattr(node, key) if key != 'parent' else None
+                if isinstance(value, AbstractNode):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    children: List[AbstractNode] = value
+                    stack.extend(children)
+    return count
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    source = generate_program(functions)
+
+    module = Module('bench', source, globals=Globals().globals)
+
+    tracemalloc.start()
+    ast = Parser(Lexer(module)).parse()
+    _, parse_peak = tracemalloc.get_traced_memory()
+    nodes = count_nodes(ast)
+    check(CompileResult(module, ast))
+    _, check_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    parse_per_node, check_per_node = parse_peak / nodes * 1000 / 1024, check_peak / nodes * 1000 / 1024
+    print(f'nodes: {nodes}')
+    print(f'parsed:   {parse_peak / 1024 ** 2:8.2f} MiB peak, {parse_per_node:7.1f} KiB per 1k nodes')
+    print(f'analyzed: {check_peak / 1024 ** 2:8.2f} MiB peak, {check_per_node:7.1f} KiB per 1k nodes')
+
+    if budget is not None and check_per_node > budget:
+        print(f'over budget: {check_per_node:.1f} > {budget:.1f} KiB per 1k nodes')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Nesting depth benchmark: semantic analysis of a function whose body is nested `depth` loops deep, the innermost
+loop holding break, continue and (recursive) return statements. Enclosing function and loop queries are answered
+by the closest chunk, so time should not grow with depth.
+Usage: python -m benchmarks.bench_nesting [statements] [max depth]
+"""
+import sys
+from typing import Any, cast
+
+from benchmarks.common import best_of
+from mattylang import check, compile
+
+
+def generate_nested(depth: int, statements: int) -> str:
+    """
+    Generates a function with `depth` nested loops, with `statements` groups of statements in the innermost loop.
+    """
+    lines = ['def f(n: Real) {']
+    lines += [f'{"  " * (level + 1)}while (n > {level}) {{' for level in range(depth)]
+    indent = '  ' * (depth + 1)
+    for _ in range(statements):
+        lines += [f'{indent}if (n == 1) break', f'{indent}if (n == 2) continue', f'{indent}if (n == 3) return f(n - 1)']
+    lines += [f'{"  " * (level + 1)}}}' for level in reversed(range(depth))]
+    lines += ['  return n', '}']
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 80  # the parser and visitors recurse per level
+    depth = 10
+    while depth <= max_depth:
+        source = generate_nested(depth, statements)
+        results = [compile('bench', source, no_check=True) for _ in range(5)]
+        time, result = best_of(5, lambda: check(results.pop()))
+        assert not result.module.diagnostics.has_error()  # type: ignore
+
+        # the innermost loop's if statements, each holding a break, continue or return statement
+        chunk = cast(Any, result).ast.chunk.statements[0].body
+        for _ in range(depth):
+            chunk = chunk.statements[0].body
+        queried = [statement.if_body.statements[0] for statement in chunk.statements]
+        query_time, _ = best_of(5, lambda: [statement.get_enclosing_function() for statement in queried])
+        print(f'depth {depth:4d}: analysis {time * 1e3:7.2f} ms, '
+              f'enclosing function query {query_time / len(queried) * 1e9:6.0f} ns')
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Parallel checking benchmark: time of check with the program's statements checked in 1 to `max jobs` forked worker
+processes, on freshly parsed trees. Workers inherit the bound tree, so the gain is bounded by the binder (which runs
+first, serially) and by the cores available.
+Usage: python -m benchmarks.bench_parallel [functions] [max jobs]
+"""
+import os
+import sys
+
+from benchmarks.common import best_of, generate_program
+from mattylang import check, compile
+from mattylang.parallel import can_check_in_parallel
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    if not can_check_in_parallel():
+        print('workers cannot be forked on this platform')
+        return
+
+    source = generate_program(functions)
+    print(f'{functions} functions, {os.cpu_count()} cores')
+    jobs = 1
+    while jobs <= max_jobs:
+        results = [compile('bench', source, no_check=True) for _ in range(3)]
+        time, result = best_of(3, lambda: check(results.pop(), jobs=jobs))
+        assert not result.module.diagnostics.has_error()  # type: ignore
+        print(f'jobs {jobs:2d}: check {time * 1e3:8.2f} ms')
+        jobs *= 2
+
+
+if __name__ == '__main__':
+    main()
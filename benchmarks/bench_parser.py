@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Parser throughput benchmark (tokens/s), comparing the table-dispatched parser against the original if/elif parser
+(imported from the baseline ref, see import_baseline). Both scan their tokens on demand with the same lexer.
+Usage: python -m benchmarks.bench_parser [functions]
+"""
+import sys
+
+from benchmarks.common import best_of, generate_program, import_baseline
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = generate_program(functions)
+    lexer = Lexer(Module('bench', source))
+    tokens = 1
+    while lexer.peek().kind != 'eof':
+        lexer.scan()
+        tokens += 1
+
+    LegacyParser = import_baseline('mattylang.parser').Parser
+    legacy_time, _ = best_of(3, lambda: LegacyParser(Lexer(Module('bench', source))).parse())
+    time, _ = best_of(3, lambda: Parser(Lexer(Module('bench', source))).parse())
+
+    print(f'tokens: {tokens}')
+    print(f'legacy parser: {tokens / legacy_time / 1e3:8.1f} ktokens/s')
+    print(f'parser:        {tokens / time / 1e3:8.1f} ktokens/s ({legacy_time / time:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
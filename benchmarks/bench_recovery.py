@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Error recovery benchmark: compiles random garbage of growing size, with and without a max_errors cutoff.
+Time per kilobyte should stay flat (linear total time), and the cutoff should make it near constant.
+Usage: python -m benchmarks.bench_recovery [kilobytes]
+"""
+import random
+import sys
+
+from benchmarks.common import best_of
+from mattylang import compile
+
+
+def generate_garbage(size: int) -> str:
+    """
+    Generates `size` characters of printable garbage, mixing words, numbers, punctuation and newlines.
+    """
+    rng = random.Random(size)
+    pieces = ['x', 'foo', '1', '2.5', '"s"', '(', ')', '{', '}', '=', '==', ',', ':', '->', '+', '!', '@', ';', '\n']
+    result = []
+    length = 0
+    while length < size:
+        piece = rng.choice(pieces)
+        result.append(piece)
+        length += len(piece) + 1
+    return ' '.join(result)
+
+
+def main() -> None:
+    kilobytes = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    for size in (kilobytes // 4, kilobytes // 2, kilobytes):
+        source = generate_garbage(size * 1024)
+        time, result = best_of(3, lambda: compile('bench', source))
+        limited_time, _ = best_of(3, lambda: compile('bench', source, max_errors=100))
+        print(f'{size:6d} KiB: {time * 1e3:8.1f} ms ({time * 1e3 / size:5.2f} ms/KiB, '
+              f'{len(result.module.diagnostics)} diagnostics), '  # type: ignore
+              f'max_errors=100: {limited_time * 1e3:6.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Renamer stress benchmark: a function shadowing the same name in blocks nested `depth` deep, repeated `blocks` times,
+renamed with the suffix allocator against the original renamer probing name_1, name_2, ... with scope lookups
+(imported from the baseline ref, see import_baseline), on freshly bound trees.
+Usage: python -m benchmarks.bench_renamer [blocks] [max depth]
+"""
+import gc
+import sys
+from time import perf_counter
+from typing import Callable, List
+
+from benchmarks.common import import_baseline
+from mattylang import check, compile
+from mattylang.module import Module
+from mattylang.visitor import AbstractVisitor
+from mattylang.visitors.emitter import PythonSafeVariableRenamer
+
+
+def generate_shadowing(depth: int, blocks: int) -> str:
+    """
+    Generates a function with `blocks` sequences of `depth` nested blocks, each block shadowing x.
+    """
+    lines = ['def f(x: Real) {']
+    for _ in range(blocks):
+        lines += [f'{"  " * (level + 1)}if (x > {level}) {{ def x = x - 1' for level in range(depth)]
+        lines += [f'{"  " * (depth + 1)}print(x)']
+        lines += [f'{"  " * (level + 1)}}}' for level in reversed(range(depth))]
+    lines += ['  return x', '}']
+    return '\n'.join(lines) + '\n'
+
+
+def time_renamers(source: str, renamers: List[Callable[[Module], AbstractVisitor]], repeat: int) -> List[float]:
+    best = [float('inf')] * len(renamers)
+    for _ in range(repeat):
+        for i, renamer in enumerate(renamers):
+            result = check(compile('bench', source, no_check=True))
+            gc.disable()
+            start = perf_counter()
+            result.ast.accept(renamer(result.module))
+            best[i] = min(best[i], perf_counter() - start)
+            gc.enable()
+    return best
+
+
+def main() -> None:
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 40  # the parser and visitors recurse per level
+    ProbingVariableRenamer = import_baseline('mattylang.visitors.emitter').PythonSafeVariableRenamer
+    depth = 5
+    while depth <= max_depth:
+        time, legacy_time = time_renamers(generate_shadowing(depth, blocks),
+                                          [PythonSafeVariableRenamer, ProbingVariableRenamer], 5)
+        print(f'depth {depth:4d} ({depth * blocks:5d} shadowing declarations): probing {legacy_time * 1e3:8.2f} ms, '
+              f'allocator {time * 1e3:8.2f} ms ({legacy_time / time:.2f}x)')
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Scope resolution benchmark: resolving names declared at the top level from a scope nested `depth` blocks deep, with
+SymbolTable.lookup walking the parent scopes against the binder's per-name binding stacks, and the time to bind a
+program whose statements are nested `depth` blocks deep.
+Usage: python -m benchmarks.bench_scopes [names] [max depth]
+"""
+import sys
+
+from benchmarks.common import best_of
+from mattylang import compile
+from mattylang.globals import Globals
+from mattylang.module import Module
+from mattylang.symbols import Bindings, SymbolTable
+from mattylang.visitors.binder import Binder
+
+
+def generate_nested(depth: int, names: int) -> str:
+    """
+    Generates `names` variables, then `depth` nested blocks whose innermost block references all of them.
+    """
+    lines = [f'def v{i} = {i}' for i in range(names)]
+    lines += [f'{"  " * level}if (true) {{' for level in range(depth)]
+    lines += [f'{"  " * depth}v{i} = v{names - i - 1}' for i in range(names)]
+    lines += [f'{"  " * level}}}' for level in reversed(range(depth))]
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    names = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 80  # the parser and visitors recurse per level
+    depth = 10
+    while depth <= max_depth:
+        globals = SymbolTable()
+        symbols = [globals.register(f'v{i}') for i in range(names)]
+        scope = globals
+        for _ in range(depth):
+            scope = scope.open_scope()
+        bindings = Bindings(scope)
+        lookup_time, _ = best_of(5, lambda: [scope.lookup(symbol.name) for symbol in symbols])
+        resolve_time, _ = best_of(5, lambda: [bindings.resolve(symbol.name) for symbol in symbols])
+
+        source = generate_nested(depth, names)
+        results = [compile('bench', source, no_check=True) for _ in range(5)]
+
+        def bind():
+            result = results.pop()
+            result.ast.accept(Binder(Module('bench', source, globals=Globals().globals)))
+        bind_time, _ = best_of(5, bind)
+
+        print(f'depth {depth:4d}: lookup {lookup_time / names * 1e9:6.0f} ns, '
+              f'resolve {resolve_time / names * 1e9:6.0f} ns, bind {bind_time * 1e3:7.2f} ms')
+        depth *= 2
+
+
+if __name__ == '__main__':
+    main()
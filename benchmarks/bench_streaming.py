@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Streaming emitter benchmark: tracemalloc peak (above the checked tree) and time to write a generated program's code
+to a file, holding the code then writing it against writing each top-level statement to the file once emitted.
+Usage: python -m benchmarks.bench_streaming [functions]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Tuple
+
+from benchmarks.common import generate_program
+from mattylang import compile, emit
+
+
+def measure(source: str, write: Callable[[object], None]) -> Tuple[float, float]:
+    # returns the peak memory allocated while emitting (in MiB) and the time taken (in ms)
+    result = compile('bench', source, no_emit=True)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = perf_counter()
+    write(result)
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak / 2 ** 20, elapsed * 1e3
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = generate_program(functions)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.py')
+
+        def held(result):
+            emit(result)
+            with open(path, 'w') as fd:
+                fd.write(result.code)
+
+        def streamed(result):
+            with open(path, 'w') as fd:
+                emit(result, sink=fd)
+
+        for name, write in (('held', held), ('streamed', streamed)):
+            peak, elapsed = measure(source, write)
+            print(f'{functions} functions, {name:8s}: peak {peak:7.2f} MiB, {elapsed:8.2f} ms '
+                  f'({os.path.getsize(path) / 2 ** 20:.2f} MiB written)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Type checking benchmark: type nodes allocated by the checker and checker time, plus the cost of a function type
+comparison on canonical types versus the structural comparison of type nodes.
+Usage: python -m benchmarks.bench_types [functions] [repeat]
+"""
+import gc
+import sys
+
+from benchmarks.common import best_of, generate_program
+from mattylang.ast import AnyTypeNode, FunctionTypeNode, RealTypeNode, StringTypeNode, TypeNode
+from mattylang.globals import Globals
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+from mattylang.types import TYPES
+from mattylang.visitors.binder import Binder
+from mattylang.visitors.checker import Checker
+
+
+def count_type_nodes() -> int:
+    return sum(1 for value in gc.get_objects() if isinstance(value, TypeNode))
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    source = generate_program(functions)
+
+    def bind():
+        module = Module('bench', source, globals=Globals().globals)
+        ast = Parser(Lexer(module)).parse()
+        ast.accept(Binder(module))
+        return module, ast
+
+    module, ast = bind()
+    before = count_type_nodes()
+    ast.accept(Checker(module))
+    print(f'type nodes allocated by the checker: {count_type_nodes() - before}')
+
+    def run_check():
+        module, ast = bind()
+        ast.accept(Checker(module))
+
+    bind_time, _ = best_of(repeat, bind)
+    total_time, _ = best_of(repeat, run_check)
+    print(f'checker: {(total_time - bind_time) * 1000:8.2f} ms ({functions} functions)')
+
+    # what the checker does for each call: compare the callee's type with the argument types
+    comparisons = 100_000
+    node = FunctionTypeNode(0, [RealTypeNode(0), StringTypeNode(0)], RealTypeNode(0))
+    canonical = TYPES.intern(node)
+    structural, _ = best_of(repeat, lambda: [FunctionTypeNode(0, [RealTypeNode(0), StringTypeNode(0)],
+                                                              AnyTypeNode(0)).is_equivalent(node)
+                                             for _ in range(comparisons)])
+    interned, _ = best_of(repeat, lambda: [TYPES.is_equivalent(canonical, TYPES.function(
+        [TYPES.real, TYPES.string], TYPES.any)) for _ in range(comparisons)])
+    print(f'function type comparison: structural {structural / comparisons * 1e9:7.0f} ns, '
+          f'canonical {interned / comparisons * 1e9:7.0f} ns ({structural / interned:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import importlib
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from time import perf_counter
+from types import ModuleType
+from typing import Callable, Dict, Tuple
+
+BASELINE = os.environ.get('MATTY_BASELINE', '43d1959')  # the git ref benchmarks compare against, the original tree
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_baselines: Dict[str, Tuple[tempfile.TemporaryDirectory, Dict[str, ModuleType]]] = {}  # ref -> its mattylang modules
+
+
+def generate_program(functions: int) -> str:
+    """
+    Generates a well-formed program resembling machine-generated MattyLang, with `functions` function definitions.
+    """
+    lines = ['# generated benchmark program']
+    for i in range(functions):
+        lines += [
+            f'def f{i}(n: Real, s: String) {{',
+            f'    # function {i}',
+            f'    def acc = {i}.5 * 2 + n % 3',
+            f'    while (acc > 0 && !(acc == 1)) {{',
+            f'        if (acc >= 10) acc = acc - 10 else acc = acc - 1',
+            f'    }}',
+            f'    print(s + "done {i}")',
+            f'    return acc',
+            f'}}',
+            f'def r{i} = f{i}({i}, \'x\')',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def best_of(repeat: int, function: Callable[[], object]) -> Tuple[float, object]:
+    """
+    Runs `function` `repeat` times, returning the fastest time in seconds and the last result.
+    """
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function()
+        best = min(best, perf_counter() - start)
+    return best, result
+
+
+def import_baseline(name: str, ref: str = BASELINE) -> ModuleType:
+    """
+    Imports the module `name` of the mattylang package as of the git ref (see BASELINE), alongside the working tree's
+    mattylang. The package is extracted from the repository (git archive) into a temporary directory, and its modules
+    are imported under their own names, with the working tree's modules set aside meanwhile.
+    """
+    if ref not in _baselines:
+        archive = subprocess.run(['git', 'archive', ref, 'mattylang'], cwd=_ROOT, capture_output=True)
+        if archive.returncode != 0:
+            raise RuntimeError(f'cannot extract mattylang at {ref}: {archive.stderr.decode().strip()}')
+        directory = tempfile.TemporaryDirectory(prefix='mattylang-')
+        with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+            tar.extractall(directory.name)
+        _baselines[ref] = directory, {}
+    directory, modules = _baselines[ref]
+
+    current = _swap_modules(modules)
+    sys.path.insert(0, directory.name)
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(directory.name)
+        modules.update(_swap_modules(current))
+
+
+# replaces the imported mattylang modules, returning those replaced
+def _swap_modules(modules: Dict[str, ModuleType]) -> Dict[str, ModuleType]:
+    replaced = {name: sys.modules.pop(name) for name in list(sys.modules) if name.split('.')[0] == 'mattylang'}
+    sys.modules.update(modules)
+    return replaced
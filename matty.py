@@ -1,29 +1,61 @@
 #!/usr/bin/env python3
 import argparse
-
-from mattylang import compile
+import builtins
+import shutil
+import sys
+from types import CodeType
+from typing import cast, Optional
+
+from mattylang import __version__, compile, emit
+from mattylang.cache import load_code, store_code
 from mattylang.globals import Globals
 from mattylang.lexer import Lexer
-from mattylang.module import Module
+from mattylang.module import map_source, Module, Source
 from mattylang.visitors.printers import AstPrinter, SymbolPrinter
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description='MattyLang frontend, compiles and executes MattyLang files.')
     parser.add_argument('file', type=str, nargs='?', help='the input file (none for REPL)')
-    parser.add_argument('-o', '--output', type=str, help='the output file (default is <file>.py)')
-    parser.add_argument('-V', '--version', action='version', version='%(prog)s 0.0.1')
+    parser.add_argument('-o', '--output', type=str,
+                        help='the output file, written as the code is emitted and not run unless --run is given '
+                             '(default is <file>.py)')
+    parser.add_argument('--run', action='store_true', help='with -o, run the written output file')
+    parser.add_argument('-V', '--version', action='version', version=f'%(prog)s {__version__}')
     parser.add_argument('-v', '--verbose', action='store_true', help='verbose output')
     parser.add_argument('--tokens', action='store_true', help='print the tokens')
     parser.add_argument('--syntax', action='store_true', help='print the syntax tree')
     parser.add_argument('--symbols', action='store_true', help='print the symbol table')
     parser.add_argument('--code', action='store_true', help='print the generated code')
     parser.add_argument('--parse-only', action='store_true', help='skip semantic analysis and code generation')
+    parser.add_argument('--max-errors', type=int, default=100, metavar='N',
+                        help='stop after N errors (default is 100, 0 for no limit)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='check the program in up to N processes (default is 1)')
+    parser.add_argument('-O', '--optimize', action='store_true',
+                        help='fold constant expressions, simplify identities and leave out dead code')
+    parser.add_argument('--strip-unused', action='store_true',
+                        help='with -O, also leave out the top-level functions the program does not use')
+    parser.add_argument('--cache', action='store_true',
+                        help='cache the compiled code in __mtlcache__, unchanged files are not compiled again '
+                             '(no .py file is written)')
+    parser.add_argument('--backend', choices=['source', 'ast'], default='source',
+                        help='emit Python source text (default) or a Python syntax tree, whose runtime errors point at '
+                             'the MattyLang lines')
+    parser.add_argument('--mmap', action='store_true', help='memory-map the input file, positions are byte offsets')
     parsed = parser.parse_args()
+    if parsed.strip_unused and not parsed.optimize:
+        parser.error('--strip-unused requires -O')
+    if parsed.run and parsed.output is None:
+        parser.error('--run requires -o')
 
     if parsed.file:
-        with open(parsed.file, 'r') as file:
-            source = file.read()
+        source: Source
+        if parsed.mmap:
+            source = map_source(parsed.file)
+        else:
+            with open(parsed.file, 'r') as file:
+                source = file.read()
         run(parsed, parsed.file, source)
         return
 
@@ -36,7 +68,21 @@ def main() -> None:
             break
 
 
-def run(args: argparse.Namespace, file: str, source: str, no_file_output: bool = False):
+def run(args: argparse.Namespace, file: str, source: Source, no_file_output: bool = False):
+    # with an output file, the code is written to it as it is emitted (rather than held in memory), then executed
+    stream = args.output is not None and not no_file_output
+
+    # the cache holds code objects of programs compiled without diagnostics, so a cached program is only executed
+    cache = args.cache and not no_file_output and not stream and \
+        not (args.tokens or args.syntax or args.symbols or args.code or args.verbose or args.parse_only)
+    options = ' '.join(option for option, enabled in [('-O', args.optimize), ('--strip-unused', args.strip_unused)]
+                       if enabled)  # the options affecting the generated code
+    if cache:
+        cached = load_code(file, source, options)
+        if cached is not None:
+            exec(cached, globals(), globals())
+            return 0
+
     if args.tokens:
         module = Module(file, source, globals=Globals().globals, verbose=args.verbose)
         lexer = Lexer(module)
@@ -45,7 +91,21 @@ def run(args: argparse.Namespace, file: str, source: str, no_file_output: bool =
             print(f'{file}:{line}:{column}: {lexer.peek()}')
             lexer.scan()
 
-    result = compile(file, source, verbose=args.verbose, no_check=args.parse_only, globals=Globals().globals)
+    result = compile(file, source, verbose=args.verbose, no_check=args.parse_only, globals=Globals().globals,
+                     max_errors=args.max_errors or None, jobs=args.jobs,
+                     no_emit=stream, backend=args.backend, optimize=args.optimize, strip_unused=args.strip_unused)
+
+    code: Optional[CodeType] = None
+    if stream and not args.parse_only and not result.module.diagnostics.has_error():
+        with open(args.output, 'w') as fd:
+            emit(result, sink=fd, optimize=args.optimize, strip_unused=args.strip_unused)
+        # the program is only read back (whole) to be run, it is printed a block at a time
+        if args.code:
+            with open(args.output, 'r') as fd:
+                shutil.copyfileobj(fd, sys.stdout)
+        if args.run:
+            with open(args.output, 'r') as fd:
+                code = builtins.compile(fd.read(), args.output, 'exec')
 
     if args.syntax:
         result.ast.accept(AstPrinter(result.module))
@@ -53,26 +113,25 @@ def run(args: argparse.Namespace, file: str, source: str, no_file_output: bool =
     if args.symbols:
         SymbolPrinter(result.module)
 
-    if args.code and result.code is not None:
-        print(result.code)
+    if args.code and result.get_code() is not None:
+        print(result.get_code())  # unparsed on demand with the ast backend
 
-    if not no_file_output:
-        if args.output:
-            new_file = args.output
+    if not no_file_output and not stream and not args.cache and result.get_code() is not None:
+        new_file = file.split('/')[-1].split('\\')[-1]  # get file name
+        new_file = new_file.rsplit('.mtl', 1)[0] + '.py'  # remove .mtl extension, add .py extension
 
-        if result.code is not None:
-            new_file = file.split('/')[-1].split('\\')[-1]  # get file name
-            new_file = new_file.rsplit('.mtl', 1)[0] + '.py'  # remove .mtl extension, add .py extension
+        with open(new_file, 'w') as fd:
+            fd.write(cast(str, result.get_code()))
 
-            with open(new_file, 'w') as fd:
-                fd.write(result.code)
-
-    if result.code is not None:
-        exec(result.code, globals(), globals())
+    if code is None:
+        code = result.get_code_object()
+    if cache and code is not None and len(result.module.diagnostics) == 0:
+        store_code(file, source, code, options)
+    if code is not None:
+        exec(code, globals(), globals())
 
     result.module.print_diagnostics()
     return 1 if result.module.diagnostics.has_error() else 0
 
-
 if __name__ == '__main__':
     main()
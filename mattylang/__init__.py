@@ -1,52 +1,125 @@
-from typing import Optional
+import ast as python_ast  # the package's ast attribute is mattylang.ast
+import builtins
+from types import CodeType
+from typing import Literal, Optional, TextIO
 
 from mattylang.ast import ProgramNode
 from mattylang.globals import Globals
 from mattylang.lexer import Lexer
-from mattylang.module import Module
+from mattylang.module import Module, Source
 from mattylang.parser import Parser
 from mattylang.symbols import SymbolTable
 from mattylang.visitors.binder import Binder
 from mattylang.visitors.checker import Checker
-from mattylang.visitors.emitter import Emitter
+from mattylang.visitors.eliminator import DeadCodeEliminator
+from mattylang.visitors.emitter import Emitter, PythonAstEmitter
+from mattylang.visitors.folder import ConstantFolder
+
+
+__version__ = '0.0.1'  # part of the key of cached code objects (see mattylang.cache)
+
+Backend = Literal['source', 'ast']  # emit Python source text, or a Python syntax tree
 
 
 class CompileResult:
     def __init__(self, module: Module, ast: ProgramNode, code: Optional[str] = None):
         self.module, self.ast, self.code = module, ast, code
+        self.python: Optional[python_ast.Module] = None  # emitted by the ast backend, code is then produced on demand
 
+    def get_code(self) -> Optional[str]:
+        """
+        Returns the emitted source text, unparsed from the emitted Python syntax tree with the ast backend.
+        """
+        if self.code is None and self.python is not None:
+            self.code = python_ast.unparse(self.python)
+        return self.code
 
-def compile(file: str, source: str, verbose: bool = False, no_check: bool = False, no_emit: bool = False,
-            globals: Optional[SymbolTable] = None) -> CompileResult:
+    def get_code_object(self) -> Optional[CodeType]:
+        """
+        Compiles the emitted Python syntax tree (or source text with the source backend) for exec. Only the syntax
+        tree's line numbers are those of the module's source, so the source text is compiled as '<string>'.
+        """
+        if self.python is not None:
+            return builtins.compile(self.python, self.module.file, 'exec')
+        elif self.code is not None:
+            return builtins.compile(self.code, '<string>', 'exec')
+        return None
+
+
+def compile(file: str, source: Source, verbose: bool = False, no_check: bool = False, no_emit: bool = False,
+            globals: Optional[SymbolTable] = None, max_errors: Optional[int] = None, jobs: int = 1,
+            backend: Backend = 'source', optimize: bool = False, strip_unused: bool = False) -> CompileResult:
+    """
+    Compiles the source, stopping after the pass during which max_errors errors were reported (if given).
+    With jobs > 1, the program is checked in up to jobs processes where the platform can fork (see check_in_parallel),
+    unless it is optimized: the optimizations need the types of the nodes, which the workers do not send back.
+    With the ast backend, the program is emitted as a Python syntax tree (python) rather than source text (code).
+    With optimize, constant expressions are folded and dead code left out (with strip_unused, unused functions too)
+    before emitting (see emit).
+    """
     if globals is None:
         globals = Globals().globals
 
-    module = Module(file, source, globals=Globals().globals, verbose=verbose)
+    module = Module(file, source, globals=Globals().globals, verbose=verbose, max_errors=max_errors)
     result = CompileResult(module, Parser(Lexer(module)).parse())
 
-    if not no_check:
-        check(result)
+    if not no_check and not module.diagnostics.limit_reached():
+        check(result, 1 if optimize else jobs)
 
         if not no_emit:
-            emit(result)
+            emit(result, backend, optimize=optimize, strip_unused=strip_unused)
 
     return result
 
 
-def check(compile: CompileResult) -> CompileResult:
-    compile.module.diagnostics.next_set()
-    compile.ast.accept(Binder(compile.module))
-    compile.module.diagnostics.next_set()
-    compile.ast.accept(Checker(compile.module))
-    compile.module.diagnostics.next_set()
+def check(compile: CompileResult, jobs: int = 1) -> CompileResult:
+    module = compile.module
+    module.diagnostics.next_set()
+    if jobs > 1:
+        # imported on demand, multiprocessing is slow to import and most runs (e.g., of cached code) never need it
+        from mattylang.parallel import can_check_in_parallel, check_in_parallel
+        if can_check_in_parallel():
+            check_in_parallel(module, compile.ast, jobs)
+            return compile
+
+    compile.ast.accept(Binder(module))
+    module.diagnostics.next_set()
+    if not module.diagnostics.limit_reached():
+        compile.ast.accept(Checker(module))
+        module.diagnostics.next_set()
     return compile
 
 
-def emit(compile: CompileResult) -> CompileResult:
-    if not compile.module.diagnostics.has_error():
-        compile.module.diagnostics.next_set()
-        emitter = Emitter(compile.module)
-        compile.ast.accept(emitter)
-        compile.code = str(emitter)
-        compile.module.diagnostics.next_set()
+def emit(compile: CompileResult, backend: Backend = 'source', sink: Optional[TextIO] = None, optimize: bool = False,
+         strip_unused: bool = False) -> CompileResult:
+    """
+    Emits the program unless an error was reported. Given a sink, the source backend writes the code to it one
+    top-level statement at a time (code is then None), so the code of the whole program is never held in memory.
+    With optimize, constant expressions are folded, identities simplified and dead code left out (see ConstantFolder
+    and DeadCodeEliminator), with strip_unused too, so are the top-level functions the program does not use. The
+    program is then expected to have been checked serially, so that all of its nodes are typed.
+    """
+    assert sink is None or backend == 'source', 'fatal: only the source backend writes to a sink'
+    module = compile.module
+    if not module.diagnostics.has_error():
+        module.diagnostics.next_set()
+        folder, eliminator = None, None
+        if optimize:
+            folder = ConstantFolder(module)
+            compile.ast.accept(folder)
+            module.diagnostics.next_set()
+            eliminator = DeadCodeEliminator(module, folder)
+            if strip_unused:
+                eliminator.strip_unused_functions(compile.ast)
+            compile.ast.accept(eliminator)
+            module.diagnostics.next_set()
+        if backend == 'ast':
+            tree_emitter = PythonAstEmitter(module, folder, eliminator)
+            compile.ast.accept(tree_emitter)
+            compile.python = tree_emitter.get_tree()
+        else:
+            emitter = Emitter(module, sink, folder, eliminator)
+            compile.ast.accept(emitter)
+            compile.code = str(emitter) if sink is None else None  # written to the sink
+        module.diagnostics.next_set()
     return compile
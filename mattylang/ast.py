@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Callable, cast, List, Optional, TYPE_CHECKING
+from typing import Callable, cast, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
     from mattylang.symbols import Symbol, SymbolTable
@@ -7,6 +7,9 @@ if TYPE_CHECKING:  # pragma: no cover
 
 
 class AbstractNode(ABC):
+    # nodes have no __dict__: every (sub)class declares the fields it adds, including those set by later passes
+    __slots__ = ('parent', 'position')
+
     @abstractmethod
     def __init__(self, position: int):
         self.parent: Optional[AbstractNode] = None
@@ -29,10 +32,29 @@ class AbstractNode(ABC):
         return None
 
     def get_enclosing_function(self) -> Optional['FunctionDefinitionNode']:
-        return cast(Optional[FunctionDefinitionNode], self.get_first_ancestor(lambda node: isinstance(node, FunctionDefinitionNode)))
+        return cast(Optional[FunctionDefinitionNode], self.__get_enclosing(FunctionDefinitionNode))
+
+    def get_enclosing_loop_statement(self) -> Optional['WhileStatementNode']:
+        return cast(Optional[WhileStatementNode], self.__get_enclosing(WhileStatementNode))
+
+    # climbs to the closest chunk, which records its enclosing function and loop once bound (so that the cost does
+    # not depend on how deeply blocks are nested), loops do not extend into function definitions
+    def __get_enclosing(self, kind: type) -> Optional['AbstractNode']:
+        node = self.parent
+        while node is not None:
+            if isinstance(node, kind):
+                return node
+            elif isinstance(node, ChunkNode) and node.scope is not None:
+                return node.function if kind is FunctionDefinitionNode else node.loop
+            elif isinstance(node, FunctionDefinitionNode):
+                return None
+            node = node.parent
+        return None
 
 
 class ProgramNode(AbstractNode):
+    __slots__ = ('chunk',)
+
     def __init__(self, position: int, chunk: 'ChunkNode'):
         super().__init__(position)
         self.chunk = chunk
@@ -46,15 +68,19 @@ class ProgramNode(AbstractNode):
 
 
 class StatementNode(AbstractNode, ABC):
-    pass
+    __slots__ = ()
 
 
 class ChunkNode(StatementNode):
+    __slots__ = ('statements', 'scope', 'parent_chunk', 'function', 'loop', 'return_type')
+
     def __init__(self, position: int, statements: List[StatementNode] = []):
         super().__init__(position)
         self.statements = statements
         self.scope: Optional[SymbolTable] = None  # set by the binder
         self.parent_chunk: Optional[ChunkNode] = None  # set by the binder, not set at function scope
+        self.function: Optional[FunctionDefinitionNode] = None  # set by the binder, the enclosing function
+        self.loop: Optional[WhileStatementNode] = None  # set by the binder, the enclosing loop (within the function)
         self.return_type: Optional[TypeNode] = None  # set by the checker
         for statement in statements:
             statement.parent = self
@@ -71,6 +97,8 @@ class ChunkNode(StatementNode):
 
 
 class VariableDefinitionNode(StatementNode):
+    __slots__ = ('identifier', 'initializer')
+
     def __init__(self, position: int, identifier: 'IdentifierNode', initializer: 'ExpressionNode'):
         super().__init__(position)
         self.identifier, self.initializer = identifier, initializer
@@ -84,6 +112,8 @@ class VariableDefinitionNode(StatementNode):
 
 
 class VariableAssignmentNode(StatementNode):
+    __slots__ = ('identifier', 'value')
+
     def __init__(self, position: int, identifier: 'IdentifierNode', value: 'ExpressionNode'):
         super().__init__(position)
         self.identifier, self.value = identifier, value
@@ -97,6 +127,8 @@ class VariableAssignmentNode(StatementNode):
 
 
 class IfStatementNode(StatementNode):
+    __slots__ = ('condition', 'if_body', 'else_body')
+
     def __init__(self, position: int, condition: 'ExpressionNode', if_body: ChunkNode, else_body: Optional[ChunkNode] = None):
         super().__init__(position)
         self.condition, self.if_body, self.else_body = condition, if_body, else_body
@@ -112,6 +144,8 @@ class IfStatementNode(StatementNode):
 
 
 class WhileStatementNode(StatementNode):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, position: int, condition: 'ExpressionNode', body: ChunkNode):
         super().__init__(position)
         self.condition, self.body = condition, body
@@ -125,6 +159,8 @@ class WhileStatementNode(StatementNode):
 
 
 class BreakStatementNode(StatementNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -134,11 +170,10 @@ class BreakStatementNode(StatementNode):
     def accept(self, visitor: 'AbstractVisitor'):
         visitor.visit_break_statement(self)
 
-    def get_enclosing_loop_statement(self):
-        return cast(Optional[WhileStatementNode], self.get_first_ancestor(lambda parent: isinstance(parent, WhileStatementNode)))
-
 
 class ContinueStatementNode(StatementNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -148,11 +183,10 @@ class ContinueStatementNode(StatementNode):
     def accept(self, visitor: 'AbstractVisitor'):
         visitor.visit_continue_statement(self)
 
-    def get_enclosing_loop_statement(self):
-        return cast(Optional[WhileStatementNode], self.get_first_ancestor(lambda parent: isinstance(parent, WhileStatementNode)))
-
 
 class FunctionDefinitionNode(StatementNode):
+    __slots__ = ('identifier', 'parameters', 'body', 'scope')
+
     def __init__(self, position: int, identifier: 'IdentifierNode', parameters: List['FunctionParameterNode'], body: ChunkNode):
         super().__init__(position)
         self.identifier, self.parameters, self.body, self.scope = identifier, parameters, body, body.parent
@@ -168,6 +202,8 @@ class FunctionDefinitionNode(StatementNode):
 
 
 class FunctionParameterNode(AbstractNode):
+    __slots__ = ('identifier', 'type')
+
     def __init__(self, position: int, identifier: 'IdentifierNode', type: 'TypeNode'):
         super().__init__(position)
         self.identifier, self.type = identifier, type
@@ -181,6 +217,8 @@ class FunctionParameterNode(AbstractNode):
 
 
 class ReturnStatementNode(StatementNode):
+    __slots__ = ('value',)
+
     def __init__(self, position: int, value: Optional['ExpressionNode'] = None):
         super().__init__(position)
         self.value = value
@@ -193,11 +231,13 @@ class ReturnStatementNode(StatementNode):
     def accept(self, visitor: 'AbstractVisitor'):
         visitor.visit_return_statement(self)
 
-    def get_enclosing_function_definition(self):
-        return cast(Optional[FunctionDefinitionNode], self.get_first_ancestor(lambda parent: isinstance(parent, FunctionDefinitionNode)))
+    def get_enclosing_function_definition(self) -> Optional['FunctionDefinitionNode']:
+        return self.get_enclosing_function()
 
 
 class CallStatementNode(StatementNode):
+    __slots__ = ('call_expression',)
+
     def __init__(self, position: int, call_expression: 'CallExpressionNode'):
         super().__init__(position)
         self.call_expression = call_expression
@@ -211,6 +251,8 @@ class CallStatementNode(StatementNode):
 
 
 class ExpressionNode(AbstractNode, ABC):
+    __slots__ = ('type',)
+
     @abstractmethod
     def __init__(self, position: int):
         super().__init__(position)
@@ -222,10 +264,12 @@ class ExpressionNode(AbstractNode, ABC):
 
 
 class PrimaryExpressionNode(ExpressionNode, ABC):
-    pass
+    __slots__ = ()
 
 
 class NilLiteralNode(PrimaryExpressionNode):
+    __slots__ = ('value',)
+
     def __init__(self, position: int):
         super().__init__(position)
         self.value = None
@@ -238,6 +282,8 @@ class NilLiteralNode(PrimaryExpressionNode):
 
 
 class BoolLiteralNode(PrimaryExpressionNode):
+    __slots__ = ('value',)
+
     def __init__(self, position: int, value: bool):
         super().__init__(position)
         self.value = value
@@ -250,6 +296,8 @@ class BoolLiteralNode(PrimaryExpressionNode):
 
 
 class RealLiteralNode(PrimaryExpressionNode):
+    __slots__ = ('value',)
+
     def __init__(self, position: int, value: float):
         super().__init__(position)
         self.value = value
@@ -262,6 +310,8 @@ class RealLiteralNode(PrimaryExpressionNode):
 
 
 class StringLiteralNode(PrimaryExpressionNode):
+    __slots__ = ('value',)
+
     def __init__(self, position: int, value: str):
         super().__init__(position)
         self.value = value
@@ -274,10 +324,13 @@ class StringLiteralNode(PrimaryExpressionNode):
 
 
 class IdentifierNode(PrimaryExpressionNode):
+    __slots__ = ('value', 'symbol', 'coordinate')
+
     def __init__(self, position: int, value: str):
         super().__init__(position)
         self.value = value
         self.symbol: Optional['Symbol'] = None  # set by the binder
+        self.coordinate: Optional[Tuple[int, int]] = None  # (scope depth, slot) of the symbol, set by the binder
 
     def __str__(self):
         return f'identifier({self.value})'
@@ -291,6 +344,8 @@ class IdentifierNode(PrimaryExpressionNode):
 
 
 class CallExpressionNode(PrimaryExpressionNode):
+    __slots__ = ('identifier', 'arguments')
+
     def __init__(self, position: int, identifier: IdentifierNode, arguments: List[ExpressionNode]):
         super().__init__(position)
         self.identifier, self.arguments = identifier, arguments
@@ -306,6 +361,8 @@ class CallExpressionNode(PrimaryExpressionNode):
 
 
 class UnaryExpressionNode(ExpressionNode):
+    __slots__ = ('operator', 'operand')
+
     def __init__(self, position: int, operator: str, operand: ExpressionNode):
         super().__init__(position)
         self.operator, self.operand = operator, operand
@@ -319,6 +376,8 @@ class UnaryExpressionNode(ExpressionNode):
 
 
 class BinaryExpressionNode(ExpressionNode):
+    __slots__ = ('operator', 'left', 'right')
+
     def __init__(self, position: int, operator: str, left: ExpressionNode, right: ExpressionNode):
         super().__init__(position)
         self.operator, self.left, self.right = operator, left, right
@@ -332,6 +391,8 @@ class BinaryExpressionNode(ExpressionNode):
 
 
 class TypeNode(AbstractNode, ABC):
+    __slots__ = ()
+
     @abstractmethod
     def is_assignable_to(self, other: 'TypeNode') -> bool:
         pass
@@ -341,6 +402,8 @@ class TypeNode(AbstractNode, ABC):
 
 
 class AnyTypeNode(TypeNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -355,11 +418,15 @@ class AnyTypeNode(TypeNode):
 
 
 class PrimitiveTypeNode(TypeNode, ABC):
+    __slots__ = ()
+
     def is_assignable_to(self, other: TypeNode):
         return isinstance(self, other.__class__) or isinstance(other, AnyTypeNode)
 
 
 class NilTypeNode(PrimitiveTypeNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -371,6 +438,8 @@ class NilTypeNode(PrimitiveTypeNode):
 
 
 class BoolTypeNode(PrimitiveTypeNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -382,6 +451,8 @@ class BoolTypeNode(PrimitiveTypeNode):
 
 
 class RealTypeNode(PrimitiveTypeNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -393,6 +464,8 @@ class RealTypeNode(PrimitiveTypeNode):
 
 
 class StringTypeNode(PrimitiveTypeNode):
+    __slots__ = ()
+
     def __init__(self, position: int):
         super().__init__(position)
 
@@ -404,6 +477,8 @@ class StringTypeNode(PrimitiveTypeNode):
 
 
 class FunctionTypeNode(TypeNode):
+    __slots__ = ('parameter_types', 'return_type')
+
     def __init__(self, position: int, parameter_types: List[TypeNode], return_type: TypeNode):
         super().__init__(position)
         self.parameter_types, self.return_type = parameter_types, return_type
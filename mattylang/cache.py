@@ -0,0 +1,74 @@
+import hashlib
+import marshal
+import os
+import sys
+from importlib.util import MAGIC_NUMBER
+from types import CodeType
+from typing import Optional
+
+from mattylang import __version__
+from mattylang.module import Source
+
+CACHE_DIRECTORY = '__mtlcache__'
+
+
+def get_cache_path(file: str) -> str:
+    """
+    Returns the path of the file's cached code object, in a __mtlcache__ directory next to the file (like __pycache__).
+    """
+    directory, name = os.path.split(file)
+    name = name.rsplit('.mtl', 1)[0]
+    return os.path.join(directory, CACHE_DIRECTORY, f'{name}.{sys.implementation.cache_tag}.mtlc')
+
+
+def get_cache_key(source: Source, options: str = '') -> bytes:
+    """
+    Returns the key a cached code object is valid for: the Python magic number (the marshal and bytecode format),
+    followed by a hash of the compiler version, the options the code was compiled with (e.g., '-O') and the source.
+    """
+    digest = hashlib.sha256(f'mattylang {__version__} {options}\0'.encode())
+    digest.update(source.encode() if isinstance(source, str) else source)
+    return MAGIC_NUMBER + digest.digest()
+
+
+def load_code(file: str, source: Source, options: str = '') -> Optional[CodeType]:
+    """
+    Loads the file's cached code object, if it was stored for the same source, options, compiler version and Python
+    version.
+    """
+    key = get_cache_key(source, options)
+    try:
+        with open(get_cache_path(file), 'rb') as fd:
+            data = fd.read()
+    except OSError:
+        return None
+
+    if not data.startswith(key):
+        return None
+    try:
+        code = marshal.loads(memoryview(data)[len(key):])
+    except (EOFError, ValueError, TypeError):  # truncated or corrupted
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def store_code(file: str, source: Source, code: CodeType, options: str = '') -> bool:
+    """
+    Stores the file's code object (compiled from source), returning whether it was stored. The cache file is replaced
+    atomically, so a concurrent load never sees it partially written.
+    """
+    path = get_cache_path(file)
+    temporary = f'{path}.{os.getpid()}'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, 'wb') as fd:
+            fd.write(get_cache_key(source, options))
+            fd.write(marshal.dumps(code))
+        os.replace(temporary, path)
+    except OSError:  # e.g., a read-only directory, the file is compiled every run
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        return False
+    return True
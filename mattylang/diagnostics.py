@@ -1,4 +1,4 @@
-from typing import List, Literal
+from typing import Iterable, List, Literal, Optional, overload, Union
 
 
 DiagnosticKind = Literal['info', 'warning', 'error']
@@ -23,11 +23,14 @@ class Diagnostic:
 
 
 class Diagnostics:
-    def __init__(self, verbose: bool) -> None:
+    def __init__(self, verbose: bool, max_errors: Optional[int] = None) -> None:
         self.__diagnostics: List[Diagnostic] = []
         self.__last_block = 0
         self.__has_error = False
         self.__verbose = verbose
+        self.__max_errors = max_errors  # None for no limit
+        self.__errors = 0
+        self.__limit_reached = False
 
     def __iter__(self):
         return iter(self.__diagnostics)
@@ -35,16 +38,53 @@ class Diagnostics:
     def __len__(self):
         return len(self.__diagnostics)
 
+    @overload
+    def __getitem__(self, index: int) -> Diagnostic: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Diagnostic]: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self.__diagnostics[index]
+
     def has_error(self):
         return self.__has_error
 
+    def limit_reached(self):
+        """
+        Whether max_errors errors were reported, later diagnostics are dropped and compilation should stop.
+        """
+        return self.__limit_reached
+
+    def remaining_errors(self) -> Optional[int]:
+        """
+        The number of errors that can be reported before max_errors is reached, None if there is no limit.
+        """
+        return None if self.__max_errors is None else max(self.__max_errors - self.__errors, 0)
+
     def emit_diagnostic(self, kind: DiagnosticKind, message: str, position: int):
-        if kind == 'info' and not self.__verbose:
+        if (kind == 'info' and not self.__verbose) or self.__limit_reached:
             return
         elif kind == 'error':
             self.__has_error = True
+            self.__errors += 1
         self.__diagnostics.append(Diagnostic(kind, message, position))
 
+        if self.__max_errors is not None and self.__errors >= self.__max_errors:
+            self.__limit_reached = True
+            self.__diagnostics.append(Diagnostic(
+                'error', f'fatal: too many errors (max_errors={self.__max_errors}), stopping', position))
+
+    def replace(self, diagnostics: Iterable[Diagnostic]):
+        """
+        Replaces all diagnostics, e.g., with the diagnostics kept after an incremental edit.
+        """
+        self.__diagnostics = list(diagnostics)
+        self.__last_block = 0
+        self.__errors = sum(diagnostic.kind == 'error' for diagnostic in self.__diagnostics)
+        self.__has_error = self.__errors > 0
+        self.__limit_reached = self.__max_errors is not None and self.__errors >= self.__max_errors
+
     def next_set(self):
         # sort diagnostics in current set by position
         idx = len(self.__diagnostics)
@@ -1,8 +1,8 @@
-from mattylang.ast import *
 from mattylang.symbols import SymbolTable
+from mattylang.types import TYPES
 
 
 class Globals:
     def __init__(self):
         self.globals = SymbolTable()
-        self.globals.register('print', extern=True, type=FunctionTypeNode(0, [AnyTypeNode(0)], NilTypeNode(0)))
+        self.globals.register('print', extern=True, type=TYPES.function([TYPES.any], TYPES.nil))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Reads the EBNF grammar (docs/grammar.ebnf), computes FIRST/FOLLOW sets and emits the parser tables module.
+Usage: python -m mattylang.grammar [grammar] [output] (defaults: docs/grammar.ebnf, mattylang/parser_tables.py)
+"""
+import re
+import sys
+from typing import AbstractSet, cast, Dict, FrozenSet, List, Mapping, Set, Tuple, Union
+
+# Lexical rules are scanned by the lexer, they are terminals to the parser (as are uppercase character classes).
+LEXICAL_RULES = {'identifier', 'real_literal', 'string_literal'}
+
+# Rules whose alternatives the parser dispatches on by the current token.
+DISPATCHED_RULES = ('statement', 'primary_expression', 'type')
+
+# Binary operator precedence levels (the grammar's binary_expression is ambiguous), higher binds tighter.
+BINARY_PRECEDENCE = {
+    '&&': 1, '||': 1,
+    '<': 2, '>': 2, '<=': 2, '>=': 2, '==': 2, '!=': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4, '%': 4,
+}
+
+# An expression is a terminal ('terminal', kind), a nonterminal ('rule', name), ('sequence', [...]),
+# ('alternation', [...]), ('optional', expression) or ('repetition', expression).
+Expression = Tuple[str, Union[str, List['Expression'], 'Expression']]
+
+
+def _name(expression: Expression) -> str:
+    return cast(str, expression[1])  # of a terminal or rule
+
+
+def _items(expression: Expression) -> List[Expression]:
+    return cast(List[Expression], expression[1])  # of a sequence or alternation
+
+
+def _operand(expression: Expression) -> Expression:
+    return cast(Expression, expression[1])  # of an optional or repetition
+
+
+class GrammarError(Exception):
+    pass
+
+
+class Grammar:
+    def __init__(self, source: str):
+        self.rules: Dict[str, List[Expression]] = {}  # rule name -> alternatives, in definition order
+        self.__tokens = self.__tokenize(source)
+        self.__index = 0
+
+        while self.__index < len(self.__tokens):
+            name = self.__next()
+            self.__expect('=')
+            self.rules.setdefault(name, []).extend(self.__parse_alternatives())
+            self.__expect(';')
+
+        for name, alternatives in self.rules.items():
+            for alternative in alternatives:
+                self.__check_references(name, alternative)
+
+    def first(self) -> Dict[str, FrozenSet[str]]:
+        """
+        Computes the FIRST set of every rule ('' marks a nullable rule).
+        """
+        first: Dict[str, Set[str]] = {name: set() for name in self.rules}
+        changed = True
+        while changed:
+            changed = False
+            for name, alternatives in self.rules.items():
+                for alternative in alternatives:
+                    symbols = self.__first_of(alternative, first)
+                    if not symbols <= first[name]:
+                        first[name] |= symbols
+                        changed = True
+        return {name: frozenset(symbols) for name, symbols in first.items()}
+
+    def follow(self, start: str = 'program') -> Dict[str, FrozenSet[str]]:
+        """
+        Computes the FOLLOW set of every rule, from the start rule.
+        """
+        first = self.first()
+        follow: Dict[str, Set[str]] = {name: set() for name in self.rules}
+        follow[start].add('eof')
+        changed = True
+        while changed:
+            changed = False
+            for name, alternatives in self.rules.items():
+                for alternative in alternatives:
+                    changed = self.__follow_of(alternative, follow[name], first, follow) or changed
+        return {name: frozenset(symbols) for name, symbols in follow.items()}
+
+    def dispatch(self, name: str) -> Dict[str, Tuple[str, ...]]:
+        """
+        Maps each token that can start the rule to the productions it can start, in definition order.
+        Alternatives that are a single rule made only of alternatives are expanded, other alternatives are named
+        after the single rule or lexical token they consist of, or else after the dispatched rule itself.
+        """
+        first = self.first()
+        table: Dict[str, List[str]] = {}
+
+        def add(production: str, alternative: Expression):
+            for token in sorted(self.__first_of(alternative, first) - {''}):
+                if production not in table.setdefault(token, []):
+                    table[token].append(production)
+
+        def expand(rule: str, alternatives: List[Expression]):
+            for alternative in alternatives:
+                kind, value = alternative
+                if kind == 'rule' and isinstance(value, str) and self.__is_alternation(value):
+                    expand(value, self.rules[value])
+                elif isinstance(value, str) and (kind == 'rule' or value in LEXICAL_RULES):
+                    add(value, alternative)
+                else:
+                    add(rule, alternative)
+
+        expand(name, self.rules[name])
+        return {token: tuple(productions) for token, productions in table.items()}
+
+    def __is_alternation(self, name: str) -> bool:
+        return name not in LEXICAL_RULES and len(self.rules[name]) > 1 and \
+            all(kind == 'rule' and value not in LEXICAL_RULES for kind, value in self.rules[name])
+
+    def __first_of(self, expression: Expression, first: Mapping[str, AbstractSet[str]]) -> Set[str]:
+        kind = expression[0]
+        if kind == 'terminal':
+            return {_name(expression)}
+        elif kind == 'rule':
+            return set(first[_name(expression)])
+        elif kind == 'optional' or kind == 'repetition':
+            return self.__first_of(_operand(expression), first) | {''}
+        elif kind == 'alternation':
+            return set().union(*(self.__first_of(item, first) for item in _items(expression)))
+        else:  # sequence
+            symbols: Set[str] = {''}
+            for item in _items(expression):
+                if '' not in symbols:
+                    break
+                symbols = (symbols - {''}) | self.__first_of(item, first)
+            return symbols
+
+    # Adds FOLLOW symbols for the rules within the expression, given what can follow the expression.
+    def __follow_of(self, expression: Expression, after: Set[str], first: Mapping[str, AbstractSet[str]],
+                    follow: Dict[str, Set[str]]) -> bool:
+        kind = expression[0]
+        changed = False
+        if kind == 'rule':
+            name = _name(expression)
+            if not after <= follow[name]:
+                follow[name] |= after
+                changed = True
+        elif kind == 'optional':
+            changed = self.__follow_of(_operand(expression), after, first, follow)
+        elif kind == 'repetition':
+            # a repeated expression can be followed by itself
+            after = after | (self.__first_of(_operand(expression), first) - {''})
+            changed = self.__follow_of(_operand(expression), after, first, follow)
+        elif kind == 'alternation':
+            for item in _items(expression):
+                changed = self.__follow_of(item, after, first, follow) or changed
+        elif kind == 'sequence':
+            for item in reversed(_items(expression)):
+                changed = self.__follow_of(item, after, first, follow) or changed
+                item_first = self.__first_of(item, first)
+                after = (item_first - {''}) | after if '' in item_first else item_first
+        return changed
+
+    def __check_references(self, name: str, expression: Expression):
+        kind = expression[0]
+        if kind == 'rule' and _name(expression) not in self.rules:
+            raise GrammarError(f'rule {name} references undefined rule {_name(expression)}')
+        elif kind in ('sequence', 'alternation'):
+            for item in _items(expression):
+                self.__check_references(name, item)
+        elif kind in ('optional', 'repetition'):
+            self.__check_references(name, _operand(expression))
+
+    __token_regex = re.compile(r'\s+|\(\*.*?\*\)|(?P<token>"[^"]*"|\'[^\']*\'|[A-Za-z_]+|[=;|\[\]{}(),])', re.DOTALL)
+
+    def __tokenize(self, source: str) -> List[str]:
+        tokens: List[str] = []
+        position = 0
+        while position < len(source):
+            matched = self.__token_regex.match(source, position)
+            if matched is None:
+                raise GrammarError(f'unexpected character {repr(source[position])} at {position}')
+            if matched.group('token') is not None:
+                tokens.append(matched.group('token'))
+            position = matched.end()
+        return tokens
+
+    def __peek(self) -> str:
+        return self.__tokens[self.__index] if self.__index < len(self.__tokens) else ''
+
+    def __next(self) -> str:
+        token = self.__peek()
+        self.__index += 1
+        return token
+
+    def __expect(self, token: str):
+        if self.__next() != token:
+            raise GrammarError(f'expected {token} (got {repr(self.__tokens[self.__index - 1])})')
+
+    def __parse_alternatives(self) -> List[Expression]:
+        alternatives = [self.__parse_sequence()]
+        while self.__peek() == '|':
+            self.__next()
+            alternatives.append(self.__parse_sequence())
+        return alternatives
+
+    def __parse_sequence(self) -> Expression:
+        items: List[Expression] = []
+        while self.__peek() not in ('', '|', ';', ')', ']', '}'):
+            items.append(self.__parse_item())
+        return items[0] if len(items) == 1 else ('sequence', items)
+
+    def __parse_item(self) -> Expression:
+        token = self.__next()
+        closing = {'(': ')', '[': ']', '{': '}'}
+        if token in closing:
+            alternatives = self.__parse_alternatives()
+            self.__expect(closing[token])
+            expression = alternatives[0] if len(alternatives) == 1 else ('alternation', alternatives)
+            return {'(': expression, '[': ('optional', expression), '{': ('repetition', expression)}[token]
+        elif token[0] in '"\'':
+            return ('terminal', token[1:-1])
+        elif not (token[0].isalpha() or token[0] == '_'):
+            raise GrammarError(f'unexpected {repr(token)}')
+        elif token == 'EOF':
+            return ('terminal', 'eof')
+        elif token.isupper():
+            return ('terminal', token)  # character class, only used by lexical rules
+        elif token in LEXICAL_RULES:
+            return ('terminal', token)
+        else:
+            return ('rule', token)
+
+
+def generate(grammar: Grammar, source_name: str) -> str:
+    """
+    Emits the parser tables module for the grammar.
+    """
+    def format_set(symbols: FrozenSet[str]) -> str:
+        return 'frozenset({' + ', '.join(repr(symbol) for symbol in sorted(symbols)) + '})'
+
+    first, follow = grammar.first(), grammar.follow()
+    lines = [
+        f'# Generated from {source_name} by `python -m mattylang.grammar`, do not edit.',
+        'from typing import Dict, FrozenSet, Tuple',
+        '',
+        '# FIRST set of each rule (\'\' marks a nullable rule)',
+        'FIRST: Dict[str, FrozenSet[str]] = {',
+        *(f'    {repr(name)}: {format_set(first[name])},' for name in grammar.rules if name not in LEXICAL_RULES),
+        '}',
+        '',
+        '# FOLLOW set of each rule',
+        'FOLLOW: Dict[str, FrozenSet[str]] = {',
+        *(f'    {repr(name)}: {format_set(follow[name])},' for name in grammar.rules if name not in LEXICAL_RULES),
+        '}',
+        '',
+        '# token -> productions it can start, for each dispatched rule',
+        'DISPATCH: Dict[str, Dict[str, Tuple[str, ...]]] = {',
+    ]
+    for name in DISPATCHED_RULES:
+        lines.append(f'    {repr(name)}: {{')
+        for token, productions in sorted(grammar.dispatch(name).items()):
+            lines.append(f'        {repr(token)}: {repr(productions)},')
+        lines.append('    },')
+    lines += [
+        '}',
+        '',
+        '# binary operator -> precedence level, higher binds tighter',
+        'BINARY_PRECEDENCE: Dict[str, int] = {',
+        *(f'    {repr(operator)}: {precedence},' for operator, precedence in BINARY_PRECEDENCE.items()),
+        '}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    source_name = sys.argv[1] if len(sys.argv) > 1 else 'docs/grammar.ebnf'
+    output = sys.argv[2] if len(sys.argv) > 2 else 'mattylang/parser_tables.py'
+    with open(source_name, 'r') as fd:
+        grammar = Grammar(fd.read())
+    with open(output, 'w') as fd:
+        fd.write(generate(grammar, source_name))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,614 @@
+from bisect import bisect_left, bisect_right
+from typing import cast, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from mattylang import CompileResult
+from mattylang.ast import *
+from mattylang.diagnostics import Diagnostic, DiagnosticKind, Diagnostics
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+from mattylang.symbols import Symbol
+from mattylang.visitor import AbstractVisitor, operator_postorder
+from mattylang.visitors.binder import Binder
+from mattylang.visitors.checker import Checker
+from mattylang.visitors.emitter import Emitter, PythonSafeVariableRenamer
+
+
+class PositionShifter(AbstractVisitor):
+    """
+    Shifts the position of every node in a subtree, used to reuse subtrees that follow an edit. The nodes are collected
+    once, so the subtree is shifted again (after later edits) by a loop over them rather than a walk.
+    """
+
+    def __init__(self, node: AbstractNode):
+        super().__init__()
+        self.nodes: List[AbstractNode] = []
+        node.accept(self)
+
+    def shift(self, delta: int):
+        for node in self.nodes:
+            node.position += delta
+
+    def collect(self, node: AbstractNode):
+        self.nodes.append(node)
+
+    def visit_chunk(self, node: ChunkNode):
+        self.collect(node)
+        super().visit_chunk(node)
+
+    def visit_variable_definition(self, node: VariableDefinitionNode):
+        self.collect(node)
+        super().visit_variable_definition(node)
+
+    def visit_variable_assignment(self, node: VariableAssignmentNode):
+        self.collect(node)
+        super().visit_variable_assignment(node)
+
+    def visit_if_statement(self, node: IfStatementNode):
+        self.collect(node)
+        super().visit_if_statement(node)
+
+    def visit_while_statement(self, node: WhileStatementNode):
+        self.collect(node)
+        super().visit_while_statement(node)
+
+    def visit_break_statement(self, node: BreakStatementNode):
+        self.collect(node)
+
+    def visit_continue_statement(self, node: ContinueStatementNode):
+        self.collect(node)
+
+    def visit_function_definition(self, node: FunctionDefinitionNode):
+        self.collect(node)
+        super().visit_function_definition(node)
+
+    def visit_function_parameter(self, node: FunctionParameterNode):
+        self.collect(node)
+        super().visit_function_parameter(node)
+
+    def visit_return_statement(self, node: ReturnStatementNode):
+        self.collect(node)
+        super().visit_return_statement(node)
+
+    def visit_call_statement(self, node: CallStatementNode):
+        self.collect(node)
+        super().visit_call_statement(node)
+
+    def visit_nil_literal(self, node: NilLiteralNode):
+        self.collect(node)
+
+    def visit_bool_literal(self, node: BoolLiteralNode):
+        self.collect(node)
+
+    def visit_real_literal(self, node: RealLiteralNode):
+        self.collect(node)
+
+    def visit_string_literal(self, node: StringLiteralNode):
+        self.collect(node)
+
+    def visit_identifier(self, node: IdentifierNode):
+        self.collect(node)
+
+    def visit_call_expression(self, node: CallExpressionNode):
+        self.collect(node)
+        super().visit_call_expression(node)
+
+    def visit_unary_expression(self, node: UnaryExpressionNode):
+        self.__collect_operations(node)
+
+    def visit_binary_expression(self, node: BinaryExpressionNode):
+        self.__collect_operations(node)
+
+    # collects unary and binary expressions without recursion (see operator_postorder)
+    def __collect_operations(self, node: ExpressionNode):
+        for expression in operator_postorder(node):
+            if type(expression) in (UnaryExpressionNode, BinaryExpressionNode):
+                self.collect(expression)
+            else:
+                expression.accept(self)
+
+    def visit_any_type(self, node: AnyTypeNode):
+        self.collect(node)
+
+    def visit_nil_type(self, node: NilTypeNode):
+        self.collect(node)
+
+    def visit_bool_type(self, node: BoolTypeNode):
+        self.collect(node)
+
+    def visit_real_type(self, node: RealTypeNode):
+        self.collect(node)
+
+    def visit_string_type(self, node: StringTypeNode):
+        self.collect(node)
+
+    def visit_function_type(self, node: FunctionTypeNode):
+        self.collect(node)
+        super().visit_function_type(node)
+
+
+class _Slot:
+    """
+    A top-level statement (or a failed attempt at one), with the diagnostics emitted while parsing it. The indices of
+    its first diagnostic and statement are encoded around the gap like its position (see IncrementalParser), base is
+    the position its nodes and diagnostics were last shifted to.
+    """
+
+    __slots__ = ('statement', 'diagnostics', 'diagnostic_index', 'statement_index', 'base', 'shifter')
+
+    def __init__(self, statement: Optional[StatementNode], diagnostics: List[Diagnostic], diagnostic_index: int,
+                 statement_index: int, base: int):
+        self.statement = statement
+        self.diagnostics = diagnostics
+        self.diagnostic_index = diagnostic_index
+        self.statement_index = statement_index
+        self.base = base
+        self.shifter: Optional[PositionShifter] = None  # collected the first time the statement is shifted
+
+
+class IncrementalParser:
+    """
+    Parses a module's top-level statements, and reparses only the statements an edit touches.
+    Statements that follow an edit are reused once the token stream resynchronizes. Like the line map, the slots keep
+    a gap at the last edit: a slot before the gap stores its position and the indices of its first diagnostic and
+    statement from the start, a slot after the gap stores them from the end (of the source, the diagnostics and the
+    statements). An edit thus updates the slots it touches and those between it and the previous edit, not the slots
+    that follow it. Node positions are absolute though, so parse() shifts the nodes of the statements edits moved,
+    once however many edits moved them: reading the tree after an edit remains linear in the statements after it.
+    Only syntax is maintained incrementally, see IncrementalCompiler for semantic analysis and code generation.
+    """
+
+    def __init__(self, module: Module):
+        self.module = module
+        self.diagnostics: List[Diagnostic] = []  # the syntax diagnostics, in the order a full parse emits them
+        self.__program = ProgramNode(0, ChunkNode(0, []))
+        self.__slots: List[_Slot] = []
+        self.__positions: List[int] = []  # the position of each slot, encoded around the gap
+        self.__gap = 0  # index of the first slot encoded from the end
+        self.__shifted = 0  # index of the first slot whose statement may need shifting
+        self.__changed = True  # whether the diagnostics changed since the last parse
+        self.__reparse(0, 0, 0)
+
+    def parse(self) -> ProgramNode:
+        """
+        Returns the syntax tree, shifting the statements moved by the edits since the last parse, and replaces the
+        module's diagnostics with the syntax diagnostics if they changed.
+        """
+        slots = self.__slots
+        for index in range(self.__shifted, len(slots)):
+            slot = slots[index]
+            delta = self.__get_position(index) - slot.base
+            if delta != 0:
+                if slot.shifter is None and slot.statement is not None:
+                    slot.shifter = PositionShifter(slot.statement)
+                if slot.shifter is not None:
+                    slot.shifter.shift(delta)
+                for diagnostic in slot.diagnostics:
+                    diagnostic.position += delta
+                slot.base += delta
+        self.__shifted = len(slots)
+
+        program = self.__program
+        program.position = program.chunk.position = self.__get_position(0) if len(slots) > 0 \
+            else len(self.module.source)
+        if self.__changed:
+            self.module.diagnostics.replace(self.diagnostics)
+            self.__changed = False
+        return program
+
+    def apply_edit(self, start: int, end: int, text: str):
+        """
+        Replaces source[start:end] with text and reparses the statements the edit touches (see parse).
+        """
+        # restart one statement before the edit: a statement's last expression can extend into the next statement
+        restart = max(self.__find(start) - 2, 0)
+        position = self.__get_position(restart) if restart > 0 else 0
+
+        # statements starting after the edit can be reused once reparsing reaches them
+        reusable = min(max(self.__find(end), restart + 1), len(self.__slots))
+        self.__move_gap(reusable)
+
+        self.module.apply_edit(start, end, text)
+        self.__reparse(restart, position, reusable, minimum=start + len(text))
+
+    # reparses from position, replacing the slots from restart until a slot from reusable (past the gap) is reached
+    def __reparse(self, restart: int, position: int, reusable: int, minimum: int = 0):
+        module = self.module
+        slots, positions, statements = self.__slots, self.__positions, self.__program.chunk.statements
+        length = len(module.source)
+        first_diagnostic = self.__get_diagnostic_index(restart) if restart > 0 else 0  # the prologue is reparsed
+        first_statement = self.__get_statement_index(restart)
+
+        diagnostics, module.diagnostics = module.diagnostics, Diagnostics(module.verbose)
+        lexer = Lexer(module, position=position)
+        parser = Parser(lexer)
+        parsed: List[_Slot] = []
+        parsed_statements: List[StatementNode] = []
+        resume = len(slots)
+
+        token = lexer.peek()
+        mark = len(module.diagnostics)
+        # diagnostics emitted before the first statement are part of the prologue, or else of the previous slot
+        first_mark = 0 if restart == 0 else mark
+        candidate = reusable
+        while token.kind != 'eof':
+            if token.position >= minimum:  # reused slots are encoded from the end, which the edit did not move
+                candidate = bisect_left(positions, token.position - length, candidate)
+                if candidate < len(slots) and positions[candidate] == token.position - length:
+                    resume = candidate
+                    break
+
+            start = token.position
+            statement = parser.parse_statement()
+            token = lexer.peek()
+            parsed.append(_Slot(statement, module.diagnostics[mark:], first_diagnostic + mark - first_mark,
+                                first_statement + len(parsed_statements), start))
+            if statement is not None:
+                parsed_statements.append(statement)
+            mark = len(module.diagnostics)
+        parsed_diagnostics, module.diagnostics = module.diagnostics[first_mark:], diagnostics
+
+        # splice the reparsed slots in, the reused slots' encoding stays valid
+        last_diagnostic, last_statement = self.__get_diagnostic_index(resume), self.__get_statement_index(resume)
+        self.__changed |= len(parsed_diagnostics) > 0 or last_diagnostic > first_diagnostic
+        self.diagnostics[first_diagnostic:last_diagnostic] = parsed_diagnostics
+        statements[first_statement:last_statement] = parsed_statements
+        for statement in parsed_statements:
+            statement.parent = self.__program.chunk
+        slots[restart:resume] = parsed
+        positions[restart:resume] = [slot.base for slot in parsed]
+        self.__gap = restart + len(parsed)
+        self.__shifted = min(self.__shifted, self.__gap)
+
+    # the index of the first slot at or after position
+    def __find(self, position: int) -> int:
+        positions, gap, length = self.__positions, self.__gap, len(self.module.source)
+        if gap < len(positions) and positions[gap] + length < position:
+            return bisect_left(positions, position - length, gap + 1)
+        return bisect_left(positions, position, 0, gap)
+
+    def __get_position(self, index: int) -> int:
+        return self.__positions[index] + (len(self.module.source) if index >= self.__gap else 0)
+
+    def __get_diagnostic_index(self, index: int) -> int:
+        if index == len(self.__slots):
+            return len(self.diagnostics)
+        return self.__slots[index].diagnostic_index + (len(self.diagnostics) if index >= self.__gap else 0)
+
+    def __get_statement_index(self, index: int) -> int:
+        statements = self.__program.chunk.statements
+        if index == len(self.__slots):
+            return len(statements)
+        return self.__slots[index].statement_index + (len(statements) if index >= self.__gap else 0)
+
+    # moves the gap before the slot at index, re-encoding the slots in between
+    def __move_gap(self, index: int):
+        slots, positions, gap = self.__slots, self.__positions, self.__gap
+        lengths = len(self.module.source), len(self.diagnostics), len(self.__program.chunk.statements)
+        sign = -1 if index < gap else 1
+        length, diagnostics, statements = (sign * length for length in lengths)
+        for i in range(min(index, gap), max(index, gap)):
+            positions[i] += length
+            slot = slots[i]
+            slot.diagnostic_index += diagnostics
+            slot.statement_index += statements
+        self.__gap = index
+
+
+class _Nodes(AbstractVisitor):
+    """
+    Collects the chunks and identifiers of a statement, which are unbound before the statement is bound again, and its
+    chunks and expressions, which are untyped before the statement is checked again.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[ChunkNode] = []
+        self.identifiers: List[IdentifierNode] = []
+        self.expressions: List[ExpressionNode] = []
+
+    def visit_chunk(self, node: ChunkNode):
+        self.chunks.append(node)
+        super().visit_chunk(node)
+
+    def visit_nil_literal(self, node: NilLiteralNode):
+        self.expressions.append(node)
+
+    def visit_bool_literal(self, node: BoolLiteralNode):
+        self.expressions.append(node)
+
+    def visit_real_literal(self, node: RealLiteralNode):
+        self.expressions.append(node)
+
+    def visit_string_literal(self, node: StringLiteralNode):
+        self.expressions.append(node)
+
+    def visit_identifier(self, node: IdentifierNode):
+        self.identifiers.append(node)
+        self.expressions.append(node)
+
+    def visit_call_expression(self, node: CallExpressionNode):
+        self.expressions.append(node)
+        super().visit_call_expression(node)
+
+    def visit_unary_expression(self, node: UnaryExpressionNode):
+        self.__collect_operations(node)
+
+    def visit_binary_expression(self, node: BinaryExpressionNode):
+        self.__collect_operations(node)
+
+    # collects unary and binary expressions without recursion (see operator_postorder)
+    def __collect_operations(self, node: ExpressionNode):
+        for expression in operator_postorder(node):
+            if type(expression) in (UnaryExpressionNode, BinaryExpressionNode):
+                self.expressions.append(expression)
+            else:
+                expression.accept(self)
+
+
+# (name, extern, whether a function) -> type of a referenced symbol
+Dependencies = Dict[Tuple[str, bool, bool], Optional[TypeNode]]
+
+
+class _Unit:
+    """
+    The memoized analysis of a top-level statement: the type of the symbol it defines, the types of the program's
+    symbols it referenced when it was checked, its diagnostics (positioned relative to the statement), and for
+    functions, the emitted code with the (original, emitted) names of the program's symbols it referenced.
+    """
+
+    def __init__(self, type: Optional[TypeNode], dependencies: Dependencies,
+                 diagnostics: List[Tuple[DiagnosticKind, str, int]]):
+        self.type = type
+        self.dependencies = dependencies
+        self.diagnostics = diagnostics
+        self.code: Optional[str] = None
+        self.names: Optional[FrozenSet[Tuple[str, str]]] = None
+
+
+class IncrementalCompiler:
+    """
+    Compiles a module, then recompiles it after edits reusing the analysis of the top-level statements. Syntax is
+    maintained by an IncrementalParser and the program is bound again on every compile, while checking and emitting
+    are memoized per top-level statement, keyed by its source text:
+    - a statement is checked again if it is new, or if a symbol of the program it references was removed, redefined
+      as another kind of symbol or changed type since it was checked (so editing a function's body only checks its
+      callers again if its type changes). Checking a mutually recursive function checks the statements reaching it
+      again, as the types inferred for the cycle depend on which function is checked first,
+    - a function is emitted again if it is new, if the emitted name of a symbol of the program it references changed,
+      or if it renames its own variables (renaming is allocated across the program). Other statements are emitted
+      on every compile, they share the program's namespace.
+    The nodes the compile did not check or emit keep the types their last check inferred.
+    """
+
+    def __init__(self, module: Module):
+        self.module = module
+        self.parser = IncrementalParser(module)
+        self.checked = 0  # number of top-level statements checked by the last compile
+        self.emitted = 0  # number of top-level functions emitted by the last compile
+        self.__units: Dict[str, _Unit] = {}  # source text of a top-level statement -> analysis
+        self.__nodes: Dict[StatementNode, _Nodes] = {}  # top-level statement -> nodes to unbind
+
+    def apply_edit(self, start: int, end: int, text: str):
+        """
+        Replaces source[start:end] with text, the module is recompiled by the next compile.
+        """
+        self.parser.apply_edit(start, end, text)
+
+    def compile(self) -> CompileResult:
+        module = self.module
+        program = self.parser.parse()
+        result = CompileResult(module, program)
+        self.checked = self.emitted = 0
+        module.diagnostics.replace(self.parser.diagnostics)
+        if module.diagnostics.limit_reached():
+            return result
+
+        statements = program.chunk.statements
+        program.chunk.scope = None  # the parser reuses the program's chunk
+        self.__unbind(statements)
+        for symbol in module.globals.slots:
+            symbol.references.clear()  # bound again below, along with the program's symbols
+        module.diagnostics.next_set()
+        program.accept(Binder(module))
+        module.diagnostics.next_set()
+        if module.diagnostics.limit_reached():
+            return result
+
+        source = cast(str, module.source)
+        positions = [statement.position for statement in statements]
+        keys = [source[position:end] for position, end in zip(positions, positions[1:] + [len(source)])]
+        references = self.__get_references(program, positions)
+        units = self.__check(statements, positions, keys, references)
+        self.__units = {key: unit for key, unit in zip(keys, units)}
+
+        for position, unit in zip(positions, units):
+            for kind, message, offset in unit.diagnostics:
+                module.diagnostics.emit_diagnostic(kind, message, position + offset)
+        module.diagnostics.next_set()
+
+        if not module.diagnostics.has_error():
+            module.diagnostics.next_set()
+            result.code = self.__emit(program, units, references)
+        return result
+
+    def __unbind(self, statements: List[StatementNode]):
+        nodes: Dict[StatementNode, _Nodes] = {}
+        for statement in statements:
+            collected = self.__nodes.get(statement)
+            if collected is None:
+                collected = _Nodes()
+                statement.accept(collected)
+            else:
+                for chunk in collected.chunks:
+                    chunk.scope = None
+                for identifier in collected.identifiers:
+                    identifier.symbol = None
+            nodes[statement] = collected
+        self.__nodes = nodes
+
+    # the program's symbols (and externs) referenced by each top-level statement
+    def __get_references(self, program: ProgramNode, positions: List[int]) -> List[Set[Symbol]]:
+        references: List[Set[Symbol]] = [set() for _ in positions]
+        if len(positions) == 0:
+            return references
+        for scope in (self.module.globals, program.chunk.get_scope()):
+            for symbol in scope.slots:
+                for identifier in symbol.references:
+                    references[bisect_right(positions, identifier.position) - 1].add(symbol)
+        return references
+
+    # checks the statements without a valid analysis, until the types of the symbols they define stop invalidating
+    # the analysis of other statements
+    def __check(self, statements: List[StatementNode], positions: List[int], keys: List[str],
+                references: List[Set[Symbol]]) -> List[_Unit]:
+        module = self.module
+        memoized = [self.__units.get(key) for key in keys]
+        dirty = {index for index, unit in enumerate(memoized) if unit is None}
+        for statement, unit in zip(statements, memoized):
+            if unit is not None:
+                self.__define(statement, unit.type)
+
+        callees = self.__get_callees(statements, references)
+        callers: List[List[int]] = [[] for _ in statements]
+        for index, functions in enumerate(callees):
+            for function in functions:
+                callers[function].append(index)
+
+        spread: Set[int] = set()
+        while True:
+            # the types of mutually recursive functions depend on which one is checked first, so the statements
+            # reaching a checked one are checked again, in order
+            for index in sorted(dirty - spread):
+                spread.add(index)
+                reaching = self.__reachable(index, callers)
+                if len((reaching & self.__reachable(index, callees)) - {index}) > 0:
+                    dirty |= reaching
+                    spread |= reaching
+
+            checker = Checker(module)
+            for index, statement in enumerate(statements):
+                symbol = self.__get_symbol(statement)
+                if index in dirty:
+                    self.__untype(statement)
+                elif symbol is not None and isinstance(statement, FunctionDefinitionNode):
+                    checker.assume(symbol)
+
+            diagnostics, module.diagnostics = module.diagnostics, Diagnostics(module.verbose)
+            try:
+                for index in sorted(dirty):
+                    statements[index].accept(checker)
+            finally:
+                diagnostics, module.diagnostics = module.diagnostics, diagnostics
+
+            invalid = {index for index, unit in enumerate(memoized)
+                       if index not in dirty and cast(_Unit, unit).dependencies != self.__dependencies(references[index])}
+            if len(invalid) == 0:
+                break
+            dirty |= invalid
+
+        self.checked = len(dirty)
+        checked: Dict[int, List[Tuple[DiagnosticKind, str, int]]] = {index: [] for index in dirty}
+        for diagnostic in diagnostics:
+            index = max(bisect_right(positions, diagnostic.position) - 1, 0)
+            checked[index].append((diagnostic.kind, diagnostic.message, diagnostic.position - positions[index]))
+
+        units: List[_Unit] = []
+        for index, statement in enumerate(statements):
+            unit = memoized[index]
+            if index in dirty:
+                symbol = self.__get_symbol(statement)
+                unit = _Unit(symbol.type if symbol is not None else None,
+                             self.__dependencies(references[index]), checked[index])
+            units.append(cast(_Unit, unit))
+        return units
+
+    # renames and emits the program, emitting the functions without valid code, then restores the renamed names
+    def __emit(self, program: ProgramNode, units: List[_Unit], references: List[Set[Symbol]]) -> str:
+        module = self.module
+        statements = program.chunk.statements
+        renamer = PythonSafeVariableRenamer(module)
+        emitted: Set[int] = set()
+
+        diagnostics, module.diagnostics = module.diagnostics, Diagnostics(module.verbose)
+        try:
+            renamer.enter_chunk(program.chunk)  # renames the program's declarations
+            originals = {symbol: name for symbol, name in renamer.renamed}
+
+            for index, (statement, unit) in enumerate(zip(statements, units)):
+                names = None
+                if isinstance(statement, FunctionDefinitionNode):
+                    names = frozenset((originals.get(symbol, symbol.name), symbol.name) for symbol in references[index])
+                    if unit.code is not None and unit.names == names:
+                        continue
+                renamed = len(renamer.renamed)
+                statement.accept(renamer)
+                emitted.add(index)
+                unit.code, unit.names = None, names if len(renamer.renamed) == renamed else None
+            renamer.exit_chunk(program.chunk)
+        finally:
+            diagnostics, module.diagnostics = module.diagnostics, diagnostics
+        for diagnostic in diagnostics:
+            module.diagnostics.emit_diagnostic(diagnostic.kind, diagnostic.message, diagnostic.position)
+        module.diagnostics.next_set()
+
+        code: List[str] = []
+        for index, (statement, unit) in enumerate(zip(statements, units)):
+            if index in emitted:
+                emitter = Emitter(module)
+                statement.accept(emitter)
+                code.append(str(emitter))
+                if unit.names is not None:
+                    unit.code = code[-1]
+            else:
+                code.append(cast(str, unit.code))
+        self.emitted = sum(isinstance(statements[index], FunctionDefinitionNode) for index in emitted)
+
+        for symbol, name in reversed(renamer.renamed):
+            symbol.rename(name)  # the syntax tree is bound again by the next compile
+        return '\n'.join(code) if len(statements) > 0 else 'pass'
+
+    # the top-level functions referenced by each top-level statement, by index
+    @staticmethod
+    def __get_callees(statements: List[StatementNode], references: List[Set[Symbol]]) -> List[List[int]]:
+        functions = {statement: index for index, statement in enumerate(statements)
+                     if isinstance(statement, FunctionDefinitionNode)}
+        return [[functions[symbol.node] for symbol in symbols if symbol.node in functions] for symbols in references]
+
+    # the statements reachable from a statement through the edges (excluding the statement, unless on a cycle)
+    @staticmethod
+    def __reachable(index: int, edges: List[List[int]]) -> Set[int]:
+        reached: Set[int] = set()
+        stack = list(edges[index])
+        while len(stack) > 0:
+            other = stack.pop()
+            if other not in reached:
+                reached.add(other)
+                stack.extend(edges[other])
+        return reached
+
+    @staticmethod
+    def __dependencies(symbols: Set[Symbol]) -> Dependencies:
+        return {(symbol.name, symbol.extern, isinstance(symbol.node, FunctionDefinitionNode)): symbol.type
+                for symbol in symbols}
+
+    @staticmethod
+    def __get_symbol(statement: StatementNode) -> Optional[Symbol]:
+        if isinstance(statement, (VariableDefinitionNode, FunctionDefinitionNode)):
+            return statement.identifier.symbol
+        return None
+
+    # resets what the checker infers, as a failed check (e.g., of an undefined reference) leaves it unset
+    def __untype(self, statement: StatementNode):
+        self.__define(statement, None)
+        nodes = self.__nodes[statement]
+        for chunk in nodes.chunks:
+            chunk.return_type = None
+        for expression in nodes.expressions:
+            expression.type = None
+
+    @staticmethod
+    def __define(statement: StatementNode, type: Optional[TypeNode]):
+        if isinstance(statement, (VariableDefinitionNode, FunctionDefinitionNode)) \
+                and statement.identifier.symbol is not None:
+            statement.identifier.symbol.type = statement.identifier.type = type
@@ -1,11 +1,14 @@
+import re
 from string import ascii_letters, digits, punctuation, whitespace
-from typing import Callable, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Pattern, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
-    from mattylang.module import Module
+    from mattylang.module import Module, Source
 
 
 class Token:
+    __slots__ = ('kind', 'lexeme', 'position')
+
     def __init__(self, kind: str, lexeme: str, position: int) -> None:
         self.kind = kind
         self.lexeme = lexeme
@@ -23,10 +26,17 @@ class Token:
 
 
 class Lexer:
-    def __init__(self, module: 'Module'):
+    """
+    Scans tokens on demand from the module's source.
+    Whole tokens are matched at once with a single precompiled alternation regex, dispatching on the matched group.
+    Runs of whitespace and comments (trivia) are skipped in a single match, without recursion.
+    """
+
+    def __init__(self, module: 'Module', trivia: bool = False, position: int = 0):
         self.module = module
         self.source = module.source
-        self.__position = 0
+        self.comments: Optional[List[Tuple[int, int]]] = [] if trivia else None  # (start, end) of each comment
+        self.__position = position  # must be at a token boundary
         self.__token: Optional[Token] = None
 
     def token_position(self):
@@ -41,92 +51,115 @@ class Lexer:
         self.__token = self.__scan_impl()
         return self.__token
 
-    __space_set = set(whitespace)
-    __digit_set = set(digits)
-    __id_init_set = set(ascii_letters + '$_')
     __string_char_set = set(ascii_letters + digits + punctuation + ' \t')
     __keyword_set = {'def', 'nil', 'true', 'false', 'if', 'else', 'while',
                      'break', 'continue', 'return', 'Nil', 'Bool', 'Real', 'String'}
     __punctuation = {'(', ')', '{', '}', '=', '!', '+', '-', '*', '/',
                      '%', '<', '>', '==', '!=', '<=', '>=', '||', '&&', ':', '->', ','}
 
+    # alternatives are tried in order, two-character punctuation before single-character punctuation
+    __token_pattern = '|'.join([
+        f'(?P<trivia>(?:[{re.escape(whitespace)}]+|#[^\n]*\n?)+)',
+        r'(?P<word>[A-Za-z$_][A-Za-z0-9$_]*)',
+        r'(?P<real>[0-9]+(?:\.[0-9]*)?|\.[0-9]*)',
+        r'(?P<string>["\'])',
+        '(?P<punctuation>' + '|'.join(map(re.escape, sorted(__punctuation, key=len, reverse=True))) + ')',
+    ])
+
+    # text sources match one character, byte sources match one (possibly multi-byte) UTF-8 sequence
+    __token_regex: Dict[type, Pattern[Any]] = {
+        str: re.compile(__token_pattern + r'|(?P<other>.)', re.DOTALL),
+        bytes: re.compile(__token_pattern.encode() + rb'|(?P<other>[\xc0-\xff][\x80-\xbf]*|.)', re.DOTALL),
+    }
+
+    __comment_regex: Dict[type, Pattern[Any]] = {str: re.compile(r'#[^\n]*'), bytes: re.compile(rb'#[^\n]*')}
+
+    __real_suffix_regex: Dict[type, Pattern[Any]] = {str: re.compile(r'[A-Za-z$_.]'), bytes: re.compile(rb'[A-Za-z$_.]')}
+
+    __string_body_regex: Dict[Any, Pattern[Any]] = {  # keyed by the opening quote, str or bytes
+        '"': re.compile('[' + re.escape(''.join(sorted(__string_char_set - {'"'}))) + ']*'),
+        "'": re.compile('[' + re.escape(''.join(sorted(__string_char_set - {"'"}))) + ']*'),
+        b'"': re.compile(('[' + re.escape(''.join(sorted(__string_char_set - {'"'}))) + ']*').encode()),
+        b"'": re.compile(('[' + re.escape(''.join(sorted(__string_char_set - {"'"}))) + ']*').encode()),
+    }
+
     def __scan_impl(self) -> Token:
-        chr = self.__get_char()
+        kind, position, end = self.__scan_span()
+        return Token(kind, _lexeme_of(self.source, kind, position, end), position)
+
+    # Scans the next token, returning its kind, position and the end of its lexeme.
+    def __scan_span(self) -> Tuple[str, int, int]:
+        source = self.source
         diagnostics = self.module.diagnostics
+        text = isinstance(source, str)
+        source_type = str if text else bytes
+        match = self.__token_regex[source_type].match
         position = self.__position
 
-        if chr == '':  # eof
-            return Token('eof', '', position)
-        elif chr in self.__space_set:  # whitespace
-            # skip whitespace and continue
-            self.__next_char_while(lambda chr: chr in self.__space_set)
-            return self.__scan_impl()
-        elif chr == '#':  # comment
-            # skip comment and continue
-            self.__next_char_while(lambda chr: chr != '\n')
-            self.__next_char()
-            return self.__scan_impl()
-        elif chr in self.__id_init_set:  # keyword/identifier
-            lexeme = self.__collect_lexeme(lambda chr: chr in self.__id_init_set or chr in self.__digit_set)
-            kind = lexeme if lexeme in self.__keyword_set else 'identifier'
-            return Token(kind, lexeme, position)
-        elif chr in self.__digit_set or chr == '.':  # real literal
-            lexeme = self.__collect_lexeme(lambda chr: chr in self.__digit_set)
-            kind = 'real_literal'
-
-            if self.__get_char() == '.':
-                self.__next_char()
-                lexeme = lexeme + '.' + self.__collect_lexeme(lambda chr: chr in self.__digit_set)
-
-            if lexeme == '.':
-                diagnostics.emit_diagnostic('error', f'syntax: expected digits around decimal point', position)
-                return Token('real_literal', '0.0', position)
-
-            if self.__get_char() in self.__id_init_set or self.__get_char() == '.':
-                diagnostics.emit_diagnostic(
-                    'warning', f'syntax: expected whitespace after real literal {lexeme}', position)
-
-            return Token('real_literal', lexeme, position)
-        elif chr == '"' or chr == "'":  # string literal
-            quote = chr
-            self.__next_char()
-            text = self.__collect_lexeme(lambda chr: chr != quote and chr in self.__string_char_set)
-
-            if self.__get_char() != quote:
-                diagnostics.emit_diagnostic(
-                    'error', f'syntax: expected {quote} to terminate string', self.__position)
-            else:
-                self.__next_char()
-
-            return Token('string_literal', text, position)
-        else:  # punctuation/other
-            # greedily matches longest valid punctuation
-            op1 = chr
-            op2 = op1 + self.__next_char()
-            if len(op2) == 2 and op2 in self.__punctuation:
-                self.__next_char()
-                return Token(op2, op2, position)
-            elif op1 in self.__punctuation:
-                return Token(op1, op1, position)
+        while True:
+            matched = match(source, position)
+
+            if matched is None:  # eof
+                self.__position = position
+                return 'eof', position, position
+
+            group, end = matched.lastgroup, matched.end()
+
+            if group == 'trivia':  # skip whitespace/comments and continue
+                if self.comments is not None:
+                    comments = self.__comment_regex[source_type].finditer(source, position, end)
+                    self.comments.extend(comment.span() for comment in comments)
+                position = end
+            elif group == 'word':  # keyword/identifier
+                self.__position = end
+                lexeme = matched.group() if text else matched.group().decode()
+                kind = lexeme if lexeme in self.__keyword_set else 'identifier'
+                return kind, position, end
+            elif group == 'real':  # real literal
+                self.__position = end
+                lexeme = matched.group() if text else matched.group().decode()
+
+                if lexeme == '.':
+                    diagnostics.emit_diagnostic('error', f'syntax: expected digits around decimal point', position)
+                    return 'real_literal', position, end
+
+                if self.__real_suffix_regex[source_type].match(source, end):
+                    diagnostics.emit_diagnostic(
+                        'warning', f'syntax: expected whitespace after real literal {lexeme}', position)
+
+                return 'real_literal', position, end
+            elif group == 'string':  # string literal
+                quote = matched.group()
+                body = self.__string_body_regex[quote].match(source, end)
+                assert body is not None  # the body regex also matches the empty string
+                end = body.end()
+
+                if source[end:end + 1] != quote:
+                    quote = quote if text else quote.decode()
+                    diagnostics.emit_diagnostic('error', f'syntax: expected {quote} to terminate string', end)
+                    self.__position = end
+                else:
+                    self.__position = end + 1
+
+                return 'string_literal', position, end
+            elif group == 'punctuation':
+                self.__position = end
+                return matched.group() if text else matched.group().decode(), position, end
             else:
                 # continue if unexpected character
-                diagnostics.emit_diagnostic('error', f'syntax: unexpected character {repr(op1)}', position)
-                return self.__scan_impl()
-
-    def __get_char(self):
-        return self.source[self.__position] if self.__position < len(self.source) else ''
-
-    def __next_char(self):
-        if self.__position < len(self.source):
-            self.__position += 1
-        return self.__get_char()
-
-    def __next_char_while(self, predicate: Callable[[str], bool]):
-        while self.__position < len(self.source) and predicate(self.__get_char()):
-            self.__next_char()
-        return chr
-
-    def __collect_lexeme(self, predicate: Callable[[str], bool]):
-        start = self.__position
-        self.__next_char_while(predicate)
-        return self.source[start:self.__position]
+                character = matched.group() if text else matched.group().decode(errors='replace')
+                diagnostics.emit_diagnostic('error', f'syntax: unexpected character {repr(character)}', position)
+                position = end if not diagnostics.limit_reached() else len(source)  # stop at eof after too many errors
+
+
+def _lexeme_of(source: 'Source', kind: str, position: int, end: int) -> str:
+    """
+    Recovers the lexeme of a scanned token from the source, given its kind, position and lexeme end.
+    """
+    if kind == 'string_literal':
+        lexeme = source[position + 1:end]  # skip opening quote
+    elif kind == 'real_literal' and end - position == 1 and source[position:end] in ('.', b'.'):
+        return '0.0'  # a lone decimal point is recovered as 0.0
+    else:
+        lexeme = source[position:end]
+    return lexeme if isinstance(lexeme, str) else lexeme.decode()  # byte sources decode only used lexemes
@@ -1,28 +1,66 @@
+from array import array
 from bisect import bisect_right
-from typing import Tuple
+from mmap import mmap
+from typing import Tuple, Union
 
 
 class LineMap:
     """
     A memory-efficient data structure that provides a mapping between character positions and their location (line, column).
     This allows for only the position to be stored per node, reducing complexity and overall memory usage.
+    Byte sources (bytes or mmap) are mapped by byte offset, with columns counted in bytes.
+    Edits leave a gap in the line starts: those before the gap are stored as offsets from the start of the string, those
+    after it as (negative) offsets from its end, so an edit does not shift the lines that follow it.
     """
 
-    # Time Complexity: Θ(len(string))
+    # Time Complexity: Θ(len(string)), each line start is found with a native str.find/bytes.find scan
     # Space Complexity: Θ(count('\n'))
-    def __init__(self, string: str):
-        self.__line_starts = [0] + [i + 1 for i, c in enumerate(string) if c == '\n']
+    def __init__(self, string: Union[str, bytes, mmap]):
+        newline = '\n' if isinstance(string, str) else b'\n'
+        line_starts = array('l', [0])
+        find = string.find
+        position = find(newline)  # type: ignore
+        while position != -1:
+            line_starts.append(position + 1)
+            position = find(newline, position + 1)  # type: ignore
+        self.__line_starts = line_starts
+        self.__length = len(string)
+        self.__gap = len(line_starts)  # index of the first line start stored from the end
+
+    # Time Complexity: O(len(text) + log(count('\n')) + the number of lines between the edit and the previous edit)
+    def apply_edit(self, start: int, end: int, text: str) -> None:
+        first, last = self.get_line(start), self.get_line(end)
+        self.__move_gap(last)
+        inserted = [start + i + 1 for i, c in enumerate(text) if c == '\n']
+        self.__line_starts[first:last] = array('l', inserted)
+        self.__gap = first + len(inserted)
+        self.__length += len(text) - (end - start)
 
     # Time Complexity: Θ(1)
     def get_position(self, line: int, column: int = 1) -> int:
-        return self.__line_starts[line - 1] + (column - 1)
+        return self.__get_line_start(line - 1) + (column - 1)
 
     # Time Complexity: O(log(count('\n')))
     def get_line(self, position: int) -> int:
-        return bisect_right(self.__line_starts, position)
+        line_starts, gap = self.__line_starts, self.__gap
+        if gap < len(line_starts) and position >= line_starts[gap] + self.__length:
+            return bisect_right(line_starts, position - self.__length, gap + 1)
+        return bisect_right(line_starts, position, 0, gap)
 
     # Time Complexity: O(log(count('\n')))
     def get_location(self, position: int) -> Tuple[int, int]:
         line = self.get_line(position)
-        column = 1 + (position - self.__line_starts[line - 1])
+        column = 1 + (position - self.__get_line_start(line - 1))
         return line, column
+
+    def __get_line_start(self, index: int) -> int:
+        return self.__line_starts[index] + (self.__length if index >= self.__gap else 0)
+
+    # moves the gap before the line start at index, re-encoding the line starts in between
+    def __move_gap(self, index: int) -> None:
+        line_starts, gap, length = self.__line_starts, self.__gap, self.__length
+        for i in range(index, gap):
+            line_starts[i] -= length
+        for i in range(gap, index):
+            line_starts[i] += length
+        self.__gap = index
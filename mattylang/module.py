@@ -1,20 +1,47 @@
+import mmap
 from sys import stdout, stderr
-from typing import Optional
+from typing import Optional, Union
 
 from mattylang.diagnostics import Diagnostic, Diagnostics
 from mattylang.linemap import LineMap
 from mattylang.symbols import SymbolTable
 
 
+# A module's source: text, or bytes (e.g., a memory-mapped file) addressed by byte offset.
+Source = Union[str, bytes, mmap.mmap]
+
+
+def map_source(file: str) -> Union[bytes, mmap.mmap]:
+    """
+    Maps a source file into memory read-only, so it is lexed in place rather than read and decoded up front.
+    """
+    with open(file, 'rb') as fd:
+        try:
+            return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            return b''
+
+
 class Module:
-    def __init__(self, file: str, source: str, globals: Optional[SymbolTable] = None, verbose: bool = False):
+    def __init__(self, file: str, source: Source, globals: Optional[SymbolTable] = None, verbose: bool = False,
+                 max_errors: Optional[int] = None):
         self.file = file
         self.source = source
         self.globals = globals if globals is not None else SymbolTable()
         self.verbose = verbose
-        self.diagnostics = Diagnostics(verbose)
+        self.diagnostics = Diagnostics(verbose, max_errors)
         self.line_map = LineMap(source)
 
+    def apply_edit(self, start: int, end: int, text: str) -> None:
+        """
+        Replaces source[start:end] with text, updating the line map in place. The source is copied (natively), the lexer
+        matches its regexes against a single string.
+        """
+        assert isinstance(self.source, str), 'fatal: only text sources can be edited'
+        assert 0 <= start <= end <= len(self.source), f'fatal: invalid edit range [{start}, {end})'
+        self.source = self.source[:start] + text + self.source[end:]
+        self.line_map.apply_edit(start, end, text)
+
     def format_diagnostic(self, diagnostic: Diagnostic):
         line, column = self.line_map.get_location(diagnostic.position)
         return f'{self.file}:{line}:{column}: {diagnostic}'
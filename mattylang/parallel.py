@@ -0,0 +1,134 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import cast, List, Optional, Tuple, Union
+
+from mattylang.ast import *
+from mattylang.diagnostics import Diagnostics, DiagnosticKind
+from mattylang.module import Module
+from mattylang.symbols import SymbolTable
+from mattylang.types import TYPES
+from mattylang.visitors.binder import Binder
+from mattylang.visitors.checker import Checker
+
+CheckedRange = Tuple[bool, List[Tuple[DiagnosticKind, str, int]], List[Tuple[int, TypeNode]]]
+
+_program: Optional[Tuple[Module, ProgramNode]] = None  # the bound program, inherited by forked workers
+
+
+def can_check_in_parallel() -> bool:
+    """
+    Whether the platform can fork workers, which inherit the bound syntax tree rather than receiving a copy of it.
+    """
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def check_in_parallel(module: Module, program: ProgramNode, jobs: int) -> int:
+    """
+    Binds the program, then checks contiguous ranges of its top-level statements in up to jobs worker processes.
+    Each worker checks the statements of its range (and on demand, the functions they depend on), then reports the
+    diagnostics positioned within its range and the types of the symbols its statements define, which are merged
+    back. Only the program's symbols are typed in the checked tree, the nodes the workers checked are left untyped.
+    A worker cannot type the program's variables defined outside of its range (they are typed by checking the
+    statements before them), so if a range references one, the program is checked serially instead. Returns the number
+    of worker processes the program was checked in, 0 if it was checked serially.
+    """
+    global _program
+    program.accept(Binder(module))
+    module.diagnostics.next_set()
+    statements = program.chunk.statements
+    if module.diagnostics.limit_reached() or len(statements) == 0:
+        return 0
+
+    ranges = _partition(module, program, jobs)
+    _program = module, program
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(len(ranges), mp_context=context) as executor:
+            results = list(executor.map(_check_range, ranges))
+    finally:
+        _program = None
+
+    if not all(complete for complete, _, _ in results):
+        program.accept(Checker(module))
+        module.diagnostics.next_set()
+        return 0
+
+    for _, diagnostics, types in results:
+        for kind, message, position in diagnostics:
+            module.diagnostics.emit_diagnostic(kind, message, position)
+        for index, type in types:
+            identifier = cast(Union[VariableDefinitionNode, FunctionDefinitionNode], statements[index]).identifier
+            identifier.type = identifier.symbol.type = TYPES.intern(type)  # type: ignore
+    module.diagnostics.next_set()
+
+    return len(ranges)
+
+
+# splits the top-level statements into contiguous ranges of about the same source length
+def _partition(module: Module, program: ProgramNode, jobs: int) -> List[Tuple[int, int]]:
+    statements = program.chunk.statements
+    start = statements[0].position
+    length = len(module.source) - start
+
+    ranges: List[Tuple[int, int]] = []
+    first = 0
+    for index in range(1, len(statements)):
+        if (statements[index].position - start) * jobs >= length * (len(ranges) + 1):
+            ranges.append((first, index))
+            first = index
+    ranges.append((first, len(statements)))
+    return ranges
+
+
+class _RangeChecker(Checker):
+    """
+    Checks a range of the program's statements, noting references to the program's variables it could not type.
+    """
+
+    def __init__(self, module: Module, scope: SymbolTable, start: int, end: Optional[int]):
+        super().__init__(module)
+        self.complete = True
+        self.__scope, self.__start, self.__end = scope, start, end
+
+    def visit_identifier(self, node: IdentifierNode):
+        super().visit_identifier(node)
+        symbol = node.symbol
+        if node.type is None and symbol is not None and symbol.scope is self.__scope \
+                and not isinstance(symbol.node, FunctionDefinitionNode):
+            position = symbol.get_node().position
+            if position < self.__start or (self.__end is not None and position >= self.__end):
+                self.complete = False
+
+
+def _check_range(range_: Tuple[int, int]) -> CheckedRange:
+    assert _program is not None, 'fatal: workers must be forked from check_in_parallel'
+    module, program = _program
+    statements = program.chunk.statements
+    first, last = range_
+    start = statements[first].position if first > 0 else 0
+    end = statements[last].position if last < len(statements) else None
+
+    # only the errors within the range are merged back, so the worker counts those against the remaining budget
+    budget = module.diagnostics.remaining_errors()
+    errors = checked = 0
+    diagnostics = module.diagnostics = Diagnostics(module.verbose)
+    checker = _RangeChecker(module, cast(SymbolTable, program.chunk.scope), start, end)
+    for statement in statements[first:last]:
+        statement.accept(checker)
+        if budget is not None:
+            errors += sum(diagnostic.kind == 'error' and diagnostic.position >= start and
+                          (end is None or diagnostic.position < end) for diagnostic in diagnostics[checked:])
+            checked = len(diagnostics)
+            if errors >= budget:
+                break
+
+    types: List[Tuple[int, TypeNode]] = []
+    for index in range(first, last):
+        statement = statements[index]
+        if isinstance(statement, (VariableDefinitionNode, FunctionDefinitionNode)):
+            symbol = statement.identifier.symbol
+            if symbol is not None and symbol.type is not None:
+                types.append((index, symbol.type))
+
+    return checker.complete, [(diagnostic.kind, diagnostic.message, diagnostic.position) for diagnostic in diagnostics
+            if diagnostic.position >= start and (end is None or diagnostic.position < end)], types
@@ -1,5 +1,11 @@
+from typing import Any, Callable, Dict
+
 from mattylang.ast import *
-from mattylang.lexer import Lexer
+from mattylang.lexer import Lexer, Token
+from mattylang.parser_tables import BINARY_PRECEDENCE, DISPATCH, FOLLOW
+
+
+_PENDING = object()  # placeholder for an operand that is not parsed yet
 
 
 class Parser:
@@ -7,6 +13,38 @@ class Parser:
         self.module = lexer.module
         self.lexer = lexer
         self.__program: Optional[ProgramNode] = None
+        self.__blocks = 0  # number of enclosing blocks, a '}' only synchronizes within a block
+
+        # bind the productions of the generated dispatch tables to their parse methods
+        statement_parsers: Dict[str, Callable[[], Optional[StatementNode]]] = {
+            'statement': self.__parse_block,
+            'variable_definition': self.__parse_definition,  # or function definition, decided by the next token
+            'if_statement': self.__parse_if_statement,
+            'while_statement': self.__parse_while_statement,
+            'break_statement': self.__parse_break_statement,
+            'continue_statement': self.__parse_continue_statement,
+            'return_statement': self.__parse_return_statement,
+            'variable_assignment': self.__parse_identifier_statement,  # or call statement
+        }
+        primary_parsers: Dict[str, Callable[[Token], ExpressionNode]] = {
+            'nil_literal': self.__parse_nil_literal,
+            'bool_literal': self.__parse_bool_literal,
+            'real_literal': self.__parse_real_literal,
+            'string_literal': self.__parse_string_literal,
+            'identifier': self.__parse_identifier_expression,  # or call expression
+        }
+        type_parsers: Dict[str, Callable[[Token], TypeNode]] = {
+            'function_type': self.__parse_function_type,
+            'nil_type': self.__parse_primitive_type,
+            'bool_type': self.__parse_primitive_type,
+            'real_type': self.__parse_primitive_type,
+            'string_type': self.__parse_primitive_type,
+        }
+        self.__statement_parsers = {kind: statement_parsers[productions[0]]
+                                    for kind, productions in DISPATCH['statement'].items()}
+        self.__primary_parsers = {kind: primary_parsers[productions[0]]
+                                  for kind, productions in DISPATCH['primary_expression'].items()}
+        self.__type_parsers = {kind: type_parsers[productions[0]] for kind, productions in DISPATCH['type'].items()}
 
     def parse(self) -> ProgramNode:
         if self.__program is None:
@@ -14,87 +52,127 @@ class Parser:
             self.__expect('eof', 'to end program')
         return self.__program
 
+    def parse_statement(self) -> Optional[StatementNode]:
+        """
+        Parses a single statement at the current token, used to reparse top-level statements incrementally.
+        """
+        return self.__parse_statement()
+
     __unary_operators = {'!': True, '-': True}
 
-    __binary_operators = {  # precedence levels
-        '&&': 1, '||': 1,
-        '<': 2, '>': 2, '<=': 2, '>=': 2, '==': 2, '!=': 2,
-        '+': 3, '-': 3,
-        '*': 4, '/': 4, '%': 4,
-    }
+    __binary_operators = BINARY_PRECEDENCE
 
     def __parse_program(self) -> ProgramNode:
         start = self.lexer.token_position()
         return ProgramNode(start, self.__parse_chunk(terminator='eof', start=start))
 
     def __parse_statement(self) -> Optional[StatementNode]:
+        parse = self.__statement_parsers.get(self.lexer.peek().kind)
+        if parse is not None:
+            return parse()
+
+        # parse expression as temporaries, to provide more meaningful diagnostics.
         token = self.lexer.peek()
-        start = token.position
-        if token.kind == '{':  # chunk
-            self.lexer.scan()
-            chunk = self.__parse_chunk(terminator='}', start=start)
-            self.__expect('}', 'to close block')
-            return chunk
-        elif token.kind == 'def':  # variable/function definition
-            token = self.lexer.scan()  # skip 'def'
-            identifier = self.__parse_identifier()
+        expression = self.__parse_expression()
+        if expression is None:
+            self.module.diagnostics.emit_diagnostic(
+                'error', f'syntax: unexpected token {token}', token.position)
+            self.lexer.scan()  # skip non-statement/expression token
+            self.__synchronize(token.position)
+            return None
+        else:
+            self.module.diagnostics.emit_diagnostic(
+                'error', f'syntax: unexpected {expression}', expression.position)
+            self.__synchronize(expression.position)
+            return VariableDefinitionNode(expression.position, IdentifierNode(expression.position, '#error'), expression)
+
+    # tokens that can follow a statement, panic-mode recovery resumes parsing at them
+    __synchronizing_tokens = FOLLOW['statement'] - {'identifier', '}'}
+
+    # Panic-mode recovery: skips the tokens following a malformed statement (which started at `start`) without
+    # diagnosing them, until a token that can start or end a statement. An identifier only synchronizes when it is
+    # the first token of its line, otherwise every word of garbage input would start a new malformed statement.
+    def __synchronize(self, start: int):
+        lexer = self.lexer
+        source = self.module.source
+        newline = '\n' if isinstance(source, str) else b'\n'
+        synchronizing_tokens = self.__synchronizing_tokens
+        previous = start
+        token = lexer.peek()
+
+        while token.kind not in synchronizing_tokens:
+            if token.kind == '}' and self.__blocks > 0:
+                break
+            elif token.kind == 'identifier' and source.find(newline, previous, token.position) != -1:  # type: ignore
+                break
+            previous = token.position
+            token = lexer.scan()
+
+    def __parse_block(self) -> StatementNode:
+        start = self.lexer.token_position()
+        self.lexer.scan()  # skip '{'
+        chunk = self.__parse_block_chunk(start)
+        self.__expect('}', 'to close block')
+        return chunk
 
-            if identifier.value == '#error':
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: expected identifier for definition, got {token}', token.position)
+    def __parse_definition(self) -> Optional[StatementNode]:
+        start = self.lexer.token_position()
+        token = self.lexer.scan()  # skip 'def'
+        identifier = self.__parse_identifier()
 
-            token2 = self.lexer.peek()
-            if token2.kind == '=':  # variable definition
-                return self.__parse_variable_definition(identifier, start=start)
-            elif token2.kind == '(':  # function definition
-                return self.__parse_function_definition(identifier, start=start)
-            else:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: expected = or ( for definition, got {token2}', token2.position)
-                return None
-        elif token.kind == 'if':  # if statement
-            return self.__parse_if_statement()
-        elif token.kind == 'while':  # while statement
-            return self.__parse_while_statement()
-        elif token.kind == 'break':  # break statement
-            self.lexer.scan()
-            return BreakStatementNode(token.position)
-        elif token.kind == 'continue':  # continue statement
-            self.lexer.scan()
-            return ContinueStatementNode(token.position)
-        elif token.kind == 'return':  # return statement
-            self.lexer.scan()
-            return ReturnStatementNode(token.position, self.__parse_expression())
-        elif token.kind == 'identifier':  # variable assignment or call expression
-            identifier = self.__parse_identifier()
-            token = self.lexer.peek()
+        if identifier.value == '#error':
+            self.module.diagnostics.emit_diagnostic(
+                'error', f'syntax: expected identifier for definition, got {token}', token.position)
 
-            if token.kind == '=':  # variable assignment
-                return self.__parse_variable_assignment(identifier)
-            elif token.kind == '(':  # call statement
-                call_expression = self.__parse_call_expression(identifier)
-                return CallStatementNode(call_expression.position, call_expression)
-            else:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: unexpected {identifier}', identifier.position)
-                return None
+        token2 = self.lexer.peek()
+        if token2.kind == '=':  # variable definition
+            return self.__parse_variable_definition(identifier, start=start)
+        elif token2.kind == '(':  # function definition
+            return self.__parse_function_definition(identifier, start=start)
         else:
-            # parse expression as temporaries, to provide more meaningful diagnostics.
-            expression = self.__parse_expression()
-            if expression is None:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: unexpected token {token}', token.position)
-                self.lexer.scan()  # skip non-statement/expression token
-            else:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: unexpected {expression}', expression.position)
-                return VariableDefinitionNode(expression.position, IdentifierNode(expression.position, '#error'), expression)
+            self.module.diagnostics.emit_diagnostic(
+                'error', f'syntax: expected = or ( for definition, got {token2}', token2.position)
+            self.__synchronize(start)
+            return None
+
+    def __parse_break_statement(self) -> StatementNode:
+        token = self.lexer.peek()
+        self.lexer.scan()
+        return BreakStatementNode(token.position)
+
+    def __parse_continue_statement(self) -> StatementNode:
+        token = self.lexer.peek()
+        self.lexer.scan()
+        return ContinueStatementNode(token.position)
+
+    def __parse_return_statement(self) -> StatementNode:
+        token = self.lexer.peek()
+        self.lexer.scan()
+        return ReturnStatementNode(token.position, self.__parse_expression())
+
+    # variable assignment or call statement
+    def __parse_identifier_statement(self) -> Optional[StatementNode]:
+        identifier = self.__parse_identifier()
+        token = self.lexer.peek()
+
+        if token.kind == '=':  # variable assignment
+            return self.__parse_variable_assignment(identifier)
+        elif token.kind == '(':  # call statement
+            call_expression = self.__parse_call_expression(identifier)
+            return CallStatementNode(call_expression.position, call_expression)
+        else:
+            self.module.diagnostics.emit_diagnostic(
+                'error', f'syntax: unexpected {identifier}', identifier.position)
+            self.__synchronize(identifier.position)
+            return None
 
     def __parse_chunk(self, terminator: str, start: int):
         statements: List[StatementNode] = []
+        diagnostics = self.module.diagnostics
         token = self.lexer.peek()
 
-        while token.kind != 'eof' and token.kind != terminator:
+        # stop early once too many errors were reported, the enclosing parses unwind without consuming tokens
+        while token.kind != 'eof' and token.kind != terminator and not diagnostics.limit_reached():
             statement = self.__parse_statement()
             if statement is not None:
                 statements.append(statement)
@@ -102,6 +180,12 @@ class Parser:
 
         return ChunkNode(start, statements)
 
+    def __parse_block_chunk(self, start: int):
+        self.__blocks += 1
+        chunk = self.__parse_chunk(terminator='}', start=start)
+        self.__blocks -= 1
+        return chunk
+
     def __parse_variable_definition(self, identifier: IdentifierNode, start: int):
         self.lexer.scan()  # skip '='
         initializer = self.__expect_expression(
@@ -160,7 +244,7 @@ class Parser:
 
         position = self.lexer.token_position()
         if self.__expect('{', 'to open function body'):
-            body = self.__parse_chunk(terminator='}', start=position)
+            body = self.__parse_block_chunk(position)
             self.__expect('}', 'to close function body')
         else:
             body = ChunkNode(position)
@@ -198,43 +282,35 @@ class Parser:
     def __parse_expression(self) -> ExpressionNode | None:
         return self.__parse_binary_expression(0)
 
+    # Parses a primary expression other than a parenthesized expression (handled by __parse_binary_expression).
     def __parse_primary_expression(self) -> ExpressionNode | None:
         token = self.lexer.peek()
+        parse = self.__primary_parsers.get(token.kind)
+        return parse(token) if parse is not None else None
 
-        if token.kind == '(':
-            self.lexer.scan()
-            expression = self.__parse_expression()
-            self.__expect(')', 'to close expression')
-            return expression
+    def __parse_nil_literal(self, token: Token) -> ExpressionNode:
+        self.lexer.scan()
+        return NilLiteralNode(token.position)
 
-        if token.kind == 'nil':
-            self.lexer.scan()
-            return NilLiteralNode(token.position)
-        elif token.kind == 'true':
-            self.lexer.scan()
-            return BoolLiteralNode(token.position, True)
-        elif token.kind == 'false':
-            self.lexer.scan()
-            return BoolLiteralNode(token.position, False)
-        elif token.kind == 'real_literal':
-            self.lexer.scan()
-            try:
-                # lexer invariant: token.lexeme is a valid float
-                return RealLiteralNode(token.position, float(token.lexeme))
-            except ValueError:  # pragma: no cover
-                assert False, f'invalid real literal {token.lexeme}'
-        elif token.kind == 'string_literal':
-            self.lexer.scan()
-            return StringLiteralNode(token.position, token.lexeme)
-        elif token.kind == 'identifier':  # identifier or function call
-            identifier = self.__parse_identifier()
+    def __parse_bool_literal(self, token: Token) -> ExpressionNode:
+        self.lexer.scan()
+        return BoolLiteralNode(token.position, token.kind == 'true')
 
-            if self.lexer.peek().kind == '(':  # function call
-                return self.__parse_call_expression(identifier)
-            else:
-                return identifier
-        else:
-            return None
+    def __parse_real_literal(self, token: Token) -> ExpressionNode:
+        self.lexer.scan()
+        try:
+            # lexer invariant: token.lexeme is a valid float
+            return RealLiteralNode(token.position, float(token.lexeme))
+        except ValueError:  # pragma: no cover
+            assert False, f'invalid real literal {token.lexeme}'
+
+    def __parse_string_literal(self, token: Token) -> ExpressionNode:
+        self.lexer.scan()
+        return StringLiteralNode(token.position, token.lexeme)
+
+    # identifier, or the identifier of a function call (whose arguments __parse_binary_expression parses)
+    def __parse_identifier_expression(self, token: Token) -> ExpressionNode:
+        return self.__parse_identifier()
 
     def __parse_identifier(self) -> IdentifierNode:
         token = self.lexer.peek()
@@ -251,72 +327,130 @@ class Parser:
         self.__expect(')', 'to close function arguments')
         return CallExpressionNode(identifier.position, identifier, arguments)
 
-    def __parse_unary_expression(self) -> ExpressionNode | None:
-        operator = self.lexer.peek()
-
-        if operator.kind in self.__unary_operators:
-            self.lexer.scan()  # skip operator
-            operand = self.__parse_unary_expression()
-            next_token = self.lexer.peek()
-
-            if operand is None:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: expected expression after {operator} (got {next_token})', next_token.position)
-                return None
-
-            expr = UnaryExpressionNode(operator.position, operator.kind, operand)
-            expr.position = operator.position
-            return expr
-        else:
-            return self.__parse_primary_expression()
-
+    # Operator-precedence parsing with an explicit stack instead of recursion, so that deeply nested expressions
+    # (parentheses and unary operators) cost no Python frames. Each stack frame stands for a pending
+    # recursive-descent call awaiting the result of its operand:
+    # - ['binary', precedence, left, operator, next_token]: a binary expression at or above precedence, `left` is
+    #   _PENDING until its first operand is parsed, `operator` is the token whose right operand is being parsed
+    #   and `next_token` the token that followed it
+    # - ['unary', operator]: a unary operator awaiting its operand
+    # - ['parenthesized']: an open parenthesis awaiting its expression and the closing parenthesis
+    # - ['call', identifier, arguments, next_token]: a function call awaiting its next argument, `next_token` is the
+    #   token the argument being parsed starts at
     def __parse_binary_expression(self, precedence: int) -> ExpressionNode | None:
-        left = self.__parse_unary_expression()
-        operator = self.lexer.peek()
-
-        # Keep parsing expressions at or greater precedence of the current operator.
-        # Example: `1 + 2 - 3` will be parsed as `(1 + 2) - 3`
-        while left is not None and self.__binary_operators.get(operator.kind, -1) >= precedence:
-            token = self.lexer.peek()
-            next_token = self.lexer.scan()  # skip operator
-
-            # Parse sub-expressions of right operand with higher precedence than the current operator.
-            # Example: `1 + 2 * 3` will be parsed as `1 + (2 * 3)`
-            right = self.__parse_binary_expression(self.__binary_operators[operator.kind] + 1)
-
-            if not right:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'syntax: expected expression (got {next_token}) after {token}', next_token.position)
-                return left
-
-            # Create binary expression node, and assign it as the left operand for the next iteration.
-            left = BinaryExpressionNode(left.position, operator.kind, left, right)
-            operator = self.lexer.peek()
-
-        return left
+        lexer = self.lexer
+        binary_operators = self.__binary_operators
+        stack: List[List[Any]] = [['binary', precedence, _PENDING, None, None]]
+        result: Any = None  # the expression returned to the innermost frame, _PENDING entering a call
+        parse_operand = True
+
+        while True:
+            if parse_operand:
+                # descend through prefix tokens until a primary expression is reached
+                token = lexer.peek()
+                if token.kind in self.__unary_operators:
+                    lexer.scan()  # skip operator
+                    stack.append(['unary', token])
+                    continue
+                elif token.kind == '(':
+                    lexer.scan()  # skip '('
+                    stack.append(['parenthesized'])
+                    stack.append(['binary', 0, _PENDING, None, None])
+                    continue
+                result = self.__parse_primary_expression()
+                parse_operand = False
+                if isinstance(result, IdentifierNode) and lexer.peek().kind == '(':  # function call
+                    lexer.scan()  # skip '('
+                    stack.append(['call', result, [], None])
+                    result = _PENDING
+
+            # return the result to the innermost pending frame
+            frame = stack[-1]
+
+            if frame[0] == 'unary':
+                stack.pop()
+                operator, next_token = frame[1], lexer.peek()
+                if result is None:
+                    self.module.diagnostics.emit_diagnostic(
+                        'error', f'syntax: expected expression after {operator} (got {next_token})', next_token.position)
+                else:
+                    result = UnaryExpressionNode(operator.position, operator.kind, result)
+            elif frame[0] == 'parenthesized':
+                stack.pop()
+                self.__expect(')', 'to close expression')
+            elif frame[0] == 'call':
+                _, identifier, arguments, next_token = frame
+                if result is None:
+                    self.module.diagnostics.emit_diagnostic(
+                        'error', f'syntax: expected expression (got {next_token}) to specify argument', next_token.position)
+                    lexer.scan()  # skip token
+                elif result is not _PENDING:
+                    arguments.append(result)
+                    token = lexer.peek()
+                    if token.kind == ',':
+                        lexer.scan()
+                    elif token.kind != ')':
+                        self.module.diagnostics.emit_diagnostic(
+                            'error', f'syntax: expected , or ) after expression (got {token})', token.position)
+
+                token = lexer.peek()
+                if token.kind != ')' and token.kind != 'eof':  # parse the next argument
+                    frame[3] = token
+                    stack.append(['binary', 0, _PENDING, None, None])
+                    parse_operand = True
+                    continue
+
+                stack.pop()
+                self.__expect(')', 'to close function arguments')
+                result = CallExpressionNode(identifier.position, identifier, arguments)
+            else:
+                _, minimum, left, operator, next_token = frame
+
+                if left is _PENDING:  # first operand
+                    left = result
+                elif not result:  # missing right operand, the frame yields its left operand
+                    self.module.diagnostics.emit_diagnostic(
+                        'error', f'syntax: expected expression (got {next_token}) after {operator}', next_token.position)
+                    stack.pop()
+                    result = left
+                    if len(stack) == 0:
+                        return result
+                    continue
+                else:
+                    left = BinaryExpressionNode(left.position, operator.kind, left, result)
+
+                # Keep parsing expressions at or greater precedence of the current operator.
+                # Example: `1 + 2 - 3` will be parsed as `(1 + 2) - 3`
+                operator = lexer.peek()
+                if left is not None and binary_operators.get(operator.kind, -1) >= minimum:
+                    frame[2], frame[3], frame[4] = left, operator, lexer.scan()  # skip operator
+
+                    # Parse sub-expressions of right operand with higher precedence than the current operator.
+                    # Example: `1 + 2 * 3` will be parsed as `1 + (2 * 3)`
+                    stack.append(['binary', binary_operators[operator.kind] + 1, _PENDING, None, None])
+                    parse_operand = True
+                    continue
+
+                stack.pop()
+                result = left
+
+            if len(stack) == 0:
+                return result
 
     def __parse_type(self) -> TypeNode | None:
         token = self.lexer.peek()
+        parse = self.__type_parsers.get(token.kind)
+        return parse(token) if parse is not None else None
 
-        if token.kind == '(':
-            return self.__parse_function_type()
-        elif token.kind == 'Nil':
-            self.lexer.scan()
-            return NilTypeNode(token.position)
-        elif token.kind == 'Bool':
-            self.lexer.scan()
-            return BoolTypeNode(token.position)
-        elif token.kind == 'Real':
-            self.lexer.scan()
-            return RealTypeNode(token.position)
-        elif token.kind == 'String':
-            self.lexer.scan()
-            return StringTypeNode(token.position)
-        else:
-            return None
+    __primitive_types: Dict[str, Callable[[int], TypeNode]] = {
+        'Nil': NilTypeNode, 'Bool': BoolTypeNode, 'Real': RealTypeNode, 'String': StringTypeNode}
 
-    def __parse_function_type(self) -> FunctionTypeNode | None:
-        position = self.lexer.token_position()
+    def __parse_primitive_type(self, token: Token) -> TypeNode:
+        self.lexer.scan()
+        return self.__primitive_types[token.kind](token.position)
+
+    def __parse_function_type(self, token: Token) -> TypeNode:
+        position = token.position
         self.lexer.scan()  # skip '('
         parameter_types = self.__parse_type_list()
         self.__expect(')', 'to close function type')
@@ -0,0 +1,110 @@
+# Generated from docs/grammar.ebnf by `python -m mattylang.grammar`, do not edit.
+from typing import Dict, FrozenSet, Tuple
+
+# FIRST set of each rule ('' marks a nullable rule)
+FIRST: Dict[str, FrozenSet[str]] = {
+    'program': frozenset({'break', 'continue', 'def', 'eof', 'identifier', 'if', 'return', 'while', '{'}),
+    'statement': frozenset({'break', 'continue', 'def', 'identifier', 'if', 'return', 'while', '{'}),
+    'chunk': frozenset({'break', 'continue', 'def', 'identifier', 'if', 'return', 'while', '{'}),
+    'variable_definition': frozenset({'def'}),
+    'variable_assignment': frozenset({'identifier'}),
+    'if_statement': frozenset({'if'}),
+    'while_statement': frozenset({'while'}),
+    'break_statement': frozenset({'break'}),
+    'continue_statement': frozenset({'continue'}),
+    'function_definition': frozenset({'def'}),
+    'function_parameter': frozenset({'identifier'}),
+    'return_statement': frozenset({'return'}),
+    'call_statement': frozenset({'identifier'}),
+    'expression': frozenset({'!', '(', '-', 'false', 'identifier', 'nil', 'real_literal', 'string_literal', 'true'}),
+    'primary_expression': frozenset({'false', 'identifier', 'nil', 'real_literal', 'string_literal', 'true'}),
+    'nil_literal': frozenset({'nil'}),
+    'bool_literal': frozenset({'false', 'true'}),
+    'call_expression': frozenset({'identifier'}),
+    'unary_expression': frozenset({'!', '-'}),
+    'binary_expression': frozenset({'!', '(', '-', 'false', 'identifier', 'nil', 'real_literal', 'string_literal', 'true'}),
+    'type': frozenset({'(', 'Bool', 'Nil', 'Real', 'String'}),
+    'primitive_type': frozenset({'Bool', 'Nil', 'Real', 'String'}),
+    'nil_type': frozenset({'Nil'}),
+    'bool_type': frozenset({'Bool'}),
+    'real_type': frozenset({'Real'}),
+    'string_type': frozenset({'String'}),
+    'function_type': frozenset({'('}),
+}
+
+# FOLLOW set of each rule
+FOLLOW: Dict[str, FrozenSet[str]] = {
+    'program': frozenset({'eof'}),
+    'statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'chunk': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'variable_definition': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'variable_assignment': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'if_statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'while_statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'break_statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'continue_statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'function_definition': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'function_parameter': frozenset({')', ','}),
+    'return_statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'call_statement': frozenset({'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '}'}),
+    'expression': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'primary_expression': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'nil_literal': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'bool_literal': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'call_expression': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'unary_expression': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'binary_expression': frozenset({'!=', '%', '&&', ')', '*', '+', ',', '-', '/', '<', '<=', '==', '>', '>=', 'break', 'continue', 'def', 'else', 'eof', 'identifier', 'if', 'return', 'while', '{', '||', '}'}),
+    'type': frozenset({')', ','}),
+    'primitive_type': frozenset({')', ','}),
+    'nil_type': frozenset({')', ','}),
+    'bool_type': frozenset({')', ','}),
+    'real_type': frozenset({')', ','}),
+    'string_type': frozenset({')', ','}),
+    'function_type': frozenset({')', ','}),
+}
+
+# token -> productions it can start, for each dispatched rule
+DISPATCH: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    'statement': {
+        'break': ('break_statement',),
+        'continue': ('continue_statement',),
+        'def': ('variable_definition', 'function_definition'),
+        'identifier': ('variable_assignment', 'call_statement'),
+        'if': ('if_statement',),
+        'return': ('return_statement',),
+        'while': ('while_statement',),
+        '{': ('statement',),
+    },
+    'primary_expression': {
+        'false': ('bool_literal',),
+        'identifier': ('identifier', 'call_expression'),
+        'nil': ('nil_literal',),
+        'real_literal': ('real_literal',),
+        'string_literal': ('string_literal',),
+        'true': ('bool_literal',),
+    },
+    'type': {
+        '(': ('function_type',),
+        'Bool': ('bool_type',),
+        'Nil': ('nil_type',),
+        'Real': ('real_type',),
+        'String': ('string_type',),
+    },
+}
+
+# binary operator -> precedence level, higher binds tighter
+BINARY_PRECEDENCE: Dict[str, int] = {
+    '&&': 1,
+    '||': 1,
+    '<': 2,
+    '>': 2,
+    '<=': 2,
+    '>=': 2,
+    '==': 2,
+    '!=': 2,
+    '+': 3,
+    '-': 3,
+    '*': 4,
+    '/': 4,
+    '%': 4,
+}
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
     from mattylang.ast import *
@@ -9,9 +9,12 @@ class Symbol:
     A symbol represents a registered variable declaration in the program.
     """
 
+    __slots__ = ('name', 'scope', 'slot', 'extern', 'references', 'node', 'type')
+
     def __init__(self, name: str, scope: 'SymbolTable', extern: bool = False, node: Optional['AbstractNode'] = None, type: Optional['TypeNode'] = None):
         self.name = name
         self.scope = scope
+        self.slot = len(scope.slots)  # index in the scope's slots, (scope.depth, slot) is the symbol's coordinate
         self.extern = extern
         self.references: List[IdentifierNode] = []  # set by binder
         self.node = node  # set by binder
@@ -20,6 +23,9 @@ class Symbol:
     def __str__(self):
         return f'symbol(name: {self.name}, node: {self.node}, type: {self.type}, extern: {self.extern})'
 
+    def get_coordinate(self) -> Tuple[int, int]:
+        return self.scope.depth, self.slot
+
     def get_node(self) -> 'AbstractNode':
         assert self.node is not None, 'node is not set for {self}, was the binder run?'
         return self.node
@@ -52,11 +58,15 @@ class SymbolTable:
     It maps symbol names to declaration information through symbols.
     """
 
+    __slots__ = ('parent', 'children', 'boundary', 'depth', 'variables', 'slots')
+
     def __init__(self, parent: Optional['SymbolTable'] = None, boundary: bool = False):
         self.parent = parent  # represents the scope this scope is nested within
         self.children: List[SymbolTable] = []  # represents the scopes nested within this scope
         self.boundary = boundary  # represents whether this scope is a boundary (e.g., at function definitions)
+        self.depth: int = parent.depth + 1 if parent is not None else 0  # represents the number of enclosing scopes
         self.variables: Dict[str, Symbol] = {}  # represents the variables declared in this scope
+        self.slots: List[Symbol] = []  # represents the variables declared in this scope, in declaration order
 
     def enclosing_boundary(self) -> Optional['SymbolTable']:
         if self.parent is None:
@@ -78,6 +88,7 @@ class SymbolTable:
         assert name not in self.variables, f'fatal: symbol {name} already defined'
         symbol = Symbol(name, self, extern, node, type)
         self.variables[name] = symbol
+        self.slots.append(symbol)
         return symbol
 
     def open_scope(self, boundary: bool = False):
@@ -89,3 +100,57 @@ class SymbolTable:
         parent = self.parent
         assert parent is not None, 'fatal: scope underflow'
         return parent
+
+
+class Bindings:
+    """
+    The active bindings of each name while scopes are opened and closed in order (e.g., by the binder).
+    Resolving a name from the innermost open scope is O(1), rather than a lookup walking the parent scopes.
+    """
+
+    __slots__ = ('__stacks', '__boundaries')
+
+    def __init__(self, scope: SymbolTable):
+        self.__stacks: Dict[str, List[Symbol]] = {}  # name -> symbols bound to it, innermost last
+        self.__boundaries: List[int] = [0]  # depths of the open boundary scopes
+
+        # open the scope and its parents, e.g., the globals
+        scopes: List[SymbolTable] = []
+        parent: Optional[SymbolTable] = scope
+        while parent is not None:
+            scopes.append(parent)
+            parent = parent.parent
+        for parent in reversed(scopes):
+            self.open(parent)
+
+    def open(self, scope: SymbolTable):
+        if scope.boundary:
+            self.__boundaries.append(scope.depth)
+        for symbol in scope.slots:
+            self.declare(symbol)
+
+    def close(self, scope: SymbolTable):
+        for symbol in scope.slots:
+            self.__stacks[symbol.name].pop()
+        if scope.boundary:
+            self.__boundaries.pop()
+
+    def declare(self, symbol: Symbol):
+        """
+        Binds the symbol's name to it, the symbol must be registered in the innermost open scope.
+        """
+        stack = self.__stacks.get(symbol.name)
+        if stack is None:
+            stack = self.__stacks[symbol.name] = []
+        stack.append(symbol)
+
+    def resolve(self, name: str, ignore_boundary: bool = False) -> Optional[Symbol]:
+        """
+        Equivalent to lookup(name, True, ignore_boundary) from the innermost open scope.
+        """
+        stack = self.__stacks.get(name)
+        if not stack:
+            return None
+        symbol = stack[-1]
+        # scopes at or within the innermost boundary are visible
+        return symbol if ignore_boundary or symbol.scope.depth >= self.__boundaries[-1] else None
@@ -0,0 +1,83 @@
+from typing import Callable, cast, Dict, Hashable, Sequence, Set, Tuple, Type
+
+from mattylang.ast import *
+
+
+class TypeInterner:
+    """
+    Hash-conses types: every structurally distinct type has a single canonical type node (with no position or
+    parent), so types are compared by identity and assignability is computed once per pair of canonical types.
+    Canonical types are shared, they must not be attached to or modified as part of a syntax tree.
+    """
+
+    def __init__(self):
+        self.__types: Dict[Hashable, TypeNode] = {}  # structural key -> canonical type
+        self.__canonical: Set[TypeNode] = set()
+        self.__assignable: Dict[Tuple[TypeNode, TypeNode], bool] = {}  # memoized (type, other) assignability
+
+        self.any = self.__primitive(AnyTypeNode)
+        self.nil = self.__primitive(NilTypeNode)
+        self.bool = self.__primitive(BoolTypeNode)
+        self.real = self.__primitive(RealTypeNode)
+        self.string = self.__primitive(StringTypeNode)
+
+    def intern(self, type: TypeNode) -> TypeNode:
+        """
+        Returns the canonical type structurally equal to the type (e.g., a type node from the syntax tree).
+        """
+        if type in self.__canonical:
+            return type
+        elif isinstance(type, FunctionTypeNode):
+            return self.function([self.intern(parameter_type) for parameter_type in type.parameter_types],
+                                 self.intern(type.return_type))
+        else:
+            return self.__types[type.__class__]
+
+    def function(self, parameter_types: Sequence[TypeNode], return_type: TypeNode) -> FunctionTypeNode:
+        """
+        Returns the canonical function type, given canonical parameter and return types.
+        """
+        key = (FunctionTypeNode, return_type, *parameter_types)
+        type = self.__types.get(key)
+        if type is None:
+            type = self.__add(key, FunctionTypeNode(0, list(parameter_types), return_type))
+        return cast(FunctionTypeNode, type)
+
+    def is_assignable(self, type: TypeNode, other: TypeNode) -> bool:
+        """
+        Whether a value of the canonical type can be assigned to the canonical other type.
+        """
+        if type is other or other is self.any or type is self.any:
+            return True
+        key = (type, other)
+        result = self.__assignable.get(key)
+        if result is None:
+            result = self.__assignable[key] = self.__compute_assignable(type, other)
+        return result
+
+    def is_equivalent(self, type: TypeNode, other: TypeNode) -> bool:
+        return type is other or (self.is_assignable(type, other) and self.is_assignable(other, type))
+
+    # mirrors TypeNode.is_assignable_to, using (memoized) canonical components
+    def __compute_assignable(self, type: TypeNode, other: TypeNode) -> bool:
+        if not isinstance(type, FunctionTypeNode) or not isinstance(other, FunctionTypeNode):
+            return False  # distinct primitive types, or a function type and a primitive type (neither is Any)
+        elif len(type.parameter_types) != len(other.parameter_types):
+            return False
+        elif not self.is_assignable(type.return_type, other.return_type):
+            return False
+        return all(self.is_assignable(other_parameter, parameter)
+                   for parameter, other_parameter in zip(type.parameter_types, other.parameter_types))
+
+    def __primitive(self, kind: Type[TypeNode]) -> TypeNode:
+        return self.__add(kind, cast(Callable[[int], TypeNode], kind)(0))
+
+    def __add(self, key: Hashable, type: TypeNode) -> TypeNode:
+        self.__types[key] = type
+        self.__canonical.add(type)
+        return type
+
+
+# the interner shared by the checker and the global scope, so canonical types can be compared across modules
+TYPES = TypeInterner()
+
@@ -1,8 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
-
-if TYPE_CHECKING:  # pragma: no cover
-    from mattylang.ast import *
+from typing import List
+
+from mattylang.ast import *
+
+
+def operator_postorder(node: ExpressionNode) -> List[ExpressionNode]:
+    """
+    Lists an expression and its nested unary and binary expressions and their other operands in post-order (each
+    expression after its operands), without recursion. Visitors handling unary and binary expressions walk them with it
+    so that long chains (e.g., 1 + 2 + ... + 1000) cost no Python frames, handling the other operands with accept.
+    """
+    nodes: List[ExpressionNode] = []
+    stack = [node]
+    while len(stack) > 0:
+        node = stack.pop()
+        nodes.append(node)
+        if type(node) is BinaryExpressionNode:
+            stack.append(node.left)
+            stack.append(node.right)
+        elif type(node) is UnaryExpressionNode:
+            stack.append(node.operand)
+    nodes.reverse()
+    return nodes
 
 
 class AbstractVisitor(ABC):
@@ -80,11 +99,27 @@ class AbstractVisitor(ABC):
             argument.accept(self)
 
     def visit_unary_expression(self, node: 'UnaryExpressionNode'):
-        node.operand.accept(self)
+        self.__visit_operands(node)
 
     def visit_binary_expression(self, node: 'BinaryExpressionNode'):
-        node.left.accept(self)
-        node.right.accept(self)
+        self.__visit_operands(node)
+
+    # Visits the operands of a unary or binary expression from an explicit stack, in the same order as recursively. The
+    # nested unary and binary expressions whose handlers are not overridden are expanded in place, so that long chains
+    # of them cost no Python frames.
+    def __visit_operands(self, node: 'ExpressionNode'):
+        expand_unary = type(self).visit_unary_expression is AbstractVisitor.visit_unary_expression
+        expand_binary = type(self).visit_binary_expression is AbstractVisitor.visit_binary_expression
+        stack = [node]
+        while len(stack) > 0:
+            operand = stack.pop()
+            if type(operand) is BinaryExpressionNode and (expand_binary or operand is node):
+                stack.append(operand.right)
+                stack.append(operand.left)
+            elif type(operand) is UnaryExpressionNode and (expand_unary or operand is node):
+                stack.append(operand.operand)
+            else:
+                operand.accept(self)
 
     def visit_any_type(self, node: 'AnyTypeNode'):
         pass
@@ -1,61 +1,69 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from mattylang.ast import *
 from mattylang.module import Module
-from mattylang.symbols import SymbolTable
+from mattylang.symbols import Bindings, Symbol
 from mattylang.visitor import AbstractVisitor
 
 
 class Binder(AbstractVisitor):
+    """
+    Binds identifiers to symbols. Functions are declared when entering the chunk defining them (before the chunk's
+    statements are bound), so function bodies can reference functions defined after them, e.g., for mutual recursion.
+    Statements run as their chunk is executed (outside of the bodies of the functions it defines) cannot reference a
+    function before its definition, nor a function depending on functions defined after the reference, which is
+    checked once the program is bound.
+    """
+
     def __init__(self, module: Module):
         self.module = module
         self.__active_scope = module.globals
+        self.__bindings = Bindings(module.globals)  # resolves names from the active scope in O(1)
         self.__parent_chunk: Optional[ChunkNode] = None
-        self.__undefined_references: List[Tuple[IdentifierNode, SymbolTable]] = []
+        self.__function: Optional[FunctionDefinitionNode] = None  # enclosing function and loop, recorded on chunks
+        self.__loop: Optional[WhileStatementNode] = None
+        self.__pending: Set[Symbol] = set()  # functions declared but not defined yet
+        self.__contexts: Dict[Symbol, Optional[FunctionDefinitionNode]] = {}  # function -> enclosing function
+        self.__callees: Dict[Symbol, List[Symbol]] = {}  # function -> functions its body references
+        self.__uses: List[Tuple[IdentifierNode, Symbol]] = []  # references to functions run as their chunk executes
 
     def visit_chunk(self, node: ChunkNode):
         assert node.scope is None, f'fatal: {node} already has symbol table: {node.scope}'
 
         # enter scope
-        self.__active_scope = self.__active_scope.open_scope()
+        self.__open_scope()
         node.scope = self.__active_scope
         node.parent_chunk = self.__parent_chunk
+        node.function, node.loop = self.__function, self.__loop
         self.__parent_chunk = node
 
-        super().visit_chunk(node)  # visit children
-
-        # handle undefined references
-        for identifier, scope in self.__undefined_references:
-            # allow a function to reference itself (recursion)
-            function_definition = identifier.get_enclosing_function()
-
-            if function_definition is not None and function_definition.identifier.value == identifier.value:
-                symbol = function_definition.identifier.symbol
-                if symbol:
-                    identifier.symbol = symbol
-                    symbol.references.append(identifier)
-
-            # allow a function to reference previously defined functions and external variables
-            if identifier.symbol is None:
-                symbol = scope.lookup(identifier.value, True, ignore_boundary=True)
-                if symbol is not None:
-                    if symbol.extern or (symbol.node is not None and isinstance(symbol.node, FunctionDefinitionNode)):
-                        identifier.symbol = symbol
-                        symbol.references.append(identifier)
-
-            if identifier.symbol is None:
-                self.module.diagnostics.emit_diagnostic(
-                    'error', f'analysis: undefined reference to {identifier.value}', identifier.position)
-
-        self.__undefined_references.clear()
+        # declare functions, unless their name is first declared by a variable (see visit_function_definition)
+        names: Set[str] = set()
+        for statement in node.statements:
+            if isinstance(statement, VariableDefinitionNode):
+                names.add(statement.identifier.value)
+            elif isinstance(statement, FunctionDefinitionNode) and statement.identifier.value not in names:
+                names.add(statement.identifier.value)
+                symbol = self.__register(statement.identifier.value, statement)
+                self.__pending.add(symbol)
+                self.__contexts[symbol] = self.__function
+                self.__callees[symbol] = []
+
+        # visit children
+        for statement in node.statements:
+            if self.module.diagnostics.limit_reached():
+                break  # the later statements' diagnostics would be dropped
+            statement.accept(self)
 
         # exit scope
         self.__parent_chunk = node.parent_chunk
-        self.__active_scope = self.__active_scope.close_scope()
+        self.__close_scope()
+        if self.__parent_chunk is None and self.__function is None:
+            self.__check_uses()
 
     def visit_variable_definition(self, node: VariableDefinitionNode):
         # check for duplicate definition
-        symbol = self.__active_scope.lookup(node.identifier.value, False)
+        symbol = self.__lookup_local(node.identifier.value)
         if symbol is not None:
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: duplicate definition of {node.identifier.value}', node.identifier.position)
@@ -64,31 +72,40 @@ class Binder(AbstractVisitor):
 
         # register symbol after vising the initializer
         if symbol is None:
-            self.__active_scope.register(node.identifier.value, node=node)
+            self.__register(node.identifier.value, node)
             node.identifier.accept(self)
 
     def visit_function_definition(self, node: 'FunctionDefinitionNode'):
-        # check for duplicate definition
-        symbol = self.__active_scope.lookup(node.identifier.value, False)
-        if symbol is not None:
+        # check for duplicate definition, the function was declared when entering the chunk unless it is a duplicate
+        symbol = self.__lookup_local(node.identifier.value)
+        if symbol is None or symbol.node != node:
+            symbol = None
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: duplicate definition of {node.identifier.value}', node.identifier.position)
         else:
-            # register symbol
-            self.__active_scope.register(node.identifier.value, node=node)
+            self.__pending.discard(symbol)
             node.identifier.accept(self)
 
         # visit children in new boundary scope
-        self.__active_scope = self.__active_scope.open_scope(boundary=True)
+        function, loop = self.__function, self.__loop
+        self.__function, self.__loop = node, None
+        self.__open_scope(boundary=True)
         for parameter in node.parameters:
             parameter.accept(self)
         node.body.accept(self)
         node.body.parent_chunk = None  # reset parent chunk
-        self.__active_scope = self.__active_scope.close_scope()
+        self.__close_scope()
+        self.__function, self.__loop = function, loop
+
+    def visit_while_statement(self, node: WhileStatementNode):
+        node.condition.accept(self)
+        loop, self.__loop = self.__loop, node
+        node.body.accept(self)
+        self.__loop = loop
 
     def visit_function_parameter(self, node: 'FunctionParameterNode'):
         # check for duplicate definition
-        symbol = self.__active_scope.lookup(node.identifier.value, False)
+        symbol = self.__lookup_local(node.identifier.value)
         if symbol is not None:
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: duplicate parameter {node.identifier.value}', node.identifier.position)
@@ -97,18 +114,84 @@ class Binder(AbstractVisitor):
 
         # register symbol
         if symbol is None:
-            self.__active_scope.register(node.identifier.value, node=node)
+            self.__register(node.identifier.value, node)
             node.identifier.accept(self)
 
     # binds symbols to identifiers
     def visit_identifier(self, node: IdentifierNode):
         assert node.symbol is None, f'fatal: {node} already has symbol: {node.symbol}'
 
-        if node.value != '#invalid':
-            symbol = self.__active_scope.lookup(node.value, True)
+        if node.value == '#invalid':
+            return
 
-            if symbol is not None:
-                node.symbol = symbol
-                symbol.references.append(node)
-            else:
-                self.__undefined_references.append((node, self.__active_scope))
+        symbol = self.__bindings.resolve(node.value)
+        if symbol is not None and symbol in self.__pending:
+            symbol = None  # the function is not defined yet when the statement runs
+        elif symbol is not None and symbol in self.__callees and node.parent is not None \
+                and not isinstance(node.parent, FunctionDefinitionNode):
+            self.__uses.append((node, symbol))
+
+        # allow a function to reference functions and external variables beyond its boundary
+        elif symbol is None:
+            symbol = self.__bindings.resolve(node.value, ignore_boundary=True)
+            if symbol is not None and not (symbol.extern or isinstance(symbol.node, FunctionDefinitionNode)):
+                symbol = None
+
+        if symbol is not None:
+            self.__bind(node, symbol)
+            if symbol in self.__callees and self.__function is not None and self.__function.identifier.symbol:
+                self.__callees[self.__function.identifier.symbol].append(symbol)
+        else:
+            self.module.diagnostics.emit_diagnostic(
+                'error', f'analysis: undefined reference to {node.value}', node.position)
+
+    # reports references to functions depending on functions that are not defined yet when the reference runs
+    def __check_uses(self):
+        callers: Dict[Symbol, List[Symbol]] = {symbol: [] for symbol in self.__callees}
+        for symbol, callees in self.__callees.items():
+            for callee in callees:
+                callers[callee].append(symbol)
+
+        # by the enclosing function of the references: function -> the last defined function it depends on there,
+        # found by visiting the callers of the functions defined there, the last defined first
+        latest: Dict[Optional[FunctionDefinitionNode], Dict[Symbol, Symbol]] = {}
+        for identifier, symbol in self.__uses:
+            context = self.__contexts[symbol]
+            if context not in latest:
+                reached = latest[context] = {}
+                functions = [function for function, enclosing in self.__contexts.items() if enclosing is context]
+                for function in sorted(functions, key=lambda function: function.get_node().position, reverse=True):
+                    stack = [function]
+                    while len(stack) > 0:
+                        caller = stack.pop()
+                        if caller not in reached:
+                            reached[caller] = function
+                            stack.extend(callers[caller])
+
+            dependency = latest[context][symbol]
+            if dependency.get_node().position > identifier.position:
+                self.module.diagnostics.emit_diagnostic(
+                    'error', f'analysis: {identifier.value} is referenced before the definition of {dependency.name}',
+                    identifier.position)
+
+    def __bind(self, identifier: IdentifierNode, symbol: Symbol):
+        identifier.symbol = symbol
+        identifier.coordinate = symbol.get_coordinate()
+        symbol.references.append(identifier)
+
+    def __lookup_local(self, name: str) -> Optional[Symbol]:
+        symbol = self.__bindings.resolve(name)
+        return symbol if symbol is not None and symbol.scope is self.__active_scope else None
+
+    def __register(self, name: str, node: AbstractNode) -> Symbol:
+        symbol = self.__active_scope.register(name, node=node)
+        self.__bindings.declare(symbol)
+        return symbol
+
+    def __open_scope(self, boundary: bool = False):
+        self.__active_scope = self.__active_scope.open_scope(boundary)
+        self.__bindings.open(self.__active_scope)
+
+    def __close_scope(self):
+        self.__bindings.close(self.__active_scope)
+        self.__active_scope = self.__active_scope.close_scope()
@@ -1,34 +1,61 @@
-from typing import List
+from typing import cast, Dict, List, Set
 
 from mattylang.ast import *
+from mattylang.diagnostics import Diagnostics
 from mattylang.module import Module
-from mattylang.visitor import AbstractVisitor
+from mattylang.symbols import Symbol
+from mattylang.types import TYPES
+from mattylang.visitor import AbstractVisitor, operator_postorder
 
 
-class Checker(AbstractVisitor):
-    def __init__(self, module: Module):
+class _FunctionReferences(AbstractVisitor):
+    """
+    Collects the functions a function's body references, except within nested functions (checked on their own).
+    """
+
+    def __init__(self):
         super().__init__()
-        self.module = module
-        self.__untyped_references: List[IdentifierNode] = []
+        self.functions: List[Symbol] = []
 
-    def visit_chunk(self, node: ChunkNode):
-        super().visit_chunk(node)  # visit children
+    def visit_function_definition(self, node: FunctionDefinitionNode):
+        pass
 
-        # handle untyped nodes again (for recursion)
-        for identifier in self.__untyped_references:
-            if identifier.symbol is None or identifier.symbol.type is None:
-                continue
+    def visit_identifier(self, node: IdentifierNode):
+        if node.symbol is not None and isinstance(node.symbol.node, FunctionDefinitionNode):
+            self.functions.append(node.symbol)
 
-            identifier.accept(self)
-            self.module.diagnostics.emit_diagnostic(
-                'info', f'analysis: late-typed {identifier} to be of type {identifier.type}', identifier.position)
 
-            # recursively type expressions upwards
-            identifier = identifier.parent
-            while isinstance(identifier, ExpressionNode) and identifier.type is None:
-                identifier.accept(self)
-                self.module.diagnostics.emit_diagnostic(
-                    'info', f'analysis: late-typed {identifier} to be of type {identifier.type}', identifier.position)
+class Checker(AbstractVisitor):
+    """
+    Infers and checks types. Expressions and symbols are typed with canonical types (see TypeInterner).
+    A function's type is inferred from its first return statement whose type is known. When a function is referenced
+    or defined, it is checked with the unchecked functions it depends on, in dependency order: the strongly connected
+    components of their reference graph (Tarjan's algorithm) are checked callees first. Within a component, a function
+    referenced before its return type is known is untyped, so the component is checked again with the return types
+    inferred so far until they no longer change (bounded by the component's size), then functions still untyped return
+    nil. The diagnostics of a component are kept until it is solved, so only those of its final check are reported.
+    """
+
+    def __init__(self, module: Module):
+        super().__init__()
+        self.module = module
+        self.__diagnostics = module.diagnostics  # where solved components report diagnostics
+        self.__functions: Dict[Symbol, bool] = {}  # function symbol -> whether checking its component finished
+        self.__dependencies: Dict[Symbol, List[Symbol]] = {}  # function symbol -> functions its body references
+        self.__buffers: Dict[Symbol, Diagnostics] = {}  # function symbol -> diagnostics, for unsolved components
+        self.__unresolved: Set[Symbol] = set()  # functions of unsolved components referenced while untyped
+
+    def assume(self, symbol: Symbol):
+        """
+        Treats the function as checked with its symbol's type, e.g., a type memoized by IncrementalCompiler.
+        """
+        self.__functions[symbol] = True
+
+    def visit_program(self, node: ProgramNode):
+        for statement in node.chunk.statements:
+            if self.module.diagnostics.limit_reached():
+                break  # the later statements' diagnostics would be dropped
+            statement.accept(self)
 
     def visit_variable_definition(self, node: VariableDefinitionNode):
         node.initializer.accept(self)
@@ -47,7 +74,7 @@ class Checker(AbstractVisitor):
         if identifier_type is None or value_type is None:
             return
 
-        if not value_type.is_assignable_to(identifier_type):
+        if not TYPES.is_assignable(value_type, identifier_type):
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: incompatible types for assignment: {identifier_type} = {value_type}', node.position)
             return
@@ -56,7 +83,7 @@ class Checker(AbstractVisitor):
         node.condition.accept(self)
         condition_type = node.condition.type
 
-        if condition_type is not None and not condition_type.is_equivalent(BoolTypeNode(0)):
+        if condition_type is not None and not TYPES.is_equivalent(condition_type, TYPES.bool):
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: expected type of condition to be Bool (got {condition_type})', node.condition.position)
             return
@@ -69,7 +96,7 @@ class Checker(AbstractVisitor):
         node.condition.accept(self)
         condition_type = node.condition.type
 
-        if condition_type is not None and not condition_type.is_equivalent(BoolTypeNode(0)):
+        if condition_type is not None and not TYPES.is_equivalent(condition_type, TYPES.bool):
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: expected type of condition to be Bool (got {condition_type})', node.condition.position)
             return
@@ -87,26 +114,125 @@ class Checker(AbstractVisitor):
                 'error', 'analysis: continue statement outside of loop', node.position)
 
     def visit_function_definition(self, node: FunctionDefinitionNode):
-        super().visit_function_definition(node)  # visit children
-
-        if node.identifier.symbol is None:
-            return
+        symbol = node.identifier.symbol
+        if symbol is None:
+            super().visit_function_definition(node)  # visit children, a duplicate definition is not typed
+        elif symbol not in self.__functions:
+            self.__check_functions(symbol)
+
+    # checks the function and the unchecked functions it depends on, callees first
+    def __check_functions(self, function: Symbol):
+        if len(self.__buffers) == 0:
+            self.__diagnostics = self.module.diagnostics
+
+        for component in self.__components(function):
+            for symbol in component:
+                self.__functions[symbol] = False
+                self.__buffers[symbol] = Diagnostics(self.module.verbose)
+            for symbol in component:
+                self.__check_function(symbol)
+
+            # check again while the return types inferred so far change
+            for _ in range(len(component) if not self.__unresolved.isdisjoint(component) else 0):
+                types = [symbol.type for symbol in component]
+                self.__check_component(component)
+                if all(symbol.type is type for symbol, type in zip(component, types)):
+                    break
+
+            # functions without a typed return statement return nil
+            untyped = [symbol for symbol in component if symbol.type is None]
+            for symbol in untyped:
+                node = cast(FunctionDefinitionNode, symbol.node)
+                node.body.return_type = TYPES.nil
+                symbol.type = node.identifier.type = self.__function_type(node, TYPES.nil)
+            if len(untyped) > 0 and not self.__unresolved.isdisjoint(component):
+                self.__check_component(component)
+            self.__unresolved.difference_update(component)
+
+            for symbol in component:
+                self.__functions[symbol] = True
+                for diagnostic in self.__buffers.pop(symbol):
+                    self.__diagnostics.emit_diagnostic(diagnostic.kind, diagnostic.message, diagnostic.position)
+
+    # the strongly connected components of the unchecked functions reachable from the function, callees first
+    def __components(self, function: Symbol) -> List[List[Symbol]]:
+        components: List[List[Symbol]] = []
+        index: Dict[Symbol, int] = {function: 0}
+        lowlink: Dict[Symbol, int] = {function: 0}  # for the functions on the stack
+        stack: List[Symbol] = [function]
+        work = [(function, iter(self.__get_dependencies(function)))]
+
+        while len(work) > 0:
+            symbol, dependencies = work[-1]
+            for dependency in dependencies:
+                if dependency in self.__functions:
+                    continue  # checked, or being checked
+                elif dependency not in index:
+                    index[dependency] = lowlink[dependency] = len(index)
+                    stack.append(dependency)
+                    work.append((dependency, iter(self.__get_dependencies(dependency))))
+                    break
+                elif dependency in lowlink:
+                    lowlink[symbol] = min(lowlink[symbol], index[dependency])
+            else:
+                work.pop()
+                if len(work) > 0:
+                    caller = work[-1][0]
+                    lowlink[caller] = min(lowlink[caller], lowlink[symbol])
+                if lowlink[symbol] == index[symbol]:
+                    position = stack.index(symbol)
+                    component = stack[position:][::-1]  # deepest dependencies first
+                    del stack[position:]
+                    for member in component:
+                        del lowlink[member]
+                    components.append(component)
+        return components
+
+    def __check_component(self, component: List[Symbol]):
+        self.__unresolved.difference_update(component)
+        for symbol in component:
+            self.__buffers[symbol] = Diagnostics(self.module.verbose)
+            self.__check_function(symbol)
+
+    def __get_dependencies(self, symbol: Symbol) -> List[Symbol]:
+        dependencies = self.__dependencies.get(symbol)
+        if dependencies is None:
+            references = _FunctionReferences()
+            cast(FunctionDefinitionNode, symbol.node).body.accept(references)
+            dependencies = self.__dependencies[symbol] = references.functions
+        return dependencies
+
+    def __check_function(self, symbol: Symbol):
+        node = cast(FunctionDefinitionNode, symbol.node)
+        diagnostics, self.module.diagnostics = self.module.diagnostics, self.__buffers[symbol]
+        try:
+            node.body.return_type = None  # inferred by the return statements
+            for parameter in node.parameters:
+                parameter.accept(self)
+            node.body.accept(self)
+
+            if node.body.return_type is None:
+                if symbol.type is not None:
+                    node.body.return_type = TYPES.nil  # no typed return statement, see __check_functions
+                return  # untyped until its component is solved
 
-        if node.body.return_type is None:
-            node.body.return_type = NilTypeNode(node.position)
-        else:
             # ensure the main body of the function returns a value
             # TODO: control flow analysis to make this unnecessary if all branches return
-            if not node.body.return_type.is_assignable_to(NilTypeNode(0)) and not any(isinstance(statement, ReturnStatementNode) for statement in node.body.statements):
+            if not TYPES.is_assignable(node.body.return_type, TYPES.nil) and not any(isinstance(statement, ReturnStatementNode) for statement in node.body.statements):
                 self.module.diagnostics.emit_diagnostic(
                     'error', 'analysis: function must return a value', node.position)
 
-        parameter_types = [parameter.type for parameter in node.parameters]
-        node.identifier.symbol.type = FunctionTypeNode(node.position, parameter_types, node.body.return_type)
+            symbol.type = self.__function_type(node, node.body.return_type)
+            node.identifier.type = symbol.type
+        finally:
+            self.module.diagnostics = diagnostics
+
+    def __function_type(self, node: FunctionDefinitionNode, return_type: TypeNode) -> FunctionTypeNode:
+        return TYPES.function([TYPES.intern(parameter.type) for parameter in node.parameters], return_type)
 
     def visit_function_parameter(self, node: FunctionParameterNode):
         if node.identifier.symbol:
-            node.identifier.symbol.type = node.type
+            node.identifier.symbol.type = TYPES.intern(node.type)
         super().visit_function_parameter(node)  # visit children
 
     def visit_return_statement(self, node: ReturnStatementNode):
@@ -118,42 +244,53 @@ class Checker(AbstractVisitor):
                 'error', 'analysis: return statement outside of function', node.position)
             return
 
-        return_type = node.value.type if node.value is not None else NilTypeNode(node.position)
+        return_type = node.value.type if node.value is not None else TYPES.nil
         chunk_type = enclosing_function.body.return_type
 
         if return_type is None:
             return
 
-        if chunk_type is not None and not return_type.is_assignable_to(chunk_type):
+        if chunk_type is not None and not TYPES.is_assignable(return_type, chunk_type):
             self.module.diagnostics.emit_diagnostic(
-                'error', f'analysis: incompatible return type {return_type}, expected {chunk_type}', return_type.position)
+                'error', f'analysis: incompatible return type {return_type}, expected {chunk_type}', (node.value or node).position)
             return
         elif chunk_type is None:
             enclosing_function.body.return_type = return_type
 
+            # type recursive references to the function from now on
+            symbol = enclosing_function.identifier.symbol
+            if symbol is not None:
+                symbol.type = self.__function_type(enclosing_function, return_type)
+
     def visit_call_statement(self, node: 'CallStatementNode'):
         super().visit_call_statement(node)
-        if node.call_expression.type and not node.call_expression.type.is_assignable_to(NilTypeNode(0)):
+        if node.call_expression.type and not TYPES.is_assignable(node.call_expression.type, TYPES.nil):
             self.module.diagnostics.emit_diagnostic(
                 'warning', f'analysis: return value discarded', node.position)
 
     def visit_nil_literal(self, node: NilLiteralNode):
-        node.type = NilTypeNode(position=node.position)
+        node.type = TYPES.nil
 
     def visit_bool_literal(self, node: BoolLiteralNode):
-        node.type = BoolTypeNode(position=node.position)
+        node.type = TYPES.bool
 
     def visit_real_literal(self, node: RealLiteralNode):
-        node.type = RealTypeNode(position=node.position)
+        node.type = TYPES.real
 
     def visit_string_literal(self, node: StringLiteralNode):
-        node.type = StringTypeNode(position=node.position)
+        node.type = TYPES.string
 
     def visit_identifier(self, node: IdentifierNode):
-        if node.symbol is not None:
-            node.type = node.symbol.type
-            if node.type is None:
-                self.__untyped_references.append(node)
+        symbol = node.symbol
+        if symbol is not None:
+            if isinstance(symbol.node, FunctionDefinitionNode):
+                if symbol not in self.__functions:
+                    self.__check_functions(symbol)  # referenced before its definition
+                elif symbol.type is None and symbol in self.__buffers:
+                    self.__unresolved.add(symbol)  # in an unsolved component
+            if symbol.type is not None:
+                symbol.type = TYPES.intern(symbol.type)  # e.g., externs declared with type nodes
+            node.type = symbol.type
 
     def visit_call_expression(self, node: CallExpressionNode):
         super().visit_call_expression(node)  # visit children
@@ -167,17 +304,34 @@ class Checker(AbstractVisitor):
                 'error', f'analysis: expected function type when calling {symbol.name}, got {symbol.type}', node.position)
             return
 
-        argument_types: List[TypeNode] = [argument.type or AnyTypeNode(
-            position=argument.position) for argument in node.arguments]
-        call_type = FunctionTypeNode(node.position, argument_types, AnyTypeNode(position=node.position))
         node.type = symbol.type.return_type
+        parameter_types, arguments = symbol.type.parameter_types, node.arguments
 
-        if not call_type.is_equivalent(symbol.type):
+        # equivalent to comparing the function type with (argument types) -> Any, without building it
+        if len(arguments) != len(parameter_types) or not all(
+                TYPES.is_equivalent(argument.type or TYPES.any, parameter_type)
+                for argument, parameter_type in zip(arguments, parameter_types)):
+            call_type = TYPES.function([argument.type or TYPES.any for argument in arguments], TYPES.any)
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: incompatible arguments for function call, expected signature {symbol.type}, got {call_type}', node.position)
 
     def visit_unary_expression(self, node: UnaryExpressionNode):
-        super().visit_unary_expression(node)  # visit children
+        self.__check_operations(node)
+
+    def visit_binary_expression(self, node: BinaryExpressionNode):
+        self.__check_operations(node)
+
+    # checks the operands of unary and binary expressions before them, without recursion (see operator_postorder)
+    def __check_operations(self, node: ExpressionNode):
+        for expression in operator_postorder(node):
+            if type(expression) is BinaryExpressionNode:
+                self.__check_binary_expression(expression)
+            elif type(expression) is UnaryExpressionNode:
+                self.__check_unary_expression(expression)
+            else:
+                expression.accept(self)
+
+    def __check_unary_expression(self, node: UnaryExpressionNode):
         operator, value_type = node.operator, node.operand.type
         type_error = False
 
@@ -186,11 +340,11 @@ class Checker(AbstractVisitor):
 
         if operator == '-':
             node.type = value_type
-            if not value_type.is_equivalent(RealTypeNode(0)):
+            if not TYPES.is_equivalent(value_type, TYPES.real):
                 type_error = True
         elif operator == '!':
-            node.type = BoolTypeNode(position=node.position)
-            if not value_type.is_equivalent(BoolTypeNode(0)):
+            node.type = TYPES.bool
+            if not TYPES.is_equivalent(value_type, TYPES.bool):
                 type_error = True
         else:  # pragma: no cover
             assert False, f'unary operator {operator} is invalid'  # lexer invariant: all unary operators are valid
@@ -199,8 +353,7 @@ class Checker(AbstractVisitor):
             self.module.diagnostics.emit_diagnostic(
                 'error', f'analysis: incompatible operand type for expression: {operator}{value_type}', node.position)
 
-    def visit_binary_expression(self, node: BinaryExpressionNode):
-        super().visit_binary_expression(node)  # visit children
+    def __check_binary_expression(self, node: BinaryExpressionNode):
         operator = node.operator
         left, right = node.left, node.right
         left_type, right_type = left.type, right.type
@@ -208,24 +361,24 @@ class Checker(AbstractVisitor):
         if left_type is None or right_type is None:
             return
 
-        type_error = not left_type.is_equivalent(right_type)
+        type_error = not TYPES.is_equivalent(left_type, right_type)
 
         if operator == '+':
             node.type = left_type
-            type_error = type_error or not (left_type.is_assignable_to(RealTypeNode(0))
-                                            or left_type.is_assignable_to(StringTypeNode(0)))
+            type_error = type_error or not (TYPES.is_assignable(left_type, TYPES.real)
+                                            or TYPES.is_assignable(left_type, TYPES.string))
         elif operator in {'-', '*', '/', '%'}:
             node.type = left_type
-            type_error = type_error or not left_type.is_assignable_to(RealTypeNode(0))
+            type_error = type_error or not TYPES.is_assignable(left_type, TYPES.real)
         elif operator in {'==', '!='}:
-            node.type = BoolTypeNode(node.position)
+            node.type = TYPES.bool
         elif operator in {'<', '<=', '>', '>='}:
-            node.type = BoolTypeNode(node.position)
-            type_error = type_error or not (left_type.is_assignable_to(RealTypeNode(0))
-                                            or left_type.is_assignable_to(StringTypeNode(0)))
+            node.type = TYPES.bool
+            type_error = type_error or not (TYPES.is_assignable(left_type, TYPES.real)
+                                            or TYPES.is_assignable(left_type, TYPES.string))
         elif operator in {'||', '&&'}:
-            node.type = BoolTypeNode(node.position)
-            type_error = type_error or not left_type.is_assignable_to(BoolTypeNode(0))
+            node.type = TYPES.bool
+            type_error = type_error or not TYPES.is_assignable(left_type, TYPES.bool)
         else:  # pragma: no cover
             assert False, f'binary operator {operator} is invalid'  # lexer invariant: all binary operators are valid
 
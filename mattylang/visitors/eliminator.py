@@ -0,0 +1,145 @@
+from typing import cast, Dict, List, Optional, Set
+
+from mattylang.ast import *
+from mattylang.module import Module
+from mattylang.symbols import Symbol
+from mattylang.visitor import AbstractVisitor
+from mattylang.visitors.folder import ConstantFolder
+
+
+def _top_level_statement(node: AbstractNode) -> StatementNode:
+    while not isinstance(node.parent, ChunkNode) or not isinstance(node.parent.parent, ProgramNode):
+        node = cast(AbstractNode, node.parent)
+    return cast(StatementNode, node)
+
+
+class DeadCodeEliminator(AbstractVisitor):
+    """
+    Finds the statements of the checked program the emitters leave out, without modifying the syntax tree (see
+    ConstantFolder): the statements of a chunk following a statement that always reaches a return, break or continue
+    statement, the branch not taken of an if statement whose condition is constant (the statements of the branch taken
+    are emitted in its place), and while statements whose condition is false. With strip_unused_functions, top-level
+    functions that only unused functions reference are left out as well. A condition is constant if it is a bool
+    literal, or with a folder, if it is folded to a bool. Removals are reported as info diagnostics.
+    """
+
+    def __init__(self, module: Module, folder: Optional[ConstantFolder] = None):
+        super().__init__()
+        self.module = module
+        self.folder = folder
+        self.removed: Set[StatementNode] = set()  # statements left out
+        self.branches: Dict[IfStatementNode, Optional[ChunkNode]] = {}  # if statement -> branch taken, if constant
+        self.__terminating: Set[StatementNode] = set()  # statements (and chunks) always reaching a jump
+
+    def expand(self, statement: StatementNode) -> List[StatementNode]:
+        """
+        Returns the statements emitted in place of the statement.
+        """
+        if statement in self.removed:
+            return []
+        elif statement in self.branches:
+            branch = self.branches[cast(IfStatementNode, statement)]
+            return self.statements(branch) if branch is not None else []
+        return [statement]
+
+    def statements(self, node: ChunkNode) -> List[StatementNode]:
+        """
+        Returns the statements emitted for the chunk, no statements are emitted for an empty chunk (it emits pass).
+        """
+        return [emitted for statement in node.statements for emitted in self.expand(statement)]
+
+    def strip_unused_functions(self, program: ProgramNode):
+        """
+        Removes the top-level functions that are not referenced from the program's other top-level statements,
+        directly or through the functions they reference. Runs before the declarations are renamed, so removals are
+        reported with the names in the source.
+        """
+        functions: Dict[Symbol, FunctionDefinitionNode] = {}
+        for statement in program.chunk.statements:
+            if isinstance(statement, FunctionDefinitionNode) and statement.identifier.symbol is not None:
+                functions[statement.identifier.symbol] = statement
+
+        used: List[Symbol] = []  # referenced from statements other than function definitions, then to visit
+        uses: Dict[Symbol, List[Symbol]] = {symbol: [] for symbol in functions}  # function -> functions it references
+        for symbol in functions:
+            for reference in symbol.references:
+                statement = _top_level_statement(reference)
+                user: Optional[Symbol] = None  # the function referencing it, if any
+                if isinstance(statement, FunctionDefinitionNode):
+                    user = statement.identifier.symbol
+                if user is not None and user in uses:
+                    uses[user].append(symbol)
+                else:
+                    used.append(symbol)
+
+        # the functions a reachable function references are reachable
+        reachable = set(used)
+        while len(used) > 0:
+            for symbol in uses[used.pop()]:
+                if symbol not in reachable:
+                    reachable.add(symbol)
+                    used.append(symbol)
+
+        for symbol, function in functions.items():
+            if symbol not in reachable:
+                self.removed.add(function)
+                self.module.diagnostics.emit_diagnostic(
+                    'info', f'emitter: removed unused function {symbol.name}', function.position)
+
+    def __condition(self, node: ExpressionNode) -> Optional[bool]:
+        # the value of a constant condition, None if not constant
+        if self.folder is not None:
+            value = self.folder.constants.get(self.folder.resolve(node))
+            return value if isinstance(value, bool) else None
+        return node.value if isinstance(node, BoolLiteralNode) else None
+
+    def visit_chunk(self, node: ChunkNode):
+        for index, statement in enumerate(node.statements):
+            statement.accept(self)
+            if statement in self.__terminating:
+                self.__terminating.add(node)
+                unreachable = node.statements[index + 1:]
+                if len(unreachable) > 0:
+                    self.removed.update(unreachable)
+                    self.module.diagnostics.emit_diagnostic(
+                        'info', f'emitter: removed {len(unreachable)} unreachable statement(s)',
+                        unreachable[0].position)
+                break
+
+    def visit_if_statement(self, node: IfStatementNode):
+        condition = self.__condition(node.condition)
+        if condition is None:
+            super().visit_if_statement(node)  # visit children
+            if node.else_body is not None and node.if_body in self.__terminating \
+                    and node.else_body in self.__terminating:
+                self.__terminating.add(node)
+            return
+
+        # only the branch taken is visited, the other branch is removed as a whole
+        branch, removed = (node.if_body, node.else_body) if condition else (node.else_body, node.if_body)
+        self.branches[node] = branch
+        if branch is not None:
+            branch.accept(self)
+            if branch in self.__terminating:
+                self.__terminating.add(node)
+        if removed is not None:
+            self.module.diagnostics.emit_diagnostic(
+                'info', f'emitter: removed {"else" if condition else "if"} branch of if statement with a constant '
+                        'condition', removed.position)
+
+    def visit_while_statement(self, node: WhileStatementNode):
+        if self.__condition(node.condition) is False:
+            self.removed.add(node)
+            self.module.diagnostics.emit_diagnostic(
+                'info', 'emitter: removed while statement with a false condition', node.position)
+        else:
+            super().visit_while_statement(node)  # visit children
+
+    def visit_return_statement(self, node: ReturnStatementNode):
+        self.__terminating.add(node)
+
+    def visit_break_statement(self, node: BreakStatementNode):
+        self.__terminating.add(node)
+
+    def visit_continue_statement(self, node: ContinueStatementNode):
+        self.__terminating.add(node)
@@ -1,82 +1,186 @@
+import ast
+import builtins
+import keyword
+import math
+from typing import cast, Dict, List, Optional, Set, TextIO, Tuple, Union
+
 from mattylang.ast import *
 from mattylang.module import Module
-from mattylang.symbols import Symbol
+from mattylang.symbols import Symbol, SymbolTable
 from mattylang.visitor import AbstractVisitor
+from mattylang.visitors.eliminator import DeadCodeEliminator
+from mattylang.visitors.folder import Constant, ConstantFolder
+
+
+# Python keywords and builtins, which declarations are renamed away from (the emitted code runs with the builtins)
+PYTHON_RESERVED = frozenset(keyword.kwlist) | frozenset(dir(builtins))
+
+
+class _Namespace:
+    """
+    The names of a Python function (a boundary scope) or of the module (the global scope), excluding nested functions.
+    """
+
+    def __init__(self, scope: SymbolTable):
+        self.scope = scope
+        self.used: Set[str] = set()  # names declared in the namespace, or allocated by renaming
+        self.suffixes: Dict[str, int] = {}  # name -> next suffix to try
+        self.visible: Dict[str, int] = {}  # name -> number of declarations in the open scopes of the namespace
 
+        scopes = [scope]  # the scopes of the namespace
+        while len(scopes) > 0:
+            scope = scopes.pop()
+            self.used.update(scope.variables)
+            scopes += [child for child in scope.children if not child.boundary]
 
-# Renames variables to handle collisions of variables within the same function scope in Python.
-# TODO(v2.0): handle collisions of variables that are named Python keywords
+
+# Renames variables to handle collisions of variables within the same function scope in Python, and variables named
+# Python keywords or builtins. The declarations of a scope are renamed when entering it, before any reference to them
+# is visited, with names allocated per function from a suffix counter per name (O(1) amortized per declaration).
 class PythonSafeVariableRenamer(AbstractVisitor):
     def __init__(self, module: Module):
         super().__init__()
         self.module = module
-
-    def __handle_declaration(self, symbol: Symbol):
+        self.renamed: List[Tuple[Symbol, str]] = []  # (symbol, original name), in renaming order
+        self.__namespaces: List[_Namespace] = []  # open namespaces, innermost last
+
+    def visit_chunk(self, node: ChunkNode):
+        self.enter_chunk(node)
+        super().visit_chunk(node)  # visit children
+        self.exit_chunk(node)
+
+    def enter_chunk(self, node: ChunkNode):
+        scope = node.get_scope()
+        if len(self.__namespaces) == 0:  # the program's chunk, the global scope is its parent
+            self.__namespaces.append(_Namespace(cast(SymbolTable, scope.parent)))
+            self.__open_scope(cast(SymbolTable, scope.parent), rename=False)
+        self.__open_scope(scope)
+
+    def exit_chunk(self, node: ChunkNode):
+        scope = node.get_scope()
+        self.__close_scope(scope)
+        if len(self.__namespaces) == 1 and self.__namespaces[0].scope is scope.parent:
+            self.__namespaces.pop()
+
+    def visit_function_definition(self, node: FunctionDefinitionNode):
+        scope = cast(SymbolTable, node.body.get_scope().parent)  # the boundary scope, declaring the parameters
+        self.__namespaces.append(_Namespace(scope))
+        self.__open_scope(scope)
+        node.body.accept(self)
+        self.__namespaces.pop()
+
+    def __open_scope(self, scope: SymbolTable, rename: bool = True):
+        namespace = self.__namespaces[-1]
+        visible = namespace.visible
+        if rename:
+            for symbol in scope.slots:
+                # rename if the name is reserved, or declared in an enclosing scope of the same function
+                if symbol.name in PYTHON_RESERVED or visible.get(symbol.name, 0) > 0:
+                    self.__rename(namespace, symbol)
+        for name in scope.variables:
+            visible[name] = visible.get(name, 0) + 1
+
+    def __close_scope(self, scope: SymbolTable):
+        visible = self.__namespaces[-1].visible
+        for name in scope.variables:
+            visible[name] -= 1
+
+    def __is_used(self, name: str) -> bool:
+        # names of enclosing functions can be referenced from nested functions
+        return name in PYTHON_RESERVED or any(name in namespace.used for namespace in self.__namespaces)
+
+    def __rename(self, namespace: '_Namespace', symbol: Symbol):
         name = symbol.name
-        new_name = name
 
-        # generate a new variable name if the current name was previously used
-        if symbol.scope.parent is not None and not symbol.scope.boundary:
-            i = 1
-            while symbol.scope.parent.lookup(new_name, True) is not None:
-                new_name = f'{name}_{i}'
-                i += 1
-
-        # skip renaming if name is not previously used
-        if name == new_name:
-            return
+        # allocate the next unused suffix
+        i = namespace.suffixes.get(name, 1)
+        new_name = f'{name}_{i}'
+        while self.__is_used(new_name):
+            i += 1
+            new_name = f'{name}_{i}'
+        namespace.suffixes[name] = i + 1
+        namespace.used.add(new_name)
 
+        self.renamed.append((symbol, name))
         symbol.rename(new_name)
         self.module.diagnostics.emit_diagnostic(
             'info', f'emitter: renamed variable {name} to {new_name}', symbol.get_node().position)
 
-    def visit_variable_definition(self, node: VariableDefinitionNode):
-        self.__handle_declaration(node.identifier.get_symbol())
-        super().visit_variable_definition(node)
-
-    def visit_function_definition(self, node: 'FunctionDefinitionNode'):
-        self.__handle_declaration(node.identifier.get_symbol())
-        super().visit_function_definition(node)
-
 
 class Emitter(AbstractVisitor):
-    def __init__(self, module: Module):
+    """
+    Emits the program as Python source text. Given a sink (e.g., a file or a pipe), the lines of each top-level
+    statement are written to it, each followed by a newline, once the statement is emitted, so only the lines of one
+    statement are held at a time. Otherwise, the lines are held until the emitter is converted to a string.
+    """
+
+    def __init__(self, module: Module, sink: Optional[TextIO] = None, folder: Optional[ConstantFolder] = None,
+                 eliminator: Optional[DeadCodeEliminator] = None):
         super().__init__()
         self.module = module
+        self.sink = sink
+        self.folder = folder  # the folded constants and simplified expressions emitted in place of expressions
+        self.eliminator = eliminator  # the statements left out, or emitted in place of if statements
         self.__lines = list[str]()
         self.__statement: str = ''
         self.__depth: int = 0
 
     def __str__(self):
-        return '\n'.join(self.__lines)
+        return '\n'.join(self.__lines)  # with a sink, the lines not written yet
+
+    def flush(self):
+        """
+        Writes the lines emitted so far to the sink (if any), called after each top-level statement.
+        """
+        if self.sink is not None and len(self.__lines) > 0:
+            self.__lines.append('')  # the last line's newline
+            self.sink.write('\n'.join(self.__lines))
+            self.__lines.clear()
 
     def __write_line(self, stmt: str):
         self.__lines.append(('    ' * self.__depth) + stmt)
 
+    def __emit_expression(self, node: ExpressionNode):
+        folder = self.folder
+        if folder is not None:
+            node = folder.resolve(node)
+            if node in folder.constants:
+                self.__statement += repr(folder.constants[node])  # the literal of a None, bool, float or str
+                return
+        node.accept(self)
+
     def visit_program(self, node: 'ProgramNode'):
         # pass 1: rename variables to handle collisions of variables within the same function scope in Python
         node.accept(PythonSafeVariableRenamer(self.module))
         super().visit_program(node)
 
     def visit_chunk(self, node: 'ChunkNode'):
-        if len(node.statements) == 0:
+        statements = node.statements if self.eliminator is None else self.eliminator.statements(node)
+        if len(statements) == 0:
             self.__write_line('pass')
-        else:
-            super().visit_chunk(node)
+        elif self.__depth > 0:
+            for statement in statements:
+                statement.accept(self)
+        else:  # the program's chunk, each statement is written once emitted
+            for statement in statements:
+                statement.accept(self)
+                self.flush()
+        if self.__depth == 0:
+            self.flush()
 
     def visit_variable_definition(self, node: VariableDefinitionNode):
         self.__statement = f'{node.identifier.value} = '
-        node.initializer.accept(self)
+        self.__emit_expression(node.initializer)
         self.__write_line(self.__statement)
 
     def visit_variable_assignment(self, node: VariableAssignmentNode):
         self.__statement = f'{node.identifier.value} = '
-        node.value.accept(self)
+        self.__emit_expression(node.value)
         self.__write_line(self.__statement)
 
     def visit_if_statement(self, node: 'IfStatementNode'):
         self.__statement = 'if '
-        node.condition.accept(self)
+        self.__emit_expression(node.condition)
         self.__statement += ':'
         self.__write_line(self.__statement)
         self.__depth += 1
@@ -90,7 +194,7 @@ class Emitter(AbstractVisitor):
 
     def visit_while_statement(self, node: 'WhileStatementNode'):
         self.__statement = 'while '
-        node.condition.accept(self)
+        self.__emit_expression(node.condition)
         self.__statement += ':'
         self.__write_line(self.__statement)
         self.__depth += 1
@@ -121,7 +225,7 @@ class Emitter(AbstractVisitor):
     def visit_return_statement(self, node: 'ReturnStatementNode'):
         if node.value:
             self.__statement = 'return '
-            node.value.accept(self)
+            self.__emit_expression(node.value)
         else:
             self.__statement = 'return'
         self.__write_line(self.__statement)
@@ -151,27 +255,248 @@ class Emitter(AbstractVisitor):
         for i, arg in enumerate(node.arguments):
             if i > 0:
                 self.__statement += ', '
-            arg.accept(self)
+            self.__emit_expression(arg)
         self.__statement += ')'
 
     def visit_unary_expression(self, node: UnaryExpressionNode):
-        if node.operator == '!':
-            self.__statement += '(not '
-        else:
-            self.__statement += f'({node.operator} '
-        node.operand.accept(self)
-        self.__statement += ')'
+        self.__emit_operations(node)
 
     def visit_binary_expression(self, node: BinaryExpressionNode):
-        self.__statement += '('
-        node.left.accept(self)
+        self.__emit_operations(node)
+
+    # Emits unary and binary expressions from an explicit stack of text and (expression, whether parenthesized), without
+    # recursion. Python rejects expressions nested in over 200 parentheses, so a chain of left-associative operators of
+    # the same precedence is emitted in a single pair, e.g., ((a + b) - c) as (a + b - c), and so is a chain of unary
+    # operators, e.g., (- (- a)) as (- - a).
+    def __emit_operations(self, node: ExpressionNode):
+        folder = self.folder
+        stack: List[Union[str, Tuple[ExpressionNode, bool]]] = [(node, True)]
+        while len(stack) > 0:
+            item = stack.pop()
+            if isinstance(item, str):
+                self.__statement += item
+                continue
+
+            node, parenthesized = item
+            if folder is not None:
+                node = folder.resolve(node)
+                if node in folder.constants:
+                    self.__statement += repr(folder.constants[node])
+                    continue
+
+            if type(node) is BinaryExpressionNode:
+                left = self.__resolve(node.left)
+                chained = type(left) is BinaryExpressionNode and node.operator in _PRECEDENCE_GROUPS \
+                    and _PRECEDENCE_GROUPS.get(left.operator) == _PRECEDENCE_GROUPS[node.operator]
+                stack += [')'] if parenthesized else []
+                stack += [(node.right, True), f' {_PYTHON_OPERATORS.get(node.operator, node.operator)} ']
+                stack += [(node.left, not chained)]
+                stack += ['('] if parenthesized else []
+            elif type(node) is UnaryExpressionNode:
+                chained = type(self.__resolve(node.operand)) is UnaryExpressionNode
+                stack += [')'] if parenthesized else []
+                stack += [(node.operand, not chained), 'not ' if node.operator == '!' else f'{node.operator} ']
+                stack += ['('] if parenthesized else []
+            else:
+                node.accept(self)
+
+    # the expression emitted in place of an expression, None for a folded constant
+    def __resolve(self, node: ExpressionNode) -> Optional[ExpressionNode]:
+        if self.folder is None:
+            return node
+        node = self.folder.resolve(node)
+        return node if node not in self.folder.constants else None
+
+
+# Python spellings of the operators spelled differently
+_PYTHON_OPERATORS = {'||': 'or', '&&': 'and'}
+
+# left-associative operators -> their Python precedence group (comparisons chain in Python, they are not listed)
+_PRECEDENCE_GROUPS = {'||': 'or', '&&': 'and', '+': '+', '-': '+', '*': '*', '/': '*', '%': '*'}
+
+
+# operators and contexts carry no location, so (like ast.parse) a single instance of each is shared
+_ARITHMETIC_OPERATORS = {'+': ast.Add(), '-': ast.Sub(), '*': ast.Mult(), '/': ast.Div(), '%': ast.Mod()}
+_COMPARISON_OPERATORS = {'<': ast.Lt(), '>': ast.Gt(), '<=': ast.LtE(), '>=': ast.GtE(), '==': ast.Eq(), '!=': ast.NotEq()}
+_LOGICAL_OPERATORS = {'&&': ast.And(), '||': ast.Or()}
+_UNARY_OPERATORS = {'!': ast.Not(), '-': ast.USub()}
+_LOAD, _STORE = ast.Load(), ast.Store()
+
+
+class PythonAstEmitter(AbstractVisitor):
+    """
+    Emits the program as a Python syntax tree, located with the module's line map, which compile() accepts without
+    the generated source text being built and parsed again (ast.unparse produces the source text on demand).
+    Every node with a location is located as it is created, so the tree needs no ast.fix_missing_locations pass.
+    The tree has the structure of the Emitter's output once parsed, except that chains of ands and ors are nested.
+    """
+
+    def __init__(self, module: Module, folder: Optional[ConstantFolder] = None,
+                 eliminator: Optional[DeadCodeEliminator] = None):
+        super().__init__()
+        self.module = module
+        self.folder, self.eliminator = folder, eliminator  # see Emitter
+        self.__body: List[ast.stmt] = []  # statements of the chunk being emitted
+        self.__expression: Optional[ast.expr] = None  # the last expression emitted
+        self.__line, self.__line_start, self.__line_end = 0, 0, 0  # the line of the last node located, and its span
+
+    def get_tree(self) -> ast.Module:
+        return ast.Module(body=self.__body, type_ignores=[])
+
+    def __locate(self, python_node: ast.AST, node: AbstractNode) -> ast.AST:
+        position = node.position
+        if not self.__line_start <= position < self.__line_end:
+            # nodes are mostly emitted in source order, so the line is looked up once per line rather than per node
+            line_map = self.module.line_map
+            self.__line = line_map.get_line(position)
+            self.__line_start = line_map.get_position(self.__line)
+            try:
+                self.__line_end = line_map.get_position(self.__line + 1)
+            except IndexError:
+                self.__line_end = len(self.module.source)
+        python_node.lineno = python_node.end_lineno = self.__line  # type: ignore
+        python_node.col_offset = python_node.end_col_offset = position - self.__line_start  # type: ignore
+        return python_node
+
+    def __statement(self, statement: ast.stmt, node: AbstractNode):
+        self.__body.append(cast(ast.stmt, self.__locate(statement, node)))
+
+    def __emit_expression(self, node: ExpressionNode) -> ast.expr:
+        folder = self.folder
+        if folder is not None:
+            node = folder.resolve(node)
+            if node in folder.constants:
+                return self.__constant(folder.constants[node], node)
+        node.accept(self)
+        return cast(ast.expr, self.__expression)
+
+    def __constant(self, value: Constant, node: ExpressionNode) -> ast.expr:
+        if isinstance(value, float) and math.copysign(1, value) < 0:  # parsed as a negated literal
+            operand = cast(ast.expr, self.__locate(ast.Constant(value=-value), node))
+            return cast(ast.expr, self.__locate(ast.UnaryOp(op=_UNARY_OPERATORS['-'], operand=operand), node))
+        return cast(ast.expr, self.__locate(ast.Constant(value=value), node))
+
+    def __emit_block(self, node: ChunkNode) -> List[ast.stmt]:
+        body, self.__body = self.__body, []
+        node.accept(self)
+        body, self.__body = self.__body, body
+        return body
+
+    def __name(self, node: IdentifierNode, context: ast.expr_context) -> ast.Name:
+        return cast(ast.Name, self.__locate(ast.Name(id=node.value, ctx=context), node))
+
+    def visit_program(self, node: ProgramNode):
+        node.accept(PythonSafeVariableRenamer(self.module))
+        super().visit_program(node)
 
-        if node.operator == '||':
-            self.__statement += ' or '
-        elif node.operator == '&&':
-            self.__statement += ' and '
+    def visit_chunk(self, node: ChunkNode):
+        statements = node.statements if self.eliminator is None else self.eliminator.statements(node)
+        if len(statements) == 0:
+            self.__statement(ast.Pass(), node)
         else:
-            self.__statement += f' {node.operator} '
+            for statement in statements:
+                statement.accept(self)
 
-        node.right.accept(self)
-        self.__statement += ')'
+    def visit_variable_definition(self, node: VariableDefinitionNode):
+        value = self.__emit_expression(node.initializer)
+        self.__statement(ast.Assign(targets=[self.__name(node.identifier, _STORE)], value=value), node)
+
+    def visit_variable_assignment(self, node: VariableAssignmentNode):
+        value = self.__emit_expression(node.value)
+        self.__statement(ast.Assign(targets=[self.__name(node.identifier, _STORE)], value=value), node)
+
+    def visit_if_statement(self, node: IfStatementNode):
+        test = self.__emit_expression(node.condition)
+        body = self.__emit_block(node.if_body)
+        orelse = self.__emit_block(node.else_body) if node.else_body is not None else []
+        self.__statement(ast.If(test=test, body=body, orelse=orelse), node)
+
+    def visit_while_statement(self, node: WhileStatementNode):
+        test = self.__emit_expression(node.condition)
+        self.__statement(ast.While(test=test, body=self.__emit_block(node.body), orelse=[]), node)
+
+    def visit_break_statement(self, node: BreakStatementNode):
+        self.__statement(ast.Break(), node)
+
+    def visit_continue_statement(self, node: ContinueStatementNode):
+        self.__statement(ast.Continue(), node)
+
+    def visit_function_definition(self, node: FunctionDefinitionNode):
+        parameters = [cast(ast.arg, self.__locate(ast.arg(arg=parameter.identifier.value), parameter))
+                      for parameter in node.parameters]
+        arguments = ast.arguments(posonlyargs=[], args=parameters, kwonlyargs=[], kw_defaults=[], defaults=[])
+        function = ast.FunctionDef(name=node.identifier.value, args=arguments, body=self.__emit_block(node.body),
+                                   decorator_list=[], returns=None)
+        if 'type_params' in ast.FunctionDef._fields:  # Python 3.12+
+            function.type_params = []  # type: ignore
+        self.__statement(function, node)
+
+    def visit_return_statement(self, node: ReturnStatementNode):
+        value = self.__emit_expression(node.value) if node.value is not None else None
+        self.__statement(ast.Return(value=value), node)
+
+    def visit_call_statement(self, node: CallStatementNode):
+        self.__statement(ast.Expr(value=self.__emit_expression(node.call_expression)), node)
+
+    def visit_nil_literal(self, node: NilLiteralNode):
+        self.__expression = cast(ast.expr, self.__locate(ast.Constant(value=None), node))
+
+    def visit_bool_literal(self, node: BoolLiteralNode):
+        self.__expression = cast(ast.expr, self.__locate(ast.Constant(value=node.value), node))
+
+    def visit_real_literal(self, node: RealLiteralNode):
+        self.__expression = cast(ast.expr, self.__locate(ast.Constant(value=node.value), node))
+
+    def visit_string_literal(self, node: StringLiteralNode):
+        self.__expression = cast(ast.expr, self.__locate(ast.Constant(value=node.value), node))
+
+    def visit_identifier(self, node: IdentifierNode):
+        self.__expression = self.__name(node, _LOAD)
+
+    def visit_call_expression(self, node: CallExpressionNode):
+        arguments = [self.__emit_expression(argument) for argument in node.arguments]
+        call = ast.Call(func=self.__name(node.identifier, _LOAD), args=arguments, keywords=[])
+        self.__expression = cast(ast.expr, self.__locate(call, node))
+
+    def visit_unary_expression(self, node: UnaryExpressionNode):
+        self.__expression = self.__emit_operations(node)
+
+    def visit_binary_expression(self, node: BinaryExpressionNode):
+        self.__expression = self.__emit_operations(node)
+
+    # Emits unary and binary expressions bottom-up from an explicit stack of (expression, whether its operands are
+    # emitted), without recursion: the operands' Python expressions are pushed on a value stack.
+    def __emit_operations(self, node: ExpressionNode) -> ast.expr:
+        folder = self.folder
+        values: List[ast.expr] = []
+        stack: List[Tuple[ExpressionNode, bool]] = [(node, False)]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            expression: ast.expr
+            if expanded and type(node) is BinaryExpressionNode:
+                right, left = values.pop(), values.pop()
+                operator = node.operator
+                if operator in _LOGICAL_OPERATORS:
+                    expression = ast.BoolOp(op=_LOGICAL_OPERATORS[operator], values=[left, right])
+                elif operator in _COMPARISON_OPERATORS:
+                    expression = ast.Compare(left=left, ops=[_COMPARISON_OPERATORS[operator]], comparators=[right])
+                else:
+                    expression = ast.BinOp(left=left, op=_ARITHMETIC_OPERATORS[operator], right=right)
+                values.append(cast(ast.expr, self.__locate(expression, node)))
+            elif expanded and type(node) is UnaryExpressionNode:
+                expression = ast.UnaryOp(op=_UNARY_OPERATORS[node.operator], operand=values.pop())
+                values.append(cast(ast.expr, self.__locate(expression, node)))
+            else:
+                if folder is not None:
+                    node = folder.resolve(node)
+                    if node in folder.constants:
+                        values.append(self.__constant(folder.constants[node], node))
+                        continue
+                if type(node) is BinaryExpressionNode:
+                    stack += [(node, True), (node.right, False), (node.left, False)]
+                elif type(node) is UnaryExpressionNode:
+                    stack += [(node, True), (node.operand, False)]
+                else:
+                    node.accept(self)
+                    values.append(cast(ast.expr, self.__expression))
+        return values[0]
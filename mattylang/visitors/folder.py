@@ -0,0 +1,159 @@
+import math
+from typing import cast, Dict, Optional, Union
+
+from mattylang.ast import *
+from mattylang.module import Module
+from mattylang.symbols import Symbol
+from mattylang.types import TYPES
+from mattylang.visitor import AbstractVisitor, operator_postorder
+
+# The value of a constant expression, as the emitted Python code computes it.
+Constant = Union[None, bool, float, str]
+
+_MAX_FOLDED_STRING = 4096  # longer strings are computed at runtime, as CPython's optimizer does
+_MAX_PROPAGATED_STRING = 16  # longer strings are referenced through their variable rather than copied into each use
+
+_UNARY = {
+    '!': lambda operand: not operand,
+    '-': lambda operand: -operand,
+}
+
+_BINARY = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+    '/': lambda left, right: left / right,
+    '%': lambda left, right: left % right,
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+}
+
+
+def _is_zero(value: float, sign: int) -> bool:
+    return value == 0 and math.copysign(1, value) == sign
+
+
+class ConstantFolder(AbstractVisitor):
+    """
+    Folds the checked program's constant expressions and simplifies identities, without modifying the syntax tree:
+    the emitters look the results up, so folded expressions keep their nodes' positions.
+    An expression is constant if made of literals and references to variables initialized with a constant that are
+    never assigned. An operation is only folded where Python computes the same value at runtime, so divisions by zero
+    (which raise), results that are not finite (which have no literal) and long strings are left to run, and a string
+    variable's value is only propagated into its uses if short (the emitted code would repeat it otherwise).
+    Identities are only simplified where they hold for every value of the operand's type: x + 0 is not (-0 + 0 is 0).
+    """
+
+    def __init__(self, module: Module):
+        super().__init__()
+        self.module = module
+        self.constants: Dict[ExpressionNode, Constant] = {}  # folded expression -> value
+        self.replacements: Dict[ExpressionNode, ExpressionNode] = {}  # simplified expression -> its equivalent operand
+        self.__variables: Dict[Symbol, Constant] = {}  # constant variable -> value
+
+    def resolve(self, node: ExpressionNode) -> ExpressionNode:
+        """
+        Returns the expression emitted in place of the expression (itself if not simplified).
+        """
+        replacements = self.replacements
+        while node in replacements:
+            node = replacements[node]
+        return node
+
+    def __constant(self, node: ExpressionNode) -> Optional[Constant]:
+        return self.constants.get(self.resolve(node))
+
+    def __is_constant(self, node: ExpressionNode) -> bool:
+        return self.resolve(node) in self.constants
+
+    def __fold(self, node: ExpressionNode, value: Constant):
+        if isinstance(value, float) and not math.isfinite(value):
+            return
+        if isinstance(value, str) and len(value) > _MAX_FOLDED_STRING:
+            return
+        self.constants[node] = value
+
+    def visit_variable_definition(self, node: VariableDefinitionNode):
+        super().visit_variable_definition(node)
+        symbol = node.identifier.symbol
+        if symbol is not None and self.__is_constant(node.initializer) and not any(
+                isinstance(reference.parent, VariableAssignmentNode) and reference.parent.identifier == reference
+                for reference in symbol.references):
+            value = self.__constant(node.initializer)
+            if not (isinstance(value, str) and len(value) > _MAX_PROPAGATED_STRING):
+                self.__variables[symbol] = value
+
+    def visit_nil_literal(self, node: NilLiteralNode):
+        self.constants[node] = None
+
+    def visit_bool_literal(self, node: BoolLiteralNode):
+        self.constants[node] = node.value
+
+    def visit_real_literal(self, node: RealLiteralNode):
+        self.constants[node] = node.value
+
+    def visit_string_literal(self, node: StringLiteralNode):
+        self.constants[node] = node.value
+
+    def visit_identifier(self, node: IdentifierNode):
+        if node.symbol in self.__variables:  # only references follow the definition
+            self.constants[node] = self.__variables[node.symbol]
+
+    def visit_unary_expression(self, node: UnaryExpressionNode):
+        self.__fold_operations(node)
+
+    def visit_binary_expression(self, node: BinaryExpressionNode):
+        self.__fold_operations(node)
+
+    # folds the operands of unary and binary expressions before them, without recursion (see operator_postorder)
+    def __fold_operations(self, node: ExpressionNode):
+        for expression in operator_postorder(node):
+            if type(expression) is BinaryExpressionNode:
+                self.__fold_binary_expression(expression)
+            elif type(expression) is UnaryExpressionNode:
+                self.__fold_unary_expression(expression)
+            else:
+                expression.accept(self)
+
+    def __fold_unary_expression(self, node: UnaryExpressionNode):
+        operand = node.operand
+        if self.__is_constant(operand):
+            self.__fold(node, _UNARY[node.operator](self.__constant(operand)))
+        elif node.operator == '!' and isinstance(operand, UnaryExpressionNode) and operand.operator == '!' \
+                and operand.operand.type is TYPES.bool:
+            self.replacements[node] = operand.operand  # !!b = b
+
+    def __fold_binary_expression(self, node: BinaryExpressionNode):
+        operator, left, right = node.operator, node.left, node.right
+        left_constant, right_constant = self.__is_constant(left), self.__is_constant(right)
+
+        if operator in ('&&', '||'):  # the right operand is only evaluated if the left operand does not decide
+            if left_constant:
+                deciding = self.__constant(left) is (operator == '||')
+                if deciding:
+                    self.__fold(node, self.__constant(left))  # true || e = true, false && e = false
+                else:
+                    self.replacements[node] = right  # true && e = e, false || e = e
+            elif right_constant and left.type is TYPES.bool and self.__constant(right) is (operator == '&&'):
+                self.replacements[node] = left  # b && true = b, b || false = b
+        elif left_constant and right_constant:
+            left_value, right_value = self.__constant(left), self.__constant(right)
+            if not (operator in ('/', '%') and right_value == 0):
+                self.__fold(node, _BINARY[operator](left_value, right_value))
+        elif right_constant and left.type is TYPES.real:
+            value = cast(float, self.__constant(right))
+            if (operator in ('*', '/') and value == 1) or (operator == '-' and _is_zero(value, 1)) \
+                    or (operator == '+' and _is_zero(value, -1)):
+                self.replacements[node] = left  # x * 1 = x / 1 = x - 0 = x + -0 = x
+        elif left_constant and right.type is TYPES.real:
+            value = cast(float, self.__constant(left))
+            if (operator == '*' and value == 1) or (operator == '+' and _is_zero(value, -1)):
+                self.replacements[node] = right  # 1 * x = -0 + x = x
+        elif operator == '+' and (right_constant and left.type is TYPES.string and self.__constant(right) == ''):
+            self.replacements[node] = left  # s + "" = s
+        elif operator == '+' and (left_constant and right.type is TYPES.string and self.__constant(left) == ''):
+            self.replacements[node] = right  # "" + s = s
@@ -106,16 +106,27 @@ class AstPrinter(AbstractVisitor):
         self.indent -= 1
 
     def visit_unary_expression(self, node: UnaryExpressionNode):
-        self.__header(node)
-        self.indent += 1
-        super().visit_unary_expression(node)
-        self.indent -= 1
+        self.__print_operations(node)
 
     def visit_binary_expression(self, node: BinaryExpressionNode):
-        self.__header(node)
-        self.indent += 1
-        super().visit_binary_expression(node)
-        self.indent -= 1
+        self.__print_operations(node)
+
+    # prints unary and binary expressions from an explicit stack of (expression, indent), without recursion
+    def __print_operations(self, node: ExpressionNode):
+        indent = self.indent
+        stack: List[Tuple[ExpressionNode, int]] = [(node, indent)]
+        while len(stack) > 0:
+            node, self.indent = stack.pop()
+            if type(node) is BinaryExpressionNode:
+                self.__header(node)
+                stack.append((node.right, self.indent + 1))
+                stack.append((node.left, self.indent + 1))
+            elif type(node) is UnaryExpressionNode:
+                self.__header(node)
+                stack.append((node.operand, self.indent + 1))
+            else:
+                node.accept(self)
+        self.indent = indent
 
     def visit_nil_type(self, node: NilTypeNode):
         self.__header(node)
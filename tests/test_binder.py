@@ -1,6 +1,9 @@
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
 from typing import Any, cast
 
+from mattylang import compile
 from mattylang.ast import *
 from mattylang.globals import Globals
 from mattylang.module import Module
@@ -90,3 +93,100 @@ class BinderTest(unittest.TestCase):
                    1 else diagnostic.message) for idx, diagnostic in enumerate(module.diagnostics)]
 
         self.assertEqual(result, expected)
+
+    def test_enclosing(self):
+        source = 'while (true) { if (true) { break } def f() { while (false) continue return 1 } }\n'
+        result = compile('test', source, no_emit=True)
+        self.assertEqual(len(result.module.diagnostics), 0)
+
+        ast_view = cast(Any, result.ast)
+        loop = ast_view.chunk.statements[0]
+        if_body = loop.body.statements[0].if_body
+        function = loop.body.statements[1]
+        inner_loop = function.body.statements[0]
+
+        # chunks record their enclosing function and loop, loops do not extend into functions
+        self.assertEqual((ast_view.chunk.function, ast_view.chunk.loop), (None, None))
+        self.assertEqual((if_body.function, if_body.loop), (None, loop))
+        self.assertEqual((function.body.function, function.body.loop), (function, None))
+        self.assertEqual((inner_loop.body.function, inner_loop.body.loop), (function, inner_loop))
+
+        self.assertEqual(if_body.statements[0].get_enclosing_loop_statement(), loop)
+        self.assertEqual(inner_loop.body.statements[0].get_enclosing_loop_statement(), inner_loop)
+        self.assertEqual(function.body.statements[1].get_enclosing_function_definition(), function)
+        self.assertEqual(function.body.statements[1].value.get_enclosing_function(), function)
+        self.assertEqual(function.identifier.get_enclosing_function(), function)
+        self.assertIsNone(loop.condition.get_enclosing_function())
+
+        result = compile('test', 'while (true) { def f() { break } }\n', no_emit=True)
+        self.assertEqual([diagnostic.message for diagnostic in result.module.diagnostics],
+                         ['analysis: break statement outside of loop'])
+
+    def test_coordinates(self):
+        source = 'def x = 1\ndef f(n: Real) { def x = n\nif (true) { def x = x\nprint(x) }\nreturn f(x) }\n'
+        result = compile('test', source, no_emit=True)
+        self.assertEqual(len(result.module.diagnostics), 0)
+
+        # identifiers store the (scope depth, slot) coordinate of their symbol, globals are at depth 0
+        # functions are declared first, when entering their chunk
+        ast_view = cast(Any, result.ast)
+        function = ast_view.chunk.statements[1]
+        if_body = function.body.statements[1].if_body
+        self.assertEqual(ast_view.chunk.statements[0].identifier.coordinate, (1, 1))
+        self.assertEqual(function.identifier.coordinate, (1, 0))
+        self.assertEqual(function.parameters[0].identifier.coordinate, (2, 0))
+        self.assertEqual(function.body.statements[0].identifier.coordinate, (3, 0))
+        self.assertEqual(if_body.statements[0].initializer.coordinate, (3, 0))
+        self.assertEqual(if_body.statements[0].identifier.coordinate, (4, 0))
+        self.assertEqual(if_body.statements[1].call_expression.identifier.coordinate, (0, 0))
+        self.assertEqual(function.body.statements[2].value.identifier.coordinate, (1, 0))
+
+        for identifier in (function.identifier, if_body.statements[0].initializer):
+            symbol = identifier.symbol
+            self.assertIs(symbol.scope.slots[identifier.coordinate[1]], symbol)
+
+    def test_declarations(self):
+        # functions are declared when entering their chunk, variables when defined
+        source = 'def f() { return g() }\ndef g() { return h }\ndef a = b\ndef b = 1\ndef h() { def h = h }\n'
+        result = compile('test', source, no_emit=True)
+        self.assertEqual([diagnostic.message for diagnostic in result.module.diagnostics],
+                         ['analysis: undefined reference to b'])
+
+        ast_view = cast(Any, result.ast)
+        f, g, h = ast_view.chunk.statements[0], ast_view.chunk.statements[1], ast_view.chunk.statements[4]
+        self.assertIs(f.body.statements[0].value.identifier.symbol, g.identifier.symbol)
+        self.assertIs(g.body.statements[0].value.symbol, h.identifier.symbol)
+        self.assertIs(h.body.statements[0].initializer.symbol, h.identifier.symbol)
+
+        # a function is a duplicate of an earlier variable or function of the same name
+        result = compile('test', 'def x = 1\ndef x() {}\ndef y() {}\ndef y() {}\n', no_emit=True)
+        self.assertEqual([(diagnostic.message, diagnostic.position) for diagnostic in result.module.diagnostics],
+                         [('analysis: duplicate definition of x', 14), ('analysis: duplicate definition of y', 36)])
+
+    def test_forward_references(self):
+        even = 'def even(n: Real) { if (n == 0) return true\nreturn odd(n - 1) }\n'
+        odd = 'def odd(n: Real) { if (n == 0) return false\nreturn even(n - 1) }\n'
+        sources = [  # (source, diagnostics)
+            ('print(even(4))\n' + even + odd, [('analysis: undefined reference to even', 6)]),
+            ('if (true) { def e = even }\n' + even + odd, [('analysis: undefined reference to even', 20)]),
+            # the function is defined, but depends on a function that is not
+            (even + 'print(even(4))\n' + odd, [('analysis: even is referenced before the definition of odd', 70)]),
+            ('def f() { def a = h()\ndef h() { return 1 }\nreturn a }', [('analysis: undefined reference to h', 18)]),
+            ('def f() { def g() { return h() }\ndef a = g()\ndef h() { return 1 }\nreturn a }',
+             [('analysis: g is referenced before the definition of h', 41)]),
+        ]
+        for source, expected in sources:
+            result = compile('test', source)
+            self.assertEqual([(diagnostic.message, diagnostic.position) for diagnostic in result.module.diagnostics],
+                             expected, source)
+            self.assertIsNone(result.code)
+
+        # mutually recursive functions run once defined, whatever order they reference each other in
+        for source, expected_output in [(even + odd + 'print(even(4))', 'True\n'),
+                                        (odd + even + 'print(odd(4))', 'False\n')]:
+            result = compile('test', source)
+            self.assertEqual(len(result.module.diagnostics), 0)
+            output = StringIO()
+            with redirect_stdout(output):
+                exec(result.get_code_object(), {})
+            self.assertEqual(output.getvalue(), expected_output)
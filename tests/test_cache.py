@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from mattylang import compile
+from mattylang.cache import get_cache_path, load_code, store_code
+
+
+class CacheTest(unittest.TestCase):
+    def test(self):
+        source = 'def x = 1\ndef f(n: Real) { return n * 2 }\nx = f(x)'
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'test.mtl')
+            self.assertIsNone(load_code(file, source))
+
+            code = compile(file, source, backend='ast').get_code_object()
+            assert code is not None
+            self.assertTrue(store_code(file, source, code))
+            self.assertEqual(os.path.dirname(get_cache_path(file)), os.path.join(directory, '__mtlcache__'))
+
+            cached = load_code(file, source)
+            assert cached is not None
+            self.assertEqual(cached.co_filename, file)
+            scope = {}
+            exec(cached, scope)
+            self.assertEqual(scope['x'], 2)
+
+            # the source as bytes (e.g., memory-mapped) has the same key
+            self.assertIsNotNone(load_code(file, source.encode()))
+            self.assertIsNone(load_code(file, source + ' '))
+            self.assertIsNone(load_code(file, source, '-O'))  # compiled with other options
+
+            with open(get_cache_path(file), 'r+b') as fd:
+                fd.truncate(os.path.getsize(get_cache_path(file)) - 1)
+            self.assertIsNone(load_code(file, source))
@@ -1,5 +1,7 @@
 import unittest
+from typing import Any, cast
 
+from mattylang import compile
 from mattylang.ast import *
 from mattylang.globals import Globals
 from mattylang.module import Module
@@ -166,3 +168,51 @@ class CheckerTest(unittest.TestCase):
                    1 else diagnostic.message) for idx, diagnostic in enumerate(module.diagnostics)]
 
         self.assertEqual(result, expected)
+
+    def test_recursion(self):
+        source = '\n'.join([
+            'def even(n: Real) { if (n == 0) return true\nreturn odd(n - 1) }',
+            'def odd(n: Real) { if (n == 0) return false\nreturn even(n - 1) }',
+            'def fib(n: Real) { if (n <= 1) return n\nreturn fib(n - 1) + fib(n - 2) }',
+            'def x = even(4)',
+        ])
+        result = compile('test', source, verbose=True, no_emit=True)
+        self.assertEqual(len(result.module.diagnostics), 0)
+
+        # functions are typed by their first return statement, before or while their definition is checked
+        ast_view = cast(Any, result.ast)
+        statements = ast_view.chunk.statements
+        self.assertEqual(str(statements[3].identifier.type), 'Bool')
+        self.assertEqual(str(statements[0].identifier.type), '(Real) -> Bool')
+        self.assertEqual(str(statements[1].body.statements[1].value.type), 'Bool')
+        fib_sum = statements[2].body.statements[1].value
+        self.assertEqual([str(fib_sum.left.type), str(fib_sum.right.type)], ['Real', 'Real'])
+
+    def test_components(self):
+        # references preceding every return statement are typed by checking the component again
+        source = '\n'.join([
+            'def a(n: Real) { if (n > 0) return b(n - 1) * 2\nreturn n }',
+            'def b(n: Real) { if (n > 1) return c(n - 1) + 1\nreturn a(n) }',
+            'def c(n: Real) { return a(n) - b(n) }',
+            'def f(n: Real) { return f(n) + "x" }',
+        ])
+        result = compile('test', source, verbose=True, no_emit=True)
+        self.assertEqual([(diagnostic.kind, diagnostic.message) for diagnostic in result.module.diagnostics],
+                         [('error', 'analysis: incompatible operand types for expression: Nil + String')])
+
+        ast_view = cast(Any, result.ast)
+        statements = ast_view.chunk.statements
+        self.assertEqual([str(statement.identifier.type) for statement in statements],
+                         ['(Real) -> Real', '(Real) -> Real', '(Real) -> Real', '(Real) -> Nil'])
+
+        # long dependency chains are checked without recursing per function
+        source = '\n'.join([f'def f{i}() {{ return f{i + 1}() }}' for i in range(2000)] + ['def f2000() { return 1 }'])
+        result = compile('test', source, no_emit=True)
+        self.assertFalse(result.module.diagnostics.has_error())
+
+    def test_max_errors(self):
+        source = ''.join(f'def v{i} = {i} + "s"\n' for i in range(10))
+        result = compile('test', source, max_errors=3)
+        # the checker stops at the statement after the one reporting the last error
+        symbols = [statement.identifier.symbol for statement in cast(Any, result.ast).chunk.statements]
+        self.assertEqual([symbol.type is not None for symbol in symbols], [True] * 3 + [False] * 7)
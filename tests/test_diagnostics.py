@@ -15,3 +15,15 @@ class DiagnosticsTest(unittest.TestCase):
         self.assertEqual(list(map(lambda d: d.kind, list(diagnostics))), ['error', 'info', 'warning'])
         self.assertEqual(list(map(lambda d: d.kind if str(d).find(
             f'{d.kind} message') != -1 else str(d), list(diagnostics))), ['error', 'info', 'warning'])
+
+    def test_max_errors(self):
+        diagnostics = Diagnostics(verbose=False, max_errors=2)
+        diagnostics.emit_diagnostic('warning', 'warning message', 0)
+        diagnostics.emit_diagnostic('error', 'error message', 1)
+        self.assertEqual((diagnostics.limit_reached(), diagnostics.remaining_errors()), (False, 1))
+        diagnostics.emit_diagnostic('error', 'error message', 2)
+        self.assertEqual(diagnostics.limit_reached(), True)
+        diagnostics.emit_diagnostic('error', 'error message', 3)  # dropped
+        self.assertEqual([d.message for d in diagnostics][-1], 'fatal: too many errors (max_errors=2), stopping')
+        self.assertEqual(len(diagnostics), 4)
+        self.assertEqual((diagnostics.remaining_errors(), Diagnostics(verbose=False).remaining_errors()), (0, None))
@@ -0,0 +1,86 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import cast
+
+from mattylang import compile
+
+SOURCE = '\n'.join([
+    'def unused(n: Real) { return helper(n) }',
+    'def helper(n: Real) { return n + 1 }',
+    'def used(n: Real) {',
+    '  while (n > 0) {',
+    '    if (n > 5) { break print("never") } else { n = n - 1 continue }',
+    '    print("dead")',
+    '  }',
+    '  if (false) print("no") else if (1 < 2) { return n } else { return 0 }',
+    '  print("also dead")',
+    '  return -1',
+    '}',
+    'def a(n: Real) { return b(n) }',
+    'def b(n: Real) { return a(n) }',
+    'while (false) print("x")',
+    'if (true) { def k = used(3)\nprint(k) }',
+    'if (false) { print(0) }',
+])
+
+
+class DeadCodeEliminatorTest(unittest.TestCase):
+    def test_elimination(self):
+        expected = [
+            'def used(n):',
+            '    while (n > 0.0):',
+            '        if (n > 5.0):',
+            '            break',
+            '        else:',
+            '            n = (n - 1.0)',
+            '            continue',
+            '    return n',
+            'k = used(3.0)',
+            'print(k)',
+        ]
+        functions = [
+            'def unused(n):',
+            '    return helper(n)',
+            'def helper(n):',
+            '    return (n + 1.0)',
+        ]
+        mutual = ['def a(n):', '    return b(n)', 'def b(n):', '    return a(n)']
+        result = compile('test', SOURCE, optimize=True)
+        self.assertEqual(cast(str, result.code).splitlines(), functions + expected[:8] + mutual + expected[8:])
+        result = compile('test', SOURCE, optimize=True, strip_unused=True)
+        self.assertEqual(cast(str, result.code).splitlines(), expected)
+
+        result = compile('test', SOURCE, verbose=True, optimize=True, strip_unused=True)
+        diagnostics = [(diagnostic.kind, diagnostic.message, result.module.line_map.get_location(diagnostic.position))
+                       for diagnostic in result.module.diagnostics]
+        self.assertEqual(diagnostics, [
+            ('info', 'emitter: removed unused function unused', (1, 1)),
+            ('info', 'emitter: removed unused function helper', (2, 1)),
+            ('info', 'emitter: removed 1 unreachable statement(s)', (5, 24)),
+            ('info', 'emitter: removed 1 unreachable statement(s)', (6, 5)),
+            ('info', 'emitter: removed if branch of if statement with a constant condition', (8, 14)),
+            ('info', 'emitter: removed else branch of if statement with a constant condition', (8, 60)),
+            ('info', 'emitter: removed 2 unreachable statement(s)', (9, 3)),
+            ('info', 'emitter: removed unused function a', (12, 1)),
+            ('info', 'emitter: removed unused function b', (13, 1)),
+            ('info', 'emitter: removed while statement with a false condition', (14, 1)),
+            ('info', 'emitter: removed if branch of if statement with a constant condition', (17, 12)),
+        ])
+        self.assertEqual(len(compile('test', SOURCE, optimize=True).module.diagnostics), 0)  # info needs verbose
+
+    def test_outputs(self):
+        outputs = []
+        for options in [{}, {'optimize': True}, {'optimize': True, 'strip_unused': True, 'backend': 'ast'}]:
+            output = StringIO()
+            with redirect_stdout(output):
+                exec(compile('test', SOURCE, **options).get_code_object(), {})  # type: ignore
+            outputs.append(output.getvalue())
+        self.assertEqual(outputs, [outputs[0]] * 3)
+
+        # a chunk whose statements are all removed emits pass
+        result = compile('test', 'while (false) {}\ndef f() { if (false) return 1\nreturn 2 }\nprint(f())',
+                         optimize=True)
+        self.assertEqual(cast(str, result.code).splitlines(), ['def f():', '    return 2.0', 'print(f())'])
+        self.assertEqual(compile('test', 'if (false) print(1)', optimize=True).code, 'pass')
+        self.assertEqual(compile('test', 'if (false) print(1)', optimize=True, backend='ast').get_code(), 'pass')
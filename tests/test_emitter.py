@@ -1,5 +1,11 @@
+import ast as python_ast
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from types import CodeType
+from typing import cast
 
+from mattylang import compile, emit
 from mattylang.ast import *
 from mattylang.globals import Globals
 from mattylang.module import Module
@@ -88,3 +94,120 @@ class EmitterTest(unittest.TestCase):
         emitter = Emitter(module)
         ast.accept(emitter)
         self.assertEqual(str(emitter).splitlines(), expected)
+
+    def test_renamer(self):
+        source = '\n'.join([
+            'def lambda = 1',
+            'def len(class: Real) {',
+            '  def class = 2',
+            '  if (true) { def class = class def class_1 = 4 }',
+            '  if (true) { def class = 5 }',
+            '  return class',
+            '}',
+            'def print = len(lambda)',
+        ])
+        expected = [
+            'lambda_1 = 1.0',
+            'def len_1(class_2):',
+            '    class_3 = 2.0',
+            '    if True:',
+            '        class_4 = class_3',
+            '        class_1 = 4.0',
+            '    if True:',
+            '        class_5 = 5.0',
+            '    return class_3',
+            'print_1 = len_1(lambda_1)',
+        ]
+
+        # keywords, builtins and names declared in an enclosing scope of the same function are renamed
+        result = compile('test', source)
+        self.assertFalse(result.module.diagnostics.has_error())
+        self.assertEqual(cast(str, result.code).splitlines(), expected)
+
+    def test_ast_backend(self):
+        source = '\n'.join([
+            'def x = -1',
+            'if (!(x < 2) || x >= 3 && x != 4) print("a") else { def x = nil\nprint(x) }',
+            'while (x <= 3) { x = x + 1 % 2 / 3\nif (x == 2) continue\nbreak }',
+            'def f(print: Real, s: String) { return }',
+            'f(1, "")',
+            'print(x)',
+        ])
+
+        # the tree has the structure of the emitted source text, located in the source
+        text, tree = compile('test', source), compile('test', source, backend='ast')
+        self.assertIsNone(tree.code)
+        tree_python = cast(python_ast.Module, tree.python)
+        self.assertEqual(python_ast.dump(tree_python), python_ast.dump(python_ast.parse(cast(str, text.code))))
+        self.assertEqual([(statement.lineno, statement.col_offset) for statement in tree_python.body],
+                         [(1, 0), (2, 0), (4, 0), (7, 0), (8, 0), (9, 0)])
+        self.assertEqual(tree_python.body[1].test.lineno, 2)  # type: ignore
+        self.assertEqual(tree_python.body[1].test.col_offset, 4)  # type: ignore
+
+        outputs = []
+        for result in (text, tree):
+            output = StringIO()
+            with redirect_stdout(output):
+                exec(result.get_code_object(), {})
+            outputs.append(output.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+
+        # only the syntax tree's line numbers are those of the module
+        self.assertEqual(cast(CodeType, text.get_code_object()).co_filename, '<string>')
+        self.assertEqual(cast(CodeType, tree.get_code_object()).co_filename, 'test')
+
+        # source text on demand
+        self.assertEqual(python_ast.dump(python_ast.parse(cast(str, tree.get_code()))), python_ast.dump(tree_python))
+        self.assertEqual(compile('test', '', backend='ast').get_code(), 'pass')
+
+    def test_deep_expressions(self):
+        # long chains of operators and nested calls are checked, folded and emitted without recursion
+        depth = 400
+        source = '\n'.join([
+            'def f(n: Real) { return n }',
+            'def a = 1',
+            'print(' + ' + '.join(['a'] * depth) + ' - ' + '-' * depth + 'a)',
+            'print(' + '!' * depth + '(a > 0) && ' + ' || '.join(['a < 0'] * depth) + ')',
+            'print(' + 'f(' * 150 + 'a' + ')' * 150 + ')',
+        ])
+        for backend in ('source', 'ast'):
+            for optimize in (False, True):
+                result = compile('test', source, backend=backend, optimize=optimize)
+                self.assertFalse(result.module.diagnostics.has_error(), list(result.module.diagnostics))
+                output = StringIO()
+                with redirect_stdout(output):
+                    exec(result.get_code_object(), {})
+                self.assertEqual(output.getvalue().splitlines(), ['399.0', 'False', '1.0'])
+
+        # a chain of left-associative operators of the same precedence is emitted in a single pair of parentheses
+        code = compile('test', 'def a = 1\nprint(a - a + a * a / a % a - --a < a == !!(a > 0) || a > 0 && a < 0)').code
+        self.assertEqual(cast(str, code).splitlines()[1],
+                         'print((((((a - a + (a * a / a % a) - (- - a)) < a) == (not not (a > 0.0))) or '
+                         '(a > 0.0)) and (a < 0.0)))')
+
+    def test_sink(self):
+        source = 'def x = 1\ndef f(n: Real) { if (n > 1) return n\nreturn 0 }\nwhile (x < 3) x = x + f(x)\nprint(x)'
+        expected = cast(str, compile('test', source).code) + '\n'
+
+        class Sink(StringIO):
+            writes = 0
+
+            def write(self, text: str) -> int:
+                self.writes += 1
+                return super().write(text)
+
+        sink = Sink()
+        result = emit(compile('test', source, no_emit=True), sink=sink)
+        self.assertIsNone(result.code)
+        self.assertEqual(sink.getvalue(), expected)
+        self.assertEqual(sink.writes, 4)  # a write per top-level statement
+
+        # visited as a whole program (rather than a statement at a time by the emitter pass)
+        result = compile('test', source, no_emit=True)
+        sink = Sink()
+        result.ast.accept(Emitter(result.module, sink))
+        self.assertEqual((sink.getvalue(), sink.writes), (expected, 4))
+
+        sink = Sink()
+        emit(compile('test', '', no_emit=True), sink=sink)
+        self.assertEqual(sink.getvalue(), 'pass\n')
@@ -0,0 +1,88 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import cast
+
+from mattylang import compile
+
+
+class ConstantFolderTest(unittest.TestCase):
+    def test_folding(self):
+        source = '\n'.join([
+            'def pi = 3.14159',
+            'def n = 0',
+            'while (n < 2 * pi * 1000) n = n + 1000 * 1',
+            'def s = "a" + "b"',
+            'print(s + "c" == "abc" && !(1 > 2))',
+            'print(-(2 - 5) % 2)',
+            'print(n / 1 - 0)',
+            'print(1 / 0 > 1 || n > 0)',
+        ])
+        expected = [
+            'pi = 3.14159',
+            'n = 0.0',
+            'while (n < 6283.179999999999):',
+            '    n = (n + 1000.0)',
+            "s = 'ab'",
+            'print(True)',
+            'print(1.0)',
+            'print(n)',
+            'print((((1.0 / 0.0) > 1.0) or (n > 0.0)))',  # raises at runtime
+        ]
+        result = compile('test', source, optimize=True)
+        self.assertEqual(cast(str, result.code).splitlines(), expected)
+
+    def test_identities(self):
+        source = '\n'.join([
+            'def b = 1 > 0',
+            'def x = 2',
+            'def s = ""',
+            'b = b',  # b, x and s are not constant
+            'x = x',
+            's = s',
+            *[f'print({expression})' for expression in ['!!b', 'true && b', 'false || b', 'b && true', 'b || false',
+                                                        'false && b', 'true || b']],
+            *[f'print({expression})' for expression in ['x * 1', '1 * x', 'x / 1', 'x - 0', 'x + -0', '-0 + x',
+                                                        'x + 0', '0 + x', 'x - -0', 'x * 0']],
+            'print(s + "")',
+            'print("" + s)',
+        ])
+        expected = [
+            *[f'print({name})' for name in 'bbbbb'], 'print(False)', 'print(True)',
+            *['print(x)'] * 6,
+            # these differ from x for x = -0
+            'print((x + 0.0))', 'print((0.0 + x))', 'print((x - -0.0))', 'print((x * 0.0))',
+            'print(s)', 'print(s)',
+        ]
+        result = compile('test', source, optimize=True)
+        self.assertEqual(cast(str, result.code).splitlines()[6:], expected)
+
+    def test_strings(self):
+        # long strings are not copied into each use, nor grown past the folding limit
+        source = '\n'.join(['def s0 = "abcdefghij"', *[f'def s{i} = s{i - 1} + s{i - 1}' for i in range(1, 22)],
+                            'if (false) { print(s21) }', 'print(s0 + "!")'])
+        code = cast(str, compile('test', source, optimize=True).code)
+        self.assertLess(len(code), len(cast(str, compile('test', source).code)))
+        self.assertEqual(code.splitlines()[:3], ["s0 = 'abcdefghij'", f"s1 = '{'abcdefghij' * 2}'", 's2 = (s1 + s1)'])
+        self.assertEqual(code.splitlines()[-1], "print('abcdefghij!')")
+
+        code = cast(str, compile('test', f'print("{"a" * 4096}" + "b")', optimize=True).code)
+        self.assertEqual(code, f"print(('{'a' * 4096}' + 'b'))")
+
+    def test_outputs(self):
+        source = '\n'.join([
+            'def z = -0',
+            'def x = 3',
+            'def f(n: Real) { def k = 2 * 3 if (n > k && true) return n % k + 0\nreturn -n * 1 }',
+            *[f'print({expression})' for expression in ['z + 0', 'z - 0', 'z * -1', 'f(x)', 'f(z)', 'f(x + 7)',
+                                                        '"n" + "il" == "nil"']],
+            'while (x > 0 || false) { x = x - 1 print(!!(x > 1)) }',
+        ])
+        outputs = []
+        for optimize in (False, True):
+            for backend in ('source', 'ast'):
+                output = StringIO()
+                with redirect_stdout(output):
+                    exec(compile('test', source, optimize=optimize, backend=backend).get_code_object(), {})
+                outputs.append(output.getvalue())
+        self.assertEqual(outputs, [outputs[0]] * 4)
@@ -0,0 +1,47 @@
+import os
+import unittest
+
+from mattylang.grammar import BINARY_PRECEDENCE, generate, Grammar, GrammarError
+
+GRAMMAR_FILE = os.path.join(os.path.dirname(__file__), '..', 'docs', 'grammar.ebnf')
+TABLES_FILE = os.path.join(os.path.dirname(__file__), '..', 'mattylang', 'parser_tables.py')
+
+
+class GrammarTest(unittest.TestCase):
+    def test_tables_up_to_date(self):
+        with open(GRAMMAR_FILE, 'r') as fd:
+            grammar = Grammar(fd.read())
+        with open(TABLES_FILE, 'r') as fd:
+            tables = fd.read()
+        self.assertEqual(generate(grammar, 'docs/grammar.ebnf'), tables,
+                         'parser tables are stale, run `python -m mattylang.grammar`')
+
+    def test_first_follow(self):
+        grammar = Grammar('''
+            program = { statement } EOF;
+            statement = "def" identifier ["=" expression] | call;
+            call = identifier "(" ")";
+            expression = identifier | "(" expression ")" | expression "+" expression;
+        ''')
+        first, follow = grammar.first(), grammar.follow()
+        self.assertEqual(first['program'], {'def', 'identifier', 'eof'})
+        self.assertEqual(first['expression'], {'identifier', '('})
+        self.assertEqual(follow['statement'], {'def', 'identifier', 'eof'})
+        self.assertEqual(follow['expression'], {'def', 'identifier', 'eof', ')', '+'})
+        self.assertEqual(grammar.dispatch('statement'), {'def': ('statement',), 'identifier': ('call',)})
+
+    def test_binary_operators(self):
+        with open(GRAMMAR_FILE, 'r') as fd:
+            grammar = Grammar(fd.read())
+        _, operators, _ = grammar.rules['binary_expression'][0][1]  # type: ignore
+        self.assertEqual({value for _, value in operators[1]}, set(BINARY_PRECEDENCE))  # type: ignore
+
+    def test_errors(self):
+        with self.assertRaisesRegex(GrammarError, 'undefined rule b'):
+            Grammar('a = b;')
+        with self.assertRaisesRegex(GrammarError, "unexpected '='"):
+            Grammar('a = "x" = ;')
+        with self.assertRaisesRegex(GrammarError, 'expected ;'):
+            Grammar('a = "x" )')
+        with self.assertRaisesRegex(GrammarError, 'unexpected character'):
+            Grammar('a = ?;')
@@ -0,0 +1,156 @@
+import random
+import unittest
+from typing import Any, List
+
+from mattylang import compile, CompileResult
+from mattylang.ast import *
+from mattylang.globals import Globals
+from mattylang.incremental import IncrementalCompiler, IncrementalParser
+from mattylang.lexer import Lexer
+from mattylang.module import Module
+from mattylang.parser import Parser
+
+
+class IncrementalParserTest(unittest.TestCase):
+    def dump(self, node: AbstractNode) -> List[Any]:
+        result: List[Any] = [str(node), node.position]
+        fields = {key: getattr(node, key) for cls in type(node).__mro__ for key in getattr(cls, '__slots__', ())}
+        for key, value in sorted(fields.items()):
+            if key == 'parent':
+                continue
+            if isinstance(value, AbstractNode):
+                result.append((key, self.dump(value)))
+            elif isinstance(value, list):
+                result.append((key, [self.dump(item) for item in value]))
+        return result
+
+    def assert_reparsed(self, module: Module, ast: ProgramNode):
+        expected_module = Module('test', module.source)
+        expected = Parser(Lexer(expected_module)).parse()
+        self.assertEqual(self.dump(ast), self.dump(expected))
+        self.assertEqual([(d.kind, d.message, d.position) for d in module.diagnostics],
+                         [(d.kind, d.message, d.position) for d in expected_module.diagnostics])
+        self.assertEqual([module.line_map.get_location(i) for i in range(len(module.source) + 1)],
+                         [expected_module.line_map.get_location(i) for i in range(len(module.source) + 1)])
+
+    def test_edits(self):
+        source = ('\n').join([
+            '# header',
+            'def x = 1',
+            'def f(a: Real) { return a + x }',
+            'print(f(2))',
+            'x = .',
+            'while (true) break',
+        ])
+        module = Module('test', source)
+        parser = IncrementalParser(module)
+        ast = parser.parse()
+        self.assert_reparsed(module, ast)
+        last = ast.chunk.statements[-1]
+
+        edits = [  # (text to replace, replacement)
+            ('1', '10 + 2'),  # grow an expression
+            ('', '\n\n'),  # insert lines before everything
+            ('print', '* 3 print'),  # extend the previous statement
+            ('def f(a: Real) { return a + x }', ''),  # delete a function
+            ('', '"open'),  # unterminated string in the prologue
+        ]
+
+        for old, new in edits:
+            start = module.source.index(old)
+            parser.apply_edit(start, start + len(old), new)
+            ast = parser.parse()
+            self.assert_reparsed(module, ast)
+
+        # statements after the edits are reused, with shifted positions
+        self.assertIs(ast.chunk.statements[-1], last)
+        self.assertEqual(last.position, module.source.index('while'))
+
+        # edits are shifted once by the next parse, wherever they are
+        edits = [('x = .', 'x = 2'), ('print', 'def z = 1\nprint'), ('def x', 'def  x'), ('(2)', '(2 + x)')]
+        for old, new in edits:
+            start = module.source.index(old)
+            parser.apply_edit(start, start + len(old), new)
+        self.assert_reparsed(module, parser.parse())
+        self.assertIs(ast.chunk.statements[-1], last)
+
+
+class IncrementalCompilerTest(unittest.TestCase):
+    def outputs(self, result: CompileResult):
+        diagnostics = [(d.kind, d.message, d.position) for d in result.module.diagnostics]
+        return diagnostics, result.code
+
+    def test_edits(self):
+        source = '\n'.join([
+            'def x = 1',
+            'def f(a: Real) { return g(a) + 1 }',
+            'def g(a: Real) { if (a > 0) return f(a - 1)\nreturn a }',
+            'def h(s: String) { def list = s\nreturn list }',
+            'def print = h("x")',
+            'while (x < 3) { def x = 2\nbreak }',
+            'def y = f(2)',
+        ])
+        module = Module('test', source, globals=Globals().globals, verbose=True)
+        compiler = IncrementalCompiler(module)
+
+        edits = [  # (text to replace, replacement, statements checked, functions emitted)
+            ('', '', 7, 3),  # nothing is memoized yet
+            ('', '', 0, 1),  # h renames its variable, it is emitted again
+            ('return list', 'print(list)\nreturn list'),  # edit a body, h's type does not change
+            ('return a }', 'return a * 2 }'),
+            ('def f(a: Real)', 'def f(a: Real, b: Real)'),  # change a type, callers are checked again
+            ('f(a - 1)', 'f(a - 1, a)'),
+            ('def y = f(2)', 'def y = f(2, 3)'),
+            ('def x = 1', 'def x = "a"'),  # errors, no code
+            ('def x = "a"', 'def x = 1\ndef k() { return 1 }'),  # declare a function
+            ('def print', 'def list'),  # rename a declaration
+        ]
+        for edit in edits:
+            old, new = edit[0], edit[1]
+            start = module.source.index(old)
+            compiler.apply_edit(start, start + len(old), new)
+            result = compiler.compile()
+            expected = compile('test', module.source, verbose=True)
+            self.assertEqual(self.outputs(result), self.outputs(expected), module.source)
+            if len(edit) > 2:
+                self.assertEqual((compiler.checked, compiler.emitted), edit[2:], module.source)
+
+        # editing a function's body checks and emits only that function, unless its type changes
+        start = module.source.index('print(list)')
+        compiler.apply_edit(start, start, 'print("y")\n')
+        result = compiler.compile()
+        self.assertEqual(self.outputs(result), self.outputs(compile('test', module.source, verbose=True)))
+        self.assertEqual((compiler.checked, compiler.emitted), (1, 1))
+
+    def test_random_edits(self):
+        # statements defining, redefining and referencing the same few symbols, in mutually recursive functions too
+        statements = [
+            'def f(a: Real) { return a }', 'def f(a: String) { return a }', 'def f() { return g() }',
+            'def g() { return h(x) }', 'def h(c: Real) { return f(c) * "q" }', 'def h(c: Real) { return f(c) * 2 }',
+            'def k(n: Real) { def list = n\nreturn list + y }', 'def x = 1', 'def x = "s"', 'def y = x + 1', 'x = 2',
+            'print(f(x))', 'def print = 1', 'def v = f', 'def w = v(1)', 'while (x < 3) { def x = 2\nbreak }',
+        ]
+        for seed in range(100):
+            rng = random.Random(seed)
+            lines = [rng.choice(statements) for _ in range(rng.randint(0, 6))]
+            module = Module('test', ''.join(line + '\n' for line in lines), globals=Globals().globals)
+            compiler = IncrementalCompiler(module)
+            compiler.compile()
+            for _ in range(8):  # insert, delete or replace a statement
+                starts = [0]
+                for line in lines:
+                    starts.append(starts[-1] + len(line) + 1)
+                index = rng.randint(0, len(lines))
+                if index == len(lines) or rng.random() < 0.3:
+                    line = rng.choice(statements)
+                    compiler.apply_edit(starts[index], starts[index], line + '\n')
+                    lines.insert(index, line)
+                elif rng.random() < 0.5:
+                    compiler.apply_edit(starts[index], starts[index + 1], '')
+                    del lines[index]
+                else:
+                    lines[index] = rng.choice(statements)
+                    compiler.apply_edit(starts[index], starts[index + 1] - 1, lines[index])
+                result = compiler.compile()
+                expected = compile('test', module.source)
+                self.assertEqual(self.outputs(result), self.outputs(expected), (seed, module.source))
@@ -1,10 +1,20 @@
+import os
+import tempfile
 import unittest
 from typing import List, Tuple
 
 from mattylang.lexer import Lexer, Token
-from mattylang.module import Module
+from mattylang.module import map_source, Module
 
 
+def scan_all(lexer: Lexer) -> List[Tuple[str, str, int]]:
+    tokens: List[Tuple[str, str, int]] = []
+    while True:
+        tokens.append((lexer.peek().kind, lexer.peek().lexeme, lexer.token_position()))
+        if lexer.peek().kind == 'eof':
+            return tokens
+        lexer.scan()
+
 class TokensTest(unittest.TestCase):
     def test_token(self):
         expected = ['def', 'identifier(x)', 'real_literal(1.0)', "string_literal('1.0')"]
@@ -89,3 +99,69 @@ class TokensTest(unittest.TestCase):
                    1 else diagnostic.message) for idx, diagnostic in enumerate(module.diagnostics)]
 
         self.assertEqual(result, expected)
+
+    def test_edge_cases(self):
+        expected = [
+            ('&', "unexpected character '&'"),  # lone & is not punctuation
+            ('||', None),
+            ('é', "unexpected character 'é'"),
+            ('1.', "expected whitespace after real literal 1."),  # followed by .
+            ('.5', None),
+            ('"ab', 'expected " to terminate string'),  # unterminated at end of input
+        ]
+        source = '&|| é 1..5 # comment\n"ab'
+        module = Module('test', source)
+        lexer = Lexer(module)
+
+        tokens: List[Tuple[str, str, int]] = []
+        while lexer.peek().kind != 'eof':
+            tokens.append((lexer.peek().kind, lexer.peek().lexeme, lexer.token_position()))
+            lexer.scan()
+
+        self.assertEqual(tokens, [('||', '||', 1), ('real_literal', '1.', 6),
+                         ('real_literal', '.5', 8), ('string_literal', 'ab', 21)])
+        self.assertEqual([diagnostic.message.split(': ', 1)[1] for diagnostic in module.diagnostics],
+                         [message for _, message in expected if message is not None])
+        self.assertEqual(lexer.token_position(), len(source))
+
+    def test_trivia(self):
+        source = '# license\n\n  # header\ndef x # trailing\n#'
+        module = Module('test', source)
+        lexer = Lexer(module, trivia=True)
+        self.assertEqual([kind for kind, _, _ in scan_all(lexer)], ['def', 'identifier', 'eof'])
+        self.assertEqual([source[start:end] for start, end in lexer.comments or []],
+                         ['# license', '# header', '# trailing', '#'])
+        self.assertIsNone(Lexer(Module('test', source)).comments)
+
+        # huge trivia and error runs are scanned in constant stack depth
+        source = '# comment\n' * 50000 + ' ;' * 50000 + 'x'
+        module = Module('test', source)
+        lexer = Lexer(module)
+        self.assertEqual((lexer.peek().kind, lexer.token_position()), ('identifier', len(source) - 1))
+        self.assertEqual(len(module.diagnostics), 50000)
+
+    def test_bytes(self):
+        source = 'def s = "ab\' #"\n# é\nx = 1. é .'
+        module = Module('test', source)
+        tokens = scan_all(Lexer(module))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.mtl')
+            with open(path, 'wb') as fd:
+                fd.write(source.encode())
+
+            mapped_module = Module(path, map_source(path))
+            mapped_tokens = scan_all(Lexer(mapped_module))
+
+            # positions are byte offsets, shifted by the two-byte é in the comment
+            def byte_offset(position: int):
+                return len(source[:position].encode())
+
+            self.assertEqual(mapped_tokens, [(kind, lexeme, byte_offset(position)) for kind, lexeme, position in tokens])
+            self.assertEqual([(d.kind, d.message, d.position) for d in mapped_module.diagnostics],
+                             [(d.kind, d.message, byte_offset(d.position)) for d in module.diagnostics])
+            self.assertEqual(mapped_module.line_map.get_location(mapped_tokens[4][2]), (3, 1))
+            mapped_module.source.close()  # type: ignore
+
+            open(path, 'wb').close()
+            self.assertEqual(map_source(path), b'')  # empty files are not mapped
@@ -14,3 +14,21 @@ class LineMapTest(unittest.TestCase):
         self.assertEqual(locations, expected_locations)
         positions = [linemap.get_position(line, column) for line, column in locations]
         self.assertEqual(positions, expected_positions)
+
+    def test_bytes(self):
+        source = '\nabc\ndef'
+        text_linemap, bytes_linemap = LineMap(source), LineMap(source.encode())
+        for i in range(len(source)):
+            self.assertEqual(bytes_linemap.get_location(i), text_linemap.get_location(i))
+        self.assertEqual(LineMap(b'').get_location(0), (1, 1))
+
+    def test_edits(self):
+        source = 'a\nbc\n\ndef\ng'
+        linemap = LineMap(source)
+        edits = [(4, 6, 'x\ny\n'), (0, 0, '\n'), (9, 9, 'zz'), (1, 3, ''), (2, 12, '\n\n')]  # moves the gap both ways
+        for start, end, text in edits:
+            source = source[:start] + text + source[end:]
+            linemap.apply_edit(start, end, text)
+            expected = LineMap(source)
+            self.assertEqual([linemap.get_location(i) for i in range(len(source) + 1)],
+                             [expected.get_location(i) for i in range(len(source) + 1)], source)
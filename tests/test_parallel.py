@@ -0,0 +1,64 @@
+import unittest
+from typing import Optional
+
+from mattylang import compile, CompileResult
+from mattylang.parallel import can_check_in_parallel, check_in_parallel
+
+
+def generate_program(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines += [f'def f{i}(n: Real, s: String) {{ def a = n * {i}\nprint(s)\nreturn a }}', f'def r{i} = f{i}({i}, "x")']
+    return '\n'.join(lines) + '\n'
+
+
+def outputs(result: CompileResult):
+    diagnostics = [(diagnostic.kind, diagnostic.message, diagnostic.position) for diagnostic in result.module.diagnostics]
+    return diagnostics, result.code
+
+
+def check_jobs(source: str, max_errors: Optional[int] = None) -> int:
+    result = compile('test', source, no_check=True, max_errors=max_errors)
+    return check_in_parallel(result.module, result.ast, 3)
+
+
+@unittest.skipUnless(can_check_in_parallel(), 'workers cannot be forked')
+class ParallelTest(unittest.TestCase):
+    def test_ranges(self):
+        sources = [
+            generate_program(20),
+            # errors in several ranges, references to functions in other ranges
+            generate_program(10) + 'def a = f1(1, 2)\ndef g() { return f0(1, "x") + true }\n' + generate_program(10),
+            'def f() { return g() }\ndef g() { return h }\ndef x = f() + 1\ndef h() { return 1 }',
+            '',
+        ]
+        for source in sources:
+            parallel = compile('test', source, verbose=True, jobs=3)
+            self.assertEqual(outputs(parallel), outputs(compile('test', source, verbose=True)), source)
+            if len(source) > 0:
+                self.assertEqual(check_jobs(source), 3)
+
+        result = compile('test', generate_program(20), jobs=3)
+        symbols = [statement.identifier.symbol for statement in result.ast.chunk.statements[:2]]
+        self.assertEqual([str(symbol.type) for symbol in symbols], ['(Real, String) -> Real', 'Real'])
+
+    def test_max_errors(self):
+        source = ''.join(f'def v{i} = {i} + "s"\n' for i in range(30))
+        result = compile('test', source, max_errors=5, jobs=3)
+        self.assertEqual(outputs(result), outputs(compile('test', source, max_errors=5)))
+        self.assertEqual(check_jobs(source, max_errors=5), 3)
+
+    def test_fallback(self):
+        # the program's variables are typed by checking the statements before them
+        source = 'def x = 1\n' + generate_program(20) + 'def y = x + "a"'
+        result = compile('test', source, jobs=3)
+        self.assertEqual(outputs(result), outputs(compile('test', source)))
+        self.assertEqual(check_jobs(source), 0)
+
+    def test_optimize(self):
+        # the workers leave the nodes they check untyped, so optimized programs are checked serially
+        source = generate_program(20) + 'def z = 1 + 2\nif (z > 1 && true) { print(z * 1) }\nwhile (false) { print(z) }\n'
+        for backend in ['source', 'ast']:
+            optimized = compile('test', source, verbose=True, backend=backend, optimize=True, strip_unused=True)
+            parallel = compile('test', source, verbose=True, jobs=3, backend=backend, optimize=True, strip_unused=True)
+            self.assertEqual((outputs(parallel), parallel.get_code()), (outputs(optimized), optimized.get_code()))
@@ -1,5 +1,7 @@
 import unittest
+from typing import Any, cast
 
+import mattylang.ast
 from mattylang.ast import *
 from mattylang.module import Module
 from mattylang.lexer import Lexer
@@ -8,7 +10,7 @@ from mattylang.parser import Parser
 
 class TestParser(unittest.TestCase):
     def make_dict(self, node: AbstractNode):
-        tld = node.__dict__.copy()
+        tld = {key: getattr(node, key) for cls in type(node).__mro__ for key in getattr(cls, '__slots__', ())}
         for key, value in tld.items():
             if key == 'parent':
                 continue
@@ -178,13 +180,10 @@ class TestParser(unittest.TestCase):
             ('error', 'to close expression'),  # missing )
             # line 2
             ('error', 'expected identifier for definition'),  # missing identifier
-            ('error', 'expected = or ( for definition'),  # missing = or (
-            ('error', 'unexpected real_literal'),  # unexpected 0
+            ('error', 'expected = or ( for definition'),  # missing = or (, 0 is skipped
             # line 3
-            ('error', 'unexpected identifier'),  # unexpected x
-            ('error', 'unexpected real_literal'),  # unexpected 0
-            # line 4
-            ('error', 'unexpected token ,'),
+            ('error', 'unexpected identifier'),  # unexpected x, 0 is skipped
+            # line 4 is skipped, up to the next statement
             # line 5
             ('error', 'to initialize variable x'),  # missing expression
             ('error', 'unexpected token ,'),
@@ -242,3 +241,73 @@ class TestParser(unittest.TestCase):
                    1 else diagnostic.message) for idx, diagnostic in enumerate(module.diagnostics)]
 
         self.assertEqual(result, expected)
+
+    def test_recovery(self):
+        # statements resume at the next keyword, block end or identifier starting a line
+        source = 'x 1 2 3 def f() { 1 ) ) } 4 5 ( }\ny = 1\nz = ) ) 6'
+        module = Module('test', source)
+        ast = Parser(Lexer(module)).parse()
+        self.assertEqual([d.message for d in module.diagnostics], [
+            'syntax: unexpected identifier(x)',
+            'syntax: unexpected real_literal(1.0)',
+            'syntax: unexpected real_literal(4.0)',  # parsed as a temporary
+            'syntax: expected expression (got )) to assign variable z',
+            'syntax: unexpected token )',
+        ])
+        self.assertEqual([str(statement) for statement in ast.chunk.statements],
+                         ['function_definition', 'variable_definition', 'variable_assignment', 'variable_assignment'])
+
+        # garbage is skipped in a single recovery per line, and parsing stops after too many errors
+        source = '\n'.join(['x ! @ 1 ) , = ; ( ] foo bar'] * 1000)
+        module = Module('test', source)
+        Parser(Lexer(module)).parse()
+        self.assertEqual(sum(d.message.startswith('syntax: unexpected identifier') for d in module.diagnostics), 1000)
+
+        module = Module('test', source, max_errors=10)
+        Parser(Lexer(module)).parse()
+        self.assertEqual(len(module.diagnostics), 11)
+        self.assertTrue(module.diagnostics.limit_reached())
+
+    def test_slots(self):
+        classes = [value for value in vars(mattylang.ast).values()
+                   if isinstance(value, type) and issubclass(value, AbstractNode)]
+        self.assertGreater(len(classes), 30)
+        for cls in classes:
+            self.assertEqual(cls.__dictoffset__, 0, f'{cls.__name__} instances have a __dict__')
+
+    def test_deep_expressions(self):
+        depth = 5000
+        source = 'def x = ' + '(-' * depth + '1' + ')' * depth + ' + !!true * 2'
+        module = Module('test', source)
+        ast = Parser(Lexer(module)).parse()
+        self.assertEqual(module.diagnostics.has_error(), False, list(module.diagnostics))
+
+        expression = cast(Any, ast.chunk.statements[0]).initializer
+        self.assertEqual(str(expression), 'binary_expression(+)')
+        self.assertEqual(str(expression.right), 'binary_expression(*)')
+        self.assertEqual(str(expression.right.left.operand), 'unary_expression(!)')
+
+        operand, count = expression.left, 0
+        while isinstance(operand, UnaryExpressionNode):
+            self.assertEqual(operand.position, 8 + 2 * count + 1)  # positioned at the operator
+            operand, count = operand.operand, count + 1
+        self.assertEqual((count, str(operand)), (depth, 'real_literal(1.0)'))
+
+        # calls are parsed on the same stack, their arguments are diagnosed as those of a call statement
+        source = 'def x = ' + 'f(1, ' * depth + 'g()' + ')' * depth
+        module = Module('test', source)
+        ast = Parser(Lexer(module)).parse()
+        self.assertEqual(module.diagnostics.has_error(), False, list(module.diagnostics))
+
+        operand, count = cast(Any, ast.chunk.statements[0]).initializer, 0
+        while operand.identifier.value == 'f':
+            self.assertEqual((operand.position, str(operand.arguments[0])), (8 + 5 * count, 'real_literal(1.0)'))
+            operand, count = operand.arguments[1], count + 1
+        self.assertEqual((count, len(operand.arguments)), (depth, 0))
+
+        def diagnostics(source: str, offset: int):
+            module = Module('test', source)
+            Parser(Lexer(module)).parse()
+            return [(diagnostic.message, diagnostic.position - offset) for diagnostic in module.diagnostics]
+
+        self.assertEqual(diagnostics('def x = f(,1+ } 2)', 8), diagnostics('f(,1+ } 2)', 0))
@@ -1,7 +1,7 @@
 import unittest
 
 from mattylang.ast import IdentifierNode
-from mattylang.symbols import SymbolTable
+from mattylang.symbols import Bindings, SymbolTable
 
 
 class TestSymbols(unittest.TestCase):
@@ -41,3 +41,35 @@ class TestSymbols(unittest.TestCase):
         symbol.erase()
         self.assertEqual(scope.lookup('b'), None)
         self.assertRegex(str(symbol), 'name: b')
+
+    def test_slots(self):
+        scope = SymbolTable()
+        for value in (scope, scope.register('a')):
+            with self.assertRaises(AttributeError):
+                setattr(value, 'undeclared', None)
+
+    def test_bindings(self):
+        scope = SymbolTable()
+        a, b = scope.register('a'), scope.register('b')
+        self.assertEqual((a.get_coordinate(), b.get_coordinate()), ((0, 0), (0, 1)))
+
+        bindings = Bindings(scope)
+        self.assertEqual(bindings.resolve('a'), a)
+        self.assertEqual(bindings.resolve('c'), None)
+
+        boundary = scope.open_scope(boundary=True)
+        bindings.open(boundary)
+        a2 = boundary.register('a')
+        bindings.declare(a2)
+        self.assertEqual(a2.get_coordinate(), (1, 0))
+        self.assertEqual(bindings.resolve('a'), a2)  # shadows
+        self.assertEqual(bindings.resolve('b'), boundary.lookup('b'))  # stops resolution at boundary
+        self.assertEqual(bindings.resolve('b', ignore_boundary=True), b)  # ignores boundary
+
+        subscope = boundary.open_scope()
+        bindings.open(subscope)
+        self.assertEqual(bindings.resolve('a'), a2)
+        bindings.close(subscope)
+        bindings.close(boundary)
+        self.assertEqual(bindings.resolve('a'), a)
+        self.assertEqual(bindings.resolve('b'), b)
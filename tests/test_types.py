@@ -0,0 +1,63 @@
+import unittest
+
+from mattylang import compile
+from mattylang.ast import *
+from mattylang.types import TYPES, TypeInterner
+
+
+class TypesTest(unittest.TestCase):
+    def test_interning(self):
+        types = TypeInterner()
+        self.assertIs(types.intern(RealTypeNode(3)), types.real)
+        self.assertIs(types.intern(types.real), types.real)
+        self.assertEqual(types.real.position, 0)
+
+        function_type = types.function([types.real, types.string], types.nil)
+        self.assertIs(types.function([types.real, types.string], types.nil), function_type)
+        self.assertIsNot(types.function([types.string, types.real], types.nil), function_type)
+        self.assertIsNot(types.function([types.real], types.nil), function_type)
+        self.assertEqual(str(function_type), '(Real, String) -> Nil')
+
+        # type nodes from the syntax tree, including nested function types
+        syntax_type = FunctionTypeNode(5, [FunctionTypeNode(6, [RealTypeNode(7)], BoolTypeNode(8))], AnyTypeNode(9))
+        canonical = types.intern(syntax_type)
+        self.assertIs(types.intern(FunctionTypeNode(0, [FunctionTypeNode(0, [RealTypeNode(0)], BoolTypeNode(0))],
+                                                    AnyTypeNode(0))), canonical)
+        self.assertIs(canonical.parameter_types[0], types.function([types.real], types.bool))
+        self.assertIs(canonical.return_type, types.any)
+
+    def test_assignability(self):
+        types = TypeInterner()
+        primitives = [types.nil, types.bool, types.real, types.string]
+        nodes = [NilTypeNode(0), BoolTypeNode(0), RealTypeNode(0), StringTypeNode(0), AnyTypeNode(0)]
+        real_to_nil = types.function([types.real], types.nil)
+        any_to_nil = types.function([types.any], types.nil)
+        real_to_any = types.function([types.real], types.any)
+        functions = [real_to_nil, any_to_nil, real_to_any, types.function([], types.nil)]
+        function_nodes = [FunctionTypeNode(0, [RealTypeNode(0)], NilTypeNode(0)),
+                          FunctionTypeNode(0, [AnyTypeNode(0)], NilTypeNode(0)),
+                          FunctionTypeNode(0, [RealTypeNode(0)], AnyTypeNode(0)),
+                          FunctionTypeNode(0, [], NilTypeNode(0))]
+
+        # agrees with the structural relation on the type nodes, in both directions and when memoized
+        canonical = primitives + [types.any] + functions
+        structural = nodes + function_nodes
+        for _ in range(2):
+            for type, type_node in zip(canonical, structural):
+                for other, other_node in zip(canonical, structural):
+                    self.assertEqual(types.is_assignable(type, other), type_node.is_assignable_to(other_node),
+                                     f'{type} -> {other}')
+                    self.assertEqual(types.is_equivalent(type, other), type_node.is_equivalent(other_node),
+                                     f'{type} == {other}')
+
+        self.assertTrue(types.is_equivalent(real_to_nil, any_to_nil))
+        self.assertTrue(types.is_equivalent(types.any, types.real))
+        self.assertFalse(types.is_equivalent(types.real, types.string))
+
+    def test_checker_types(self):
+        result = compile('test', 'def f(n: Real) { return n < 1 }\ndef b = f(2)\nprint(b)\n', no_emit=True)
+        self.assertFalse(result.module.diagnostics.has_error())
+        symbols = result.module.globals.children[0].variables
+        self.assertIs(symbols['f'].type, TYPES.function([TYPES.real], TYPES.bool))
+        self.assertIs(symbols['b'].type, TYPES.bool)
+        self.assertIs(result.module.globals.lookup('print').type, TYPES.function([TYPES.any], TYPES.nil))